@@ -111,6 +111,14 @@ def create_app():
     from .routes import routes as routes_bp
     flask_app.register_blueprint(routes_bp)  # no url_prefix
 
+    # Permission index background (hanya jika PERMISSION_INDEX_ORGS diisi)
+    from .utils.permission_index import start_permission_indexer
+    start_permission_indexer()
+
+    # SSL monitor background (watchlist sertifikat)
+    from .utils.ssl_monitor import start_ssl_monitor
+    start_ssl_monitor()
+
     # Optional debug:
     # print(flask_app.url_map)
 
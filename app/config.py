@@ -10,6 +10,20 @@ class Config:
     # Flask Security
     SECRET_KEY = os.getenv("FLASK_SECRET_KEY", "").strip()
 
+    # WSGI server (run.py -> waitress). Thread = request yang dilayani bersamaan; SSE/long-poll status
+    # memakai thread sepanjang umurnya, jadi SERVER_THREADS sebaiknya > STATUS_STREAM_MAX_CLIENTS
+    SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+    PORT = int(os.getenv("PORT", "5000"))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", "24"))
+    SERVER_CONNECTION_LIMIT = int(os.getenv("SERVER_CONNECTION_LIMIT", "200"))
+    SERVER_CHANNEL_TIMEOUT = int(os.getenv("SERVER_CHANNEL_TIMEOUT", "120"))
+    SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "1024"))
+    # Shutdown (SIGTERM): tunggu request berjalan, lalu beri waktu antrian scan untuk selesai
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "15"))
+    SHUTDOWN_DRAIN_SECONDS = int(os.getenv("SHUTDOWN_DRAIN_SECONDS", "120"))
+    # true = Flask development server (hanya untuk develop lokal)
+    USE_DEV_SERVER = os.getenv("USE_DEV_SERVER", "false").lower() in {"1", "true", "yes", "on"}
+
     # UI Customization
     APP_TITLE = os.getenv("APP_TITLE", "DevOps Tools Hub")
     APP_LOGO = os.getenv("APP_LOGO", "/static/images/logo.png")
@@ -28,13 +42,52 @@ class Config:
     CPU_AFFINITY = os.getenv("CPU_AFFINITY", "")
     SONAR_CPD_MINIMUM_TOKENS = os.getenv("SONAR_CPD_MINIMUM_TOKENS")
     SONAR_DEBUG = os.getenv("SONAR_DEBUG", "false").lower() in {"1", "true", "yes", "on"}
+
+    # Repo Mirror Cache (bare mirror per repo, incremental fetch)
+    REPO_CACHE_ENABLED = os.getenv("REPO_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    REPO_CACHE_DIR = os.getenv("REPO_CACHE_DIR", "")
+    REPO_CACHE_MAX_MB = int(os.getenv("REPO_CACHE_MAX_MB", "10240"))
+    # Lewati scan jika HEAD commit branch sudah pernah dianalisis (scan index)
+    SCAN_REUSE_ENABLED = os.getenv("SCAN_REUSE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+
+    # Scan Scheduler (admission control per stage; 0 = auto-detect)
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    SCHEDULER_MEMORY_BUDGET_MB = int(os.getenv("SCHEDULER_MEMORY_BUDGET_MB", "0"))
+    SCHEDULER_CPU_BUDGET = int(os.getenv("SCHEDULER_CPU_BUDGET", "0"))
+    CLONE_CONCURRENCY = int(os.getenv("CLONE_CONCURRENCY", "2"))
+    CLONE_MEMORY_MB = int(os.getenv("CLONE_MEMORY_MB", "128"))
+    SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "1"))
+    SCAN_CPU = int(os.getenv("SCAN_CPU", "2"))
+    SCANNER_OVERHEAD_MB = int(os.getenv("SCANNER_OVERHEAD_MB", "300"))
+    CHROMIUM_MEMORY_MB = int(os.getenv("CHROMIUM_MEMORY_MB", "400"))
     
     # SonarQube Web / Screenshot Configs (for Playwright)
     SONARQUBE_WEB_URL = os.getenv("SONARQUBE_WEB_URL")
     SONAR_USERNAME = os.getenv("SONAR_USERNAME")
     SONAR_PASSWORD = os.getenv("SONAR_PASSWORD")
     SCREENSHOT_TTL_HOURS = os.getenv("SCREENSHOT_TTL_HOURS", "24")
+    SCREENSHOT_FIXED_DELAY_MS = int(os.getenv("SCREENSHOT_FIXED_DELAY_MS", "0"))
+    SONAR_READINESS_TIMEOUT_SECONDS = float(os.getenv("SONAR_READINESS_TIMEOUT_SECONDS", "300"))
+    SCREENSHOT_BROWSER_POOL_SIZE = int(os.getenv("SCREENSHOT_BROWSER_POOL_SIZE", "1"))
+    SCREENSHOT_BROWSER_MAX_USES = int(os.getenv("SCREENSHOT_BROWSER_MAX_USES", "20"))
+    SCREENSHOT_BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("SCREENSHOT_BROWSER_ACQUIRE_TIMEOUT", "300"))
+    # Batas satu screenshot di browser; slot yang melewatinya dianggap macet dan diganti
+    SCREENSHOT_BROWSER_RUN_TIMEOUT = float(os.getenv("SCREENSHOT_BROWSER_RUN_TIMEOUT", "180"))
+    SCREENSHOT_CONCURRENCY = int(os.getenv("SCREENSHOT_CONCURRENCY", str(SCREENSHOT_BROWSER_POOL_SIZE)))
+    SCREENSHOT_QUEUE_SIZE = int(os.getenv("SCREENSHOT_QUEUE_SIZE", "4"))
     
+    # Task Store (status task Repo Scanner)
+    TASK_STORE_BACKEND = os.getenv("TASK_STORE_BACKEND", "sqlite").lower()
+    TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "")
+    TASK_TTL_HOURS = int(os.getenv("TASK_TTL_HOURS", "24"))
+    # Live scanner log per task (ring buffer KB per task, buffer task selesai yang disimpan)
+    TASK_LOG_DIR = os.getenv("TASK_LOG_DIR", "")
+    TASK_LOG_BUFFER_KB = int(os.getenv("TASK_LOG_BUFFER_KB", "256"))
+    TASK_LOG_MAX_BUFFERS = int(os.getenv("TASK_LOG_MAX_BUFFERS", "16"))
+    # Status streaming (SSE /status/stream & long-poll ?wait=)
+    STATUS_STREAM_MAX_SECONDS = float(os.getenv("STATUS_STREAM_MAX_SECONDS", "30"))
+    STATUS_STREAM_MAX_CLIENTS = int(os.getenv("STATUS_STREAM_MAX_CLIENTS", "16"))
+
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
     USE_JSON_LOG = os.getenv("USE_JSON_LOG", "true").lower() == "true"
@@ -49,6 +102,71 @@ class Config:
     
     # GitHub API Token (Optional, alternative to .netrc)
     GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+    # Shared GitHub HTTP client (keep-alive pool = permission-check threads + pagination workers)
+    GITHUB_HTTP_POOL_SIZE = int(os.getenv("GITHUB_HTTP_POOL_SIZE", "14"))
+    GITHUB_HTTP_TIMEOUT = float(os.getenv("GITHUB_HTTP_TIMEOUT", "10"))
+    GITHUB_HTTP_RETRIES = int(os.getenv("GITHUB_HTTP_RETRIES", "3"))
+    GITHUB_PAGINATION_WORKERS = int(os.getenv("GITHUB_PAGINATION_WORKERS", "4"))
+    # Role checker engine: graphql (batched, REST fallback) | rest (one call per repo)
+    GITHUB_PERMISSION_ENGINE = os.getenv("GITHUB_PERMISSION_ENGINE", "graphql").lower()
+    GITHUB_GRAPHQL_BATCH_SIZE = int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", "50"))
+    GITHUB_GRAPHQL_CONCURRENCY = int(os.getenv("GITHUB_GRAPHQL_CONCURRENCY", "2"))
+    # Grant collaborator paralel di GitHub Access (bulk & per-repo)
+    GITHUB_GRANT_CONCURRENCY = int(os.getenv("GITHUB_GRANT_CONCURRENCY", "8"))
+    # Rate limit scheduler: max parallel GitHub requests (turun otomatis saat 403/429),
+    # sisa budget saat request mulai di-pace, dan lama antri maksimum (detik)
+    GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "10"))
+    GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "50"))
+    GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "120"))
+    # Cache listing GitHub (teams/repos) dengan ETag: memory LRU + file JSON di disk
+    GITHUB_CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", "")
+    GITHUB_CACHE_TTL_SECONDS = int(os.getenv("GITHUB_CACHE_TTL_SECONDS", "300"))
+    GITHUB_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "512"))
+    GITHUB_CACHE_MAX_MB = int(os.getenv("GITHUB_CACHE_MAX_MB", "64"))
+    # SSL checker batch (/api/tools/ssl-check/batch)
+    SSL_BATCH_MAX_TARGETS = int(os.getenv("SSL_BATCH_MAX_TARGETS", "500"))
+    SSL_BATCH_CONCURRENCY = int(os.getenv("SSL_BATCH_CONCURRENCY", "50"))
+    SSL_BATCH_TIMEOUT_SECONDS = float(os.getenv("SSL_BATCH_TIMEOUT_SECONDS", "10"))
+    # SSL probe: cert + header lewat satu koneksi TLS; redirect diikuti maksimal N hop (0 = tidak)
+    SSL_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SSL_CONNECT_TIMEOUT_SECONDS", "5"))
+    SSL_PROBE_METHOD = os.getenv("SSL_PROBE_METHOD", "HEAD")
+    SSL_FOLLOW_REDIRECTS = int(os.getenv("SSL_FOLLOW_REDIRECTS", "0"))
+    # SSL monitor: watchlist sertifikat yang dicek ulang terjadwal di background
+    SSL_MONITOR_ENABLED = os.getenv("SSL_MONITOR_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+    SSL_MONITOR_HOSTS = os.getenv("SSL_MONITOR_HOSTS", "")
+    SSL_MONITOR_FILE = os.getenv("SSL_MONITOR_FILE", "")
+    SSL_MONITOR_INTERVAL_SECONDS = int(os.getenv("SSL_MONITOR_INTERVAL_SECONDS", "21600"))
+    SSL_MONITOR_RETRY_SECONDS = int(os.getenv("SSL_MONITOR_RETRY_SECONDS", "300"))
+    SSL_MONITOR_WORKERS = int(os.getenv("SSL_MONITOR_WORKERS", "8"))
+    SSL_MONITOR_HISTORY = int(os.getenv("SSL_MONITOR_HISTORY", "30"))
+    SSL_MONITOR_WARN_DAYS = int(os.getenv("SSL_MONITOR_WARN_DAYS", "30"))
+    SSL_MONITOR_CRITICAL_DAYS = int(os.getenv("SSL_MONITOR_CRITICAL_DAYS", "7"))
+    SSL_MONITOR_MAX_HOSTS = int(os.getenv("SSL_MONITOR_MAX_HOSTS", "500"))
+
+    # YAML analyze (/api/yaml/analyze): cache hasil per hash konten
+    YAML_ANALYZE_CACHE_ENTRIES = int(os.getenv("YAML_ANALYZE_CACHE_ENTRIES", "256"))
+    YAML_ANALYZE_CACHE_MAX_MB = int(os.getenv("YAML_ANALYZE_CACHE_MAX_MB", "32"))
+    # Batas ukuran input semua endpoint YAML (413 jika lebih)
+    YAML_MAX_INPUT_MB = int(os.getenv("YAML_MAX_INPUT_MB", "16"))
+    # Mode per dokumen (/api/yaml/lint-documents): process pool (0 = min(4, CPU)),
+    # dipakai jika input >= YAML_STREAM_PARALLEL_MIN_KB; UI beralih ke mode ini mulai YAML_STREAM_THRESHOLD_KB
+    YAML_STREAM_WORKERS = int(os.getenv("YAML_STREAM_WORKERS", "0"))
+    YAML_STREAM_PARALLEL_MIN_KB = int(os.getenv("YAML_STREAM_PARALLEL_MIN_KB", "256"))
+    YAML_STREAM_THRESHOLD_KB = int(os.getenv("YAML_STREAM_THRESHOLD_KB", "512"))
+    # Sesi lint inkremental editor (/api/yaml/sessions): batas jumlah, total ukuran teks, idle timeout
+    YAML_SESSION_MAX = int(os.getenv("YAML_SESSION_MAX", "200"))
+    YAML_SESSION_MAX_MB = int(os.getenv("YAML_SESSION_MAX_MB", "64"))
+    YAML_SESSION_IDLE_SECONDS = int(os.getenv("YAML_SESSION_IDLE_SECONDS", "900"))
+
+    # Permission index: matrix user x repo per org, dibangun di background
+    PERMISSION_INDEX_ORGS = os.getenv("PERMISSION_INDEX_ORGS", "")
+    PERMISSION_INDEX_DIR = os.getenv("PERMISSION_INDEX_DIR", "")
+    PERMISSION_INDEX_INTERVAL_SECONDS = int(os.getenv("PERMISSION_INDEX_INTERVAL_SECONDS", "900"))
+    PERMISSION_INDEX_FULL_REFRESH_HOURS = int(os.getenv("PERMISSION_INDEX_FULL_REFRESH_HOURS", "24"))
+    PERMISSION_INDEX_WORKERS = int(os.getenv("PERMISSION_INDEX_WORKERS", "4"))
+    # Umur maksimum index yang masih dipakai halaman Access Check (lebih tua = cek live)
+    PERMISSION_INDEX_MAX_AGE_SECONDS = int(os.getenv("PERMISSION_INDEX_MAX_AGE_SECONDS", "3600"))
 
     # Feature Toggles
     ENABLE_REPO_SCANNER = os.getenv("ENABLE_REPO_SCANNER", "true").lower() in {"1", "true", "yes", "on"}
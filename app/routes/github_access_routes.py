@@ -1,5 +1,10 @@
 # app/routes/github_access_routes.py
-from flask import render_template, request, redirect, url_for, session, jsonify, current_app
+import json
+import time
+
+from flask import (
+    render_template, request, redirect, url_for, session, jsonify, current_app, stream_with_context
+)
 from app.routes import routes
 from app.utils.constants import (
     GITHUB_ACCESS_LOGIN_ROUTE,
@@ -7,7 +12,7 @@ from app.utils.constants import (
 )
 from app.utils.github_role_checker import (
     fetch_all_pages,
-    fetch_repositories,
+    iter_repositories,
     check_user_permissions
 )
 from app.utils.auth import (
@@ -20,10 +25,15 @@ from app.utils.auth import (
     reset_failed_attempts
 )
 from app.utils.github_access import process_github_access_form, GitHubAccessError, parse_repositories
-from app.utils.github_api import add_collaborator_to_repo, _get_auth_headers
+from app.utils.github_api import grant_access_bulk, github_user_exists
+from app.utils.github_client import get_github_client
+from app.utils.github_cache import get_github_cache
+from app.utils.permission_index import get_permission_indexer, ROLE_CODES
+from app.config import Config
 
 ERROR_INTERNAL_SERVER = "Terjadi kesalahan internal pada server"
 GITHUB_ACCESS_LOGIN_TEMPLATE = "github-access/github-access-login.html"
+NDJSON_MIMETYPE = "application/x-ndjson"
 
 ##########################################
 #   GitHub Access (Form & Logic)         #
@@ -48,20 +58,42 @@ def github_access_submit():
         access_role  = result['access_role']
         repos        = result['repositories']
 
-        github_results = []
-        for repo in repos:
-            api_result = add_collaborator_to_repo(
-                owner=organization, repo=repo, username=identifier, permission=access_role
-            )
-            github_results.append({"repo": repo, **api_result})
-
-        return jsonify({"success": True, "github_response": github_results}), 200
+        return _grant_response(organization, identifier, [(repo, access_role) for repo in repos])
     except GitHubAccessError as e:
         return jsonify({"success": False, "error": str(e)}), 400
     except Exception:
         current_app.logger.error("❌ Unhandled exception during GitHub Access Submit", exc_info=True)
         return jsonify({"success": False, "error": ERROR_INTERNAL_SERVER}), 500
 
+def _grant_response(organization, identifier, repo_roles):
+    """
+    Jalankan grant paralel. Client yang mengirim Accept: application/x-ndjson
+    menerima satu baris JSON per repo begitu selesai + baris ringkasan
+    {"type": "done"}; client lain menerima JSON lengkap seperti sebelumnya.
+    """
+    # Satu cek user di depan, agar 404 dari grant berarti repo tidak ditemukan
+    if github_user_exists(identifier) is False:
+        raise GitHubAccessError(f"GitHub user '{identifier}' not found.")
+
+    results = grant_access_bulk(organization, identifier, repo_roles)
+
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        def generate():
+            total = succeeded = 0
+            for r in results:
+                total += 1
+                succeeded += 1 if r["ok"] else 0
+                yield json.dumps({"type": "result", **r}) + "\n"
+            yield json.dumps({"type": "done", "total": total, "ok": succeeded, "failed": total - succeeded}) + "\n"
+
+        resp = current_app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"
+        return resp
+
+    github_results = sorted(results, key=lambda r: r["index"])
+    return jsonify({"success": True, "github_response": github_results}), 200
+
 @routes.route('/github-access/edit', methods=['POST'])
 def github_access_edit_page():
     if not session.get('access_granted'):
@@ -96,14 +128,10 @@ def github_access_apply_roles():
         if len(repos) != len(roles):
             raise GitHubAccessError("Mismatch between repositories and roles count.")
 
-        github_results = []
-        for repo_name, role_for_repo in zip(repos, roles):
-            api_result = add_collaborator_to_repo(
-                owner=organization, repo=repo_name, username=identifier, permission=role_for_repo
-            )
-            github_results.append({"repo": repo_name, **api_result})
+        if not identifier or not organization or not repos:
+            raise GitHubAccessError("Username, Repositories, and Organization are required.")
 
-        return jsonify({"success": True, "github_response": github_results})
+        return _grant_response(organization, identifier, list(zip(repos, roles)))
     except GitHubAccessError as e:
         return jsonify({"success": False, "error": str(e)}), 400
     except Exception:
@@ -159,6 +187,37 @@ def github_access_check_form():
         return redirect(url_for(GITHUB_ACCESS_LOGIN_ROUTE))
     return render_template('github-access/github-access-check.html')
 
+def _check_from_index(org, username, mode, team_slugs, engine):
+    """
+    Jawab dari permission index jika engine kosong/"index" dan index org cukup baru.
+    Return (results, built_ts) atau (None, None) jika harus cek live.
+    """
+    if engine not in (None, "index"):
+        return None, None
+    indexer = get_permission_indexer()
+    matrix = indexer.matrix(org, Config.PERMISSION_INDEX_MAX_AGE_SECONDS) if indexer else None
+    if matrix is None:
+        if engine == "index":
+            current_app.logger.info(f"No fresh permission index for {org}; checking live.")
+        return None, None
+
+    results = matrix.user_permissions(username)
+    if results is None:
+        # Tidak ada di index: user tanpa akses ke repo mana pun, atau login yang tidak ada.
+        # Samakan dengan engine live: found/none vs not_found per repo.
+        exists = github_user_exists(username)
+        if exists is None:
+            return None, None
+        status, role = ("found", "none") if exists else ("not_found", "-")
+        results = [{"repo": repo, "status": status, "role": role} for repo in matrix.repos()]
+    if mode == "team":
+        # Index tidak menyimpan team: batasi ke repo milik team (listing ter-cache ETag)
+        team_repos = {r.get("name") for r in iter_repositories(org, mode, team_slugs)}
+        results = [r for r in results if r["repo"] in team_repos]
+    elif mode != "all":
+        raise ValueError("Invalid mode. Must be 'all' or 'team'.")
+    return results, matrix.built_ts
+
 @routes.route('/github-access-check', methods=['POST'])
 def github_access_check():
     if not session.get('access_granted'):
@@ -169,20 +228,25 @@ def github_access_check():
     org        = request.form.get("organization", "").strip()
     mode       = request.form.get("mode")
     team_slugs = request.form.getlist("team_slug")
+    engine     = request.form.get("engine") or None
 
     if not username or not org:
         return "Username and organization are required.", 400
 
     try:
-        repos   = fetch_repositories(org, mode, team_slugs)
-        results = check_user_permissions(org, username, repos)
+        results, index_ts = _check_from_index(org, username, mode, team_slugs, engine)
+        if results is None:
+            # Stream repo: permission check jalan paralel dengan fetch halaman berikutnya
+            repos   = iter_repositories(org, mode, team_slugs)
+            results = check_user_permissions(org, username, repos, engine=None if engine == "index" else engine)
         filtered_results = [
             r for r in results
             if not (r["status"] == "found" and (r["role"] is None or r["role"] == "-" or r["role"].lower() == "none"))
         ]
         return render_template(
             "github-access/github-access-result.html",
-            username=username, org=org, mode=mode, team_slug=team_slugs, results=filtered_results
+            username=username, org=org, mode=mode, team_slug=team_slugs, results=filtered_results,
+            index_age_min=int((time.time() - index_ts) // 60) if index_ts else None
         )
     except Exception:
         current_app.logger.error("❌ Error during GitHub Access Check", exc_info=True)
@@ -194,11 +258,9 @@ def github_teams():
     if not org:
         return jsonify({"error": "Organization is required."}), 400
 
-    # [PERUBAHAN] Gunakan helper central, jangan hardcode Env variable
-    headers = _get_auth_headers()
-
     try:
-        teams = fetch_all_pages(f"https://api.github.com/orgs/{org}/teams", headers=headers)
+        # Auth & koneksi dari GitHubClient bersama
+        teams = fetch_all_pages(f"https://api.github.com/orgs/{org}/teams")
         return jsonify([
             {"slug": team["slug"], "name": team["name"]}
             for team in teams if "slug" in team and "name" in team
@@ -206,3 +268,46 @@ def github_teams():
     except Exception:
         current_app.logger.error("❌ Error fetching GitHub teams", exc_info=True)
         return jsonify({"error": "Terjadi kesalahan internal pada server"}), 500
+
+@routes.route('/github-access/rate-limit', methods=['GET'])
+def github_rate_limit_status():
+    """Budget rate limit GitHub per resource, konkurensi adaptif, antrian & cache ETag."""
+    if not session.get('access_granted'):
+        return jsonify({"success": False, "error": "Not authenticated"}), 401
+    stats = get_github_client().rate_limiter.stats()
+    cache = get_github_cache()
+    stats["cache"] = cache.stats() if cache else None
+    return jsonify(stats)
+
+@routes.route('/github-access/index/repo', methods=['GET'])
+def github_permission_index_repo():
+    """Reverse query dari permission index: siapa yang punya akses >= role di repo."""
+    if not session.get('access_granted'):
+        return jsonify({"success": False, "error": "Not authenticated"}), 401
+    org  = request.args.get("org", "").strip()
+    repo = request.args.get("repo", "").strip()
+    role = request.args.get("role", "read").strip().lower()
+    if not org or not repo:
+        return jsonify({"success": False, "error": "org and repo are required."}), 400
+    if role not in ROLE_CODES or role == "none":
+        return jsonify({"success": False, "error": f"Invalid role '{role}'."}), 400
+
+    indexer = get_permission_indexer()
+    matrix = indexer.matrix(org) if indexer else None
+    if matrix is None:
+        return jsonify({"success": False, "error": f"Organization '{org}' is not indexed."}), 404
+    collaborators = matrix.repo_collaborators(repo, role)
+    if collaborators is None:
+        return jsonify({"success": False, "error": f"Repository '{repo}' is not in the index."}), 404
+    return jsonify({
+        "success": True, "org": org, "repo": repo, "min_role": role,
+        "built_ts": matrix.built_ts, "collaborators": collaborators,
+    })
+
+@routes.route('/github-access/index/status', methods=['GET'])
+def github_permission_index_status():
+    """Status permission indexer: ukuran matrix per org & hasil refresh terakhir."""
+    if not session.get('access_granted'):
+        return jsonify({"success": False, "error": "Not authenticated"}), 401
+    indexer = get_permission_indexer()
+    return jsonify(indexer.stats() if indexer else {"orgs": [], "running": False})
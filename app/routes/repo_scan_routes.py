@@ -1,6 +1,9 @@
 # app/routes/repo_scan_routes.py
 import os
-from typing import Dict, Any, Optional, Tuple
+import json
+import time
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 from flask import (
     render_template,
@@ -9,13 +12,23 @@ from flask import (
     send_from_directory,
     current_app,
     url_for,
+    stream_with_context,
 )
 from flask_wtf.csrf import generate_csrf
 
+from app.config import Config
 from app.routes import routes  # Existing Blueprint
-from app.tasks import create_task, task_statuses
+from app.tasks import create_task, task_store, task_logs, get_scan_metrics
 from app.utils.validators import extract_form_data, validate_request
 
+# Fields a coalesced duplicate task takes from its primary task
+_SHARED_FIELDS = ("status", "sonar_url", "screenshot_info", "log", "log_size", "commit_sha", "reused")
+
+# Status streaming (SSE / long-poll)
+_STREAM_MAX_IDS = 50
+_STREAM_HEARTBEAT_S = 15.0
+_stream_slots = threading.BoundedSemaphore(max(1, Config.STATUS_STREAM_MAX_CLIENTS))
+
 # Screenshot directory (inside static/screenshots)
 # Use current_app.root_path at runtime for consistency in container/venv
 
@@ -79,6 +92,7 @@ def repo_scan():
 
     exclusions = (request.form.get("sonar_exclusions") or "").strip()
     inclusions = (request.form.get("sonar_inclusions") or "").strip()
+    force_rescan = request.form.get("force_rescan") in {"1", "true", "on", "yes"}
 
     task_id = create_task(
         repo_url,
@@ -86,6 +100,7 @@ def repo_scan():
         project_key,
         exclusions=exclusions,
         inclusions=inclusions,
+        force_rescan=force_rescan,
     )
 
     return jsonify({
@@ -95,41 +110,216 @@ def repo_scan():
     }), 200
 
 
-@routes.route("/status/<task_id>", methods=["GET"])
-def task_status_route(task_id):
-    task_info = task_statuses.get(task_id)
+def _resolve_task(task_id: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Returns (task_info, watched_ids). Coalesced duplicate tasks take
+    status/results from their primary, so both IDs are watched for changes.
+    """
+    task_info = task_store.get(task_id)
     if not task_info:
-        return jsonify({"error": "Invalid task ID"}), 404
+        return None, [task_id]
+
+    coalesced_into = task_info.get("coalesced_into")
+    if not coalesced_into:
+        return task_info, [task_id]
+
+    primary = task_store.get(coalesced_into)
+    if primary:
+        task_info = {**task_info, **{k: primary.get(k) for k in _SHARED_FIELDS}}
+    return task_info, [task_id, coalesced_into]
 
+
+def _status_payload(task_id: str, task_info: Dict[str, Any], include_log: bool = False) -> Dict[str, Any]:
     # Form screenshot info for FE (has display_url & filename)
     screenshot_info = _shape_screenshot_info(task_info)
 
     # Handle log: default DO NOT send full log. FE only needs meta to avoid filling localStorage
-    include_log = request.args.get("include_log") == "1"
     raw_log = task_info.get("log")
     if include_log:
         # if requested, send log with safe truncation (e.g. 50KB)
-        log_snippet, total_size = _truncate_log(raw_log)
-        log_payload = log_snippet
+        log_payload, total_size = _truncate_log(raw_log)
     else:
-        # do not send log body, only meta
+        # do not send log body, only meta (log_size is computed when the log is written)
         log_payload = None
-        total_size = len(raw_log.encode("utf-8", errors="ignore")) if raw_log else 0
+        total_size = task_info.get("log_size")
+        if total_size is None:
+            total_size = len(raw_log.encode("utf-8", errors="ignore")) if raw_log else 0
 
-    response = {
+    return {
         "task_id": task_id,
         "status": task_info.get("status", "Unknown"),
         "sonar_url": task_info.get("sonar_url"),
         "screenshot_info": screenshot_info,
+        # True jika commit ini sudah pernah dianalisis (scan dilewati)
+        "reused": bool(task_info.get("reused")),
+        "commit_sha": task_info.get("commit_sha"),
+        # Dedup: primary task (jika task ini duplikat) / task yang ikut job ini
+        "coalesced_into": task_info.get("coalesced_into"),
+        "coalesced_task_ids": task_info.get("coalesced_task_ids") or [],
         # Lightweight log meta for FE
         "has_log": bool(raw_log),
         "log_size": total_size,
         # Send log only when include_log=1
         "log": log_payload,
     }
-    return jsonify(response)
 
 
+def _status_etag(versions: Dict[str, int], include_log: bool) -> str:
+    # Versions only compare within one epoch (a process for the memory store, a DB file for SQLite)
+    tag = "-".join(str(versions[tid]) for tid in sorted(versions))
+    return f'"{task_store.version_epoch}-{tag}{"-log" if include_log else ""}"'
+
+
+def _is_terminal(status: Optional[str]) -> bool:
+    s = status or ""
+    return s.startswith("Completed") or s.startswith("Failed")
+
+
+@routes.route("/status/<task_id>", methods=["GET"])
+def task_status_route(task_id):
+    """
+    Task status with ETag. Clients send If-None-Match and get 304 while the task is unchanged.
+    With ?wait=<seconds>, an unchanged task is held (long-poll) until it changes or the
+    wait expires.
+    """
+    include_log = request.args.get("include_log") == "1"
+    task_info, watched = _resolve_task(task_id)
+    if not task_info:
+        return jsonify({"error": "Invalid task ID"}), 404
+
+    versions = task_store.versions(watched)
+    etag = _status_etag(versions, include_log)
+
+    if etag in _if_none_match() and not _is_terminal(task_info.get("status")):
+        wait_s = min(request.args.get("wait", 0, type=float) or 0, Config.STATUS_STREAM_MAX_SECONDS)
+        if wait_s > 0 and _stream_slots.acquire(blocking=False):
+            try:
+                versions = task_store.wait_for_change(versions, wait_s)
+            finally:
+                _stream_slots.release()
+            etag = _status_etag(versions, include_log)
+            task_info, _ = _resolve_task(task_id)
+
+    if not task_info:
+        return jsonify({"error": "Invalid task ID"}), 404
+    if etag in _if_none_match():
+        resp = current_app.response_class(status=304)
+    else:
+        resp = jsonify(_status_payload(task_id, task_info, include_log))
+    resp.headers["ETag"] = etag
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@routes.get("/status/<task_id>/log")
+def task_log_route(task_id):
+    """
+    Live scanner log by offset: /status/<id>/log?from=<byte offset>&limit=<bytes>.
+    The response has data plus next (the offset for the next request) and complete.
+    With ?wait=<seconds>, the request waits for new output when none is ready yet.
+    """
+    task_info = task_store.get(task_id)
+    if not task_info:
+        return jsonify({"error": "Invalid task ID"}), 404
+    # Coalesced duplicate: the log belongs to the primary task
+    log_task_id = task_info.get("coalesced_into") or task_id
+
+    offset = max(0, request.args.get("from", 0, type=int) or 0)
+    limit = request.args.get("limit", 64 * 1024, type=int) or 64 * 1024
+    wait_s = min(request.args.get("wait", 0, type=float) or 0, Config.STATUS_STREAM_MAX_SECONDS)
+
+    live = task_logs.get(log_task_id)
+    if live is not None and wait_s > 0 and _stream_slots.acquire(blocking=False):
+        try:
+            live.wait_for_data(offset, wait_s)
+        finally:
+            _stream_slots.release()
+
+    chunk = task_logs.read(log_task_id, offset, limit)
+    if chunk is None:
+        # Scan has not started yet, or the log expired
+        terminal = _is_terminal(task_info.get("status"))
+        chunk = {"from": offset, "next": offset, "size": 0 if terminal else None,
+                 "complete": terminal, "data": ""}
+    resp = jsonify({"task_id": task_id, **chunk})
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+def _if_none_match() -> List[str]:
+    raw = request.headers.get("If-None-Match") or ""
+    return [t.strip().removeprefix("W/") for t in raw.split(",") if t.strip()]
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@routes.get("/status/stream")
+def task_status_stream():
+    """
+    Server-Sent Events for several tasks: /status/stream?ids=<id1>,<id2>.
+    Sends a "status" event only when a task changes. Sends "done" once every task
+    is terminal. The stream closes after STATUS_STREAM_MAX_SECONDS and EventSource
+    reconnects.
+    """
+    ids = [t for t in (request.args.get("ids") or "").split(",") if t][:_STREAM_MAX_IDS]
+    if not ids:
+        return jsonify({"error": "ids is required"}), 400
+    # Each open stream holds a server thread; over the limit, clients fall back to polling
+    if not _stream_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many status streams, use polling."}), 503
+
+    max_seconds = Config.STATUS_STREAM_MAX_SECONDS
+
+    def generate():
+        try:
+            deadline = time.monotonic() + max_seconds
+            sent: Dict[str, str] = {}
+            known: Dict[str, int] = {}
+            yield "retry: 3000\n\n"
+            while True:
+                pending = 0
+                for tid in ids:
+                    task_info, watched = _resolve_task(tid)
+                    versions = task_store.versions(watched)
+                    known.update(versions)
+                    etag = _status_etag(versions, False)
+                    if sent.get(tid) == etag:
+                        if task_info and not _is_terminal(task_info.get("status")):
+                            pending += 1
+                        continue
+                    sent[tid] = etag
+                    if not task_info:
+                        yield _sse("status", {"task_id": tid, "status": "Not Found"})
+                        continue
+                    yield _sse("status", _status_payload(tid, task_info))
+                    if not _is_terminal(task_info.get("status")):
+                        pending += 1
+
+                if not pending:
+                    yield _sse("done", {"task_ids": ids})
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                latest = task_store.wait_for_change(dict(known), min(remaining, _STREAM_HEARTBEAT_S))
+                if latest == known:
+                    # Heartbeat keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            _stream_slots.release()
+
+    resp = current_app.response_class(stream_with_context(generate()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@routes.get("/repo-scan/metrics")
+def repo_scan_metrics():
+    """Queue depth and browser pool usage (pool size, wait times, recycles)."""
+    return jsonify(get_scan_metrics())
 
 
 @routes.route("/download/screenshots/<path:filename>")
@@ -1,9 +1,15 @@
 # app/routes/tools_routes.py
-from flask import render_template, request, redirect, url_for, jsonify, current_app
+import json
+import time
+
+from flask import render_template, request, redirect, url_for, jsonify, current_app, stream_with_context
 from app import csrf
 from app.routes import routes  # gunakan Blueprint yang sama
-from app.utils.linter_service import run_yaml_linting, auto_fix_yaml
+from app.utils.linter_service import run_yaml_linting, auto_fix_yaml, analyze_yaml, lint_documents
 from app.utils.ssl_service import get_ssl_details
+from app.utils.ssl_batch import parse_targets, check_ssl_batch
+from app.utils.ssl_monitor import get_ssl_monitor
+from app.utils.yaml_lint_session import SessionConflict, get_lint_session_store
 from app.config import Config
 
 def _clean_url(value: str | None) -> str | None:
@@ -70,6 +76,15 @@ TOOLS_DATA = [
         "url_endpoint": "routes.ssl_checker",
         "category": "Security"
     },
+    {
+        "title": "SSL Monitor",
+        "desc": "Pantau masa berlaku sertifikat banyak host secara terjadwal.",
+        "icon": "bi-calendar2-check",
+        "color": "emerald",
+        "url_endpoint": "routes.ssl_monitor",
+        "category": "Security",
+        "condition": Config.SSL_MONITOR_ENABLED
+    },
     {
         "title": "Diff Checker",
         "desc": "Bandingkan dua teks dan lihat perbedaannya.",
@@ -307,6 +322,131 @@ def ssl_checker_api():
         
     return jsonify({"success": True, "result": result})
 
+@routes.route("/api/tools/ssl-check/batch", methods=["POST"])
+@csrf.exempt
+def ssl_checker_batch_api():
+    """
+    Body: {"targets": ["example.com", "host:8443", "https://url", ...]}
+    Response NDJSON: satu baris {"type": "result", ...} per target begitu selesai
+    (urutan selesai; "index" = posisi input), lalu {"type": "done", ...}.
+    """
+    data = request.get_json(silent=True) or {}
+    raw_targets = data.get("targets") or data.get("domains")
+    if isinstance(raw_targets, str):
+        raw_targets = raw_targets.replace(",", "\n").split()
+    if not isinstance(raw_targets, list):
+        return jsonify({"success": False, "error": "targets must be a list of hostnames"}), 400
+
+    targets = parse_targets(raw_targets)
+    if not targets:
+        return jsonify({"success": False, "error": "At least one target is required"}), 400
+    if len(targets) > Config.SSL_BATCH_MAX_TARGETS:
+        return jsonify({
+            "success": False,
+            "error": f"Too many targets ({len(targets)}); maximum is {Config.SSL_BATCH_MAX_TARGETS}"
+        }), 413
+
+    def generate():
+        started = time.monotonic()
+        ok = 0
+        for item in check_ssl_batch(targets, Config.SSL_BATCH_CONCURRENCY, Config.SSL_BATCH_TIMEOUT_SECONDS):
+            result = item["result"]
+            # Sama dengan endpoint tunggal: error tanpa detail sertifikat = gagal
+            success = not (result.get("error") and not result.get("details"))
+            ok += 1 if success else 0
+            yield json.dumps({"type": "result", "success": success, **item}) + "\n"
+        yield json.dumps({
+            "type": "done",
+            "total": len(targets),
+            "ok": ok,
+            "failed": len(targets) - ok,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+        }) + "\n"
+
+    resp = current_app.response_class(stream_with_context(generate()), mimetype="application/x-ndjson")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+##########################################
+#           SSL Monitor                  #
+##########################################
+
+def _monitor_or_404():
+    monitor = get_ssl_monitor()
+    if monitor is None:
+        return None, (jsonify({"success": False, "error": "SSL monitor is disabled"}), 404)
+    return monitor, None
+
+@routes.route("/ssl-monitor")
+def ssl_monitor():
+    if get_ssl_monitor() is None:
+        return redirect(url_for("routes.landing"))
+    return render_template("tools/ssl-monitor.html")
+
+@routes.route("/api/tools/ssl-monitor", methods=["GET"])
+def ssl_monitor_feed():
+    """
+    Feed watchlist dari cache (tidak ada cek jaringan), terurut expiry.
+    Query: page, per_page (maks 200), status (expired/error/critical/warning/ok/pending), q.
+    """
+    monitor, error = _monitor_or_404()
+    if error:
+        return error
+    feed = monitor.feed(
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 50, type=int),
+        status=request.args.get("status") or None,
+        query=(request.args.get("q") or "").strip() or None,
+    )
+    return jsonify({"success": True, **feed, "monitor": monitor.stats()})
+
+@routes.route("/api/tools/ssl-monitor/hosts", methods=["POST"])
+def ssl_monitor_add():
+    """Body: {"targets": ["example.com", "host:8443", ...]} (atau string dipisah koma/baris)."""
+    monitor, error = _monitor_or_404()
+    if error:
+        return error
+    data = request.get_json(silent=True) or {}
+    raw_targets = data.get("targets")
+    if isinstance(raw_targets, str):
+        raw_targets = raw_targets.replace(",", "\n").split()
+    if not isinstance(raw_targets, list):
+        return jsonify({"success": False, "error": "targets must be a list of hostnames"}), 400
+    targets = parse_targets(raw_targets)
+    if not targets:
+        return jsonify({"success": False, "error": "At least one target is required"}), 400
+
+    result = monitor.add(targets)
+    if result["rejected"] and not result["added"]:
+        return jsonify({
+            "success": False,
+            "error": f"Watchlist is full (maximum {monitor.max_hosts} hosts)",
+            **result
+        }), 413
+    return jsonify({"success": True, **result})
+
+@routes.route("/api/tools/ssl-monitor/hosts/<target>", methods=["DELETE"])
+def ssl_monitor_remove(target):
+    monitor, error = _monitor_or_404()
+    if error:
+        return error
+    if not monitor.remove(target):
+        return jsonify({"success": False, "error": "Host is not on the watchlist"}), 404
+    return jsonify({"success": True})
+
+@routes.route("/api/tools/ssl-monitor/recheck", methods=["POST"])
+def ssl_monitor_recheck():
+    """Body opsional: {"target": "host:port"}; tanpa target = semua host. Cek berjalan di background."""
+    monitor, error = _monitor_or_404()
+    if error:
+        return error
+    target = (request.get_json(silent=True) or {}).get("target")
+    scheduled = monitor.recheck(target)
+    if target and not scheduled:
+        return jsonify({"success": False, "error": "Host is not on the watchlist"}), 404
+    return jsonify({"success": True, "scheduled": scheduled}), 202
+
 ##########################################
 #           Redirect Tools               #
 ##########################################
@@ -358,6 +498,19 @@ def json_beautify():
 #           YAML Linter                  #
 ##########################################
 
+YAML_MIMETYPES = {"application/yaml", "application/x-yaml", "text/yaml", "text/x-yaml", "text/plain"}
+
+def _yaml_too_large(content: str | None = None):
+    """Response 413 jika body/konten melebihi YAML_MAX_INPUT_MB, selain itu None."""
+    limit = Config.YAML_MAX_INPUT_MB * 1024 * 1024
+    size = request.content_length if content is None else len(content.encode("utf-8"))
+    if size is not None and size > limit:
+        return jsonify({
+            "success": False,
+            "error": f"Konten terlalu besar ({size / 1024 / 1024:.1f} MB); maksimum {Config.YAML_MAX_INPUT_MB} MB."
+        }), 413
+    return None
+
 @routes.route('/yaml-linter', methods=['GET', 'POST'])
 @csrf.exempt
 def yaml_linter():
@@ -365,6 +518,9 @@ def yaml_linter():
         return render_template('tools/yaml-linter.html', title="YAML Linter")
 
     # POST
+    too_large = _yaml_too_large()
+    if too_large:
+        return too_large
     content = request.json.get('content', '')
     if not content:
         return jsonify({"success": False, "error": "Konten tidak boleh kosong."}), 400
@@ -374,9 +530,133 @@ def yaml_linter():
     except Exception as e:
         return jsonify({"success": False, "error": f"Terjadi kesalahan internal: {str(e)}"}), 500
 
+@routes.route('/api/yaml/analyze', methods=['POST'])
+@csrf.exempt
+def yaml_analyze():
+    """
+    Lint + auto-fix dalam satu request (satu parse, hasil di-cache per hash konten).
+    Response: {"success", "results" (format /yaml-linter), "fixed_content", "cached"}
+    """
+    too_large = _yaml_too_large()
+    if too_large:
+        return too_large
+    content = (request.get_json(silent=True) or {}).get('content', '')
+    if not content:
+        return jsonify({"success": False, "error": "Konten tidak boleh kosong."}), 400
+    try:
+        analysis = analyze_yaml(content)
+        return jsonify({"success": True, **analysis})
+    except Exception as e:
+        current_app.logger.error("Error during YAML analyze", exc_info=True)
+        return jsonify({"success": False, "error": f"Terjadi kesalahan internal: {str(e)}"}), 500
+
+@routes.route('/api/yaml/lint-documents', methods=['POST'])
+@csrf.exempt
+def yaml_lint_documents():
+    """
+    Lint per dokumen untuk manifest multi-dokumen besar.
+    Body: JSON {"content": "...", "fix": bool} atau YAML mentah (Content-Type text/yaml, ?fix=1).
+    Response NDJSON: satu baris {"type": "document", ...} per dokumen (urut input,
+    nomor baris absolut), lalu {"type": "done", ...}.
+    """
+    too_large = _yaml_too_large()
+    if too_large:
+        return too_large
+    if request.mimetype in YAML_MIMETYPES:
+        content = request.get_data(as_text=True)
+        fix = request.args.get("fix", "").lower() in {"1", "true", "yes"}
+    else:
+        data = request.get_json(silent=True) or {}
+        content = data.get('content', '')
+        fix = bool(data.get('fix'))
+    if not content or not content.strip():
+        return jsonify({"success": False, "error": "Konten tidak boleh kosong."}), 400
+    # Body chunked tidak punya Content-Length: cek ulang dari konten
+    too_large = _yaml_too_large(content)
+    if too_large:
+        return too_large
+
+    def generate():
+        started = time.monotonic()
+        counts = {"PERFECT": 0, "VALID_WITH_ISSUES": 0, "INVALID_SYNTAX": 0}
+        problems = 0
+        try:
+            for doc in lint_documents(content, fix=fix):
+                counts[doc["status"]] += 1
+                problems += len(doc.get("problems", []))
+                yield json.dumps(doc) + "\n"
+        except Exception as e:
+            current_app.logger.error("Error during per-document YAML lint", exc_info=True)
+            yield json.dumps({"type": "error", "error": f"Terjadi kesalahan internal: {str(e)}"}) + "\n"
+            return
+        if counts["INVALID_SYNTAX"]:
+            status = "INVALID_SYNTAX"
+        else:
+            status = "VALID_WITH_ISSUES" if problems else "PERFECT"
+        yield json.dumps({
+            "type": "done",
+            "status": status,
+            "documents": sum(counts.values()),
+            "counts": counts,
+            "problems": problems,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+        }) + "\n"
+
+    resp = current_app.response_class(stream_with_context(generate()), mimetype="application/x-ndjson")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+@routes.route('/api/yaml/sessions', methods=['POST'])
+@csrf.exempt
+def yaml_session_open():
+    """
+    Buka sesi lint inkremental untuk editor. Body: {"content": "..."}.
+    Response: {"session_id", "version", "added" (semua diagnostik), "removed", "total", "status"}
+    """
+    too_large = _yaml_too_large()
+    if too_large:
+        return too_large
+    content = (request.get_json(silent=True) or {}).get('content')
+    if not isinstance(content, str):
+        return jsonify({"success": False, "error": "content wajib diisi."}), 400
+    session_id, result = get_lint_session_store().open(content)
+    return jsonify({"success": True, "session_id": session_id, **result}), 201
+
+@routes.route('/api/yaml/sessions/<session_id>/changes', methods=['POST'])
+@csrf.exempt
+def yaml_session_changes(session_id):
+    """
+    Terapkan delta CodeMirror dan lint ulang dokumen yang tersentuh.
+    Body: {"version": n, "changes": [{"from": {line, ch}, "to": {line, ch}, "text": [...]}, ...]}
+    Response: diff diagnostik {"version", "added", "removed", "total", "status", "relinted", "lint_ms"}.
+    404 = sesi tidak ada (kedaluwarsa), 409 = versi/delta tidak cocok: client membuka sesi baru.
+    """
+    data = request.get_json(silent=True) or {}
+    changes = data.get('changes')
+    version = data.get('version')
+    if not isinstance(changes, list) or not isinstance(version, int):
+        return jsonify({"success": False, "error": "version dan changes wajib diisi."}), 400
+    try:
+        result = get_lint_session_store().update(session_id, version, changes)
+    except SessionConflict as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    if result is None:
+        return jsonify({"success": False, "error": "Sesi tidak ditemukan atau kedaluwarsa."}), 404
+    return jsonify({"success": True, **result})
+
+@routes.route('/api/yaml/sessions/<session_id>', methods=['DELETE'])
+@csrf.exempt
+def yaml_session_close(session_id):
+    get_lint_session_store().close(session_id)
+    return jsonify({"success": True})
+
 @routes.route('/tools/yaml-autofix', methods=['POST'])
 @csrf.exempt
 def yaml_autofix():
+    too_large = _yaml_too_large()
+    if too_large:
+        return too_large
     content = request.json.get('content', '')
     if not content:
         return jsonify({"success": False, "error": "Konten tidak boleh kosong."}), 400
@@ -1,34 +1,80 @@
 # app/utils/task.py
 
+import heapq
 import threading
 import queue
 import uuid
+import time
 import logging
-import os
 import traceback
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
-from app.utils.git_sonar import clone_and_scan, QualityGateFailed
-from app.utils.screenshot_service import take_sonar_screenshot
+from app.utils.git_sonar import clone_and_scan, QualityGateFailed, repo_cache_stats, get_scan_index
+from app.utils.screenshot_service import take_sonar_screenshot, screenshot_exists
+from app.utils.browser_pool import browser_pool_stats, shutdown_browser_pool
+from app.utils.sonar_readiness import check_analysis, latest_analysis_revision
+from app.utils.task_store import TaskStore, create_task_store
+from app.utils.task_log import TaskLogRegistry, DEFAULT_LOG_DIR
+from app.utils.scan_scheduler import create_scan_scheduler
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 
-# Konfigurasi Batas Riwayat Task (Mencegah Memory Leak)
-MAX_TASK_HISTORY = 100 
+# Status task (SQLite/WAL default, TTL-based eviction; lihat TASK_STORE_BACKEND)
+task_store: TaskStore = create_task_store(
+    Config.TASK_STORE_BACKEND,
+    path=Config.TASK_STORE_PATH or None,
+    ttl_hours=Config.TASK_TTL_HOURS,
+)
 
-# Status task di-memory
-task_statuses: Dict[str, Dict[str, Any]] = {}
+# Log live sonar-scanner per task (ring buffer di memori + spill gzip)
+task_logs = TaskLogRegistry(
+    Config.TASK_LOG_DIR or DEFAULT_LOG_DIR,
+    buffer_bytes=Config.TASK_LOG_BUFFER_KB * 1024,
+    max_closed=Config.TASK_LOG_MAX_BUFFERS,
+    ttl_seconds=max(0, Config.TASK_TTL_HOURS) * 3600,
+)
 
-# Antrian job
+# Antrian job (stage clone+scan)
 task_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
 
+# Antrian stage screenshot (bounded -> backpressure ke scan worker)
+screenshot_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(
+    maxsize=max(1, Config.SCREENSHOT_QUEUE_SIZE)
+)
+
+# Stage readiness: shot yang menunggu CE task SonarQube, (waktu cek berikutnya, seq, shot).
+# Satu thread mem-polling semuanya, jadi slot screenshot tidak terpakai untuk menunggu
+_readiness_heap: List[Tuple[float, int, Dict[str, Any]]] = []
+_readiness_cv = threading.Condition()
+_readiness_seq = 0
+# Shot di stage readiness (di heap atau sedang dicek); ikut dihitung saat drain shutdown
+_readiness_waiting = 0
+READINESS_POLL_SECONDS = 1.0
+READINESS_MAX_POLL_SECONDS = 5.0
+
 # Worker management
 _worker_started = False
 _worker_lock = threading.Lock()
 # Ambil dari Config
-_num_workers = int(os.getenv("WORKER_CONCURRENCY", "1"))
+_num_workers = max(1, Config.WORKER_CONCURRENCY)
+_num_screenshot_workers = max(1, Config.SCREENSHOT_CONCURRENCY)
+_handoff_blocked_ms = 0
+# Diset saat shutdown: job yang diambil dari antrian setelah ini tidak dikerjakan
+_stopping = threading.Event()
+
+# Dedup job yang sedang queued/running:
+# (repo_url, branch, project_key, exclusions, inclusions) -> {"task_id", "followers"}
+_inflight: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+_inflight_lock = threading.Lock()
+_coalesced_total = 0
+
+# Admission control per stage (clone/scan/screenshot) berdasarkan budget RAM/CPU
+scheduler = create_scan_scheduler()
+
+# Status akhir job yang dihentikan oleh shutdown server
+SHUTDOWN_STATUS = "Failed: Server Shutdown"
 
 # Area screenshot default (px)
 DEFAULT_CLIP_RECT = {
@@ -38,50 +84,56 @@ DEFAULT_CLIP_RECT = {
     "height": 840,
 }
 
-def _cleanup_old_tasks():
+def _run_scan_stage(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
-    Menghapus task lama jika jumlah task di memori melebihi MAX_TASK_HISTORY.
-    Python 3.7+ dictionary itu ordered, jadi yang pertama masuk = yang pertama dihapus.
+    Stage 1: clone + scan. Return job screenshot untuk stage berikutnya,
+    atau None jika scan gagal total (tidak ada yang bisa di-screenshot).
     """
-    if len(task_statuses) > MAX_TASK_HISTORY:
-        # Hitung berapa yang harus dibuang
-        excess = len(task_statuses) - MAX_TASK_HISTORY
-        keys_to_remove = list(task_statuses.keys())[:excess]
-        for k in keys_to_remove:
-            del task_statuses[k]
-        logger.debug(f"Cleaned up {len(keys_to_remove)} old tasks from memory.")
-
-def _process_job(job: Dict[str, Any]) -> None:
     task_id: str = job["task_id"]
     repo_url: str = job["repo_url"]
     branch_name: str = job["branch_name"]
     project_key: str = job["project_key"]
     exclusions: Optional[str] = job.get("exclusions") or ""
     inclusions: Optional[str] = job.get("inclusions") or ""
-    clip_rect: Dict[str, int] = job.get("clip_rect") or DEFAULT_CLIP_RECT
 
     logger.info(f"--- WORKER START: task={task_id} proj={project_key} branch={branch_name} ---")
     
     # Update status awal
-    task_statuses[task_id]["status"] = "Running"
+    task_store.update(task_id, status="Running")
     
-    sonar_url = None
     final_status = "Completed" # Default jika sukses
     error_msg = None
+    commit_sha = None
+    reused = False
+    cached_screenshot = None
+
+    live_log = task_logs.open(task_id)
+    live_log.append(f"[task] Scanning {repo_url} (branch={branch_name}) as {project_key}")
 
     try:
-        # 1. Jalankan Scan
         # per_job_cache=True wajib agar aman jika nanti multi-worker
-        sonar_url = clone_and_scan(
+        scan_result = clone_and_scan(
             repo_url, branch_name, project_key,
             exclusions=exclusions, inclusions=inclusions,
-            per_job_cache=True
+            per_job_cache=True,
+            stage_gate=scheduler.stage,
+            force_rescan=bool(job.get("force_rescan")),
+            line_sink=live_log.append,
         )
+        sonar_url = scan_result.sonar_url
+        ce_task_id = scan_result.ce_task_id
+        commit_sha = scan_result.commit_sha
+        reused = scan_result.reused
+        cached_screenshot = scan_result.screenshot_info
 
     except QualityGateFailed as qgf:
         # Scan sukses tapi tidak lolos standar kualitas
         # Kita tetap punya URL dashboard untuk di-screenshot
         sonar_url = qgf.url
+        ce_task_id = qgf.ce_task_id
+        commit_sha = qgf.commit_sha
+        reused = qgf.reused
+        cached_screenshot = qgf.screenshot_info
         final_status = "Failed: Quality Gate"
         error_msg = "Quality Gate Failed. Please check the SonarQube dashboard."
         logger.warning(f"Task {task_id} Quality Gate Failed.")
@@ -90,53 +142,393 @@ def _process_job(job: Dict[str, Any]) -> None:
         # Error fatal (git error, koneksi putus, scanner crash)
         tb = traceback.format_exc()
         logger.error(f"--- WORKER ERROR: task={task_id} ---\n{tb}")
-        task_statuses[task_id]["status"] = "Failed: An error occurred"
-        task_statuses[task_id]["log"] = f"Error: {str(e)}\n\n{tb}"
-        return # STOP di sini, tidak bisa screenshot
+        live_log.append(f"[task] ERROR: {e}")
+        task_logs.close(task_id)
+        _finish_task(
+            job["dedupe_key"], task_id,
+            status="Failed: An error occurred",
+            log=f"Error: {str(e)}\n\n{tb}",
+        )
+        return None # STOP di sini, tidak bisa screenshot
 
-    # 2. Jalankan Screenshot (Hanya jika kita punya sonar_url)
-    if sonar_url:
-        try:
-            task_statuses[task_id]["sonar_url"] = sonar_url
-            task_statuses[task_id]["status"] = "Generating Screenshot"
-            
-            # Jika Quality Gate gagal, simpan pesan lognya
-            if error_msg:
-                task_statuses[task_id]["log"] = error_msg
-
-            screenshot_info = take_sonar_screenshot(project_key, clip_rect=clip_rect)
-            task_statuses[task_id]["screenshot_info"] = screenshot_info
-            
-            # Set status akhir (Completed atau Failed: Quality Gate)
-            task_statuses[task_id]["status"] = final_status
-            logger.info(f"--- WORKER DONE: task={task_id} status={final_status} ---")
-            
-        except Exception as e:
-            tb = traceback.format_exc()
-            logger.error(f"--- SCREENSHOT ERROR: task={task_id} ---\n{tb}")
-            task_statuses[task_id]["status"] = "Failed: Screenshot Error"
-            task_statuses[task_id]["log"] = f"Scan success but screenshot failed: {str(e)}\n\n{tb}"
-
-
-def _worker_loop() -> None:
+    if reused:
+        live_log.append(f"[task] Commit {commit_sha} already analyzed; reusing previous result.")
+    task_logs.close(task_id)
+
+    if not sonar_url:
+        _finish_task(job["dedupe_key"], task_id)
+        return None
+
+    fields: Dict[str, Any] = {
+        "sonar_url": sonar_url,
+        "status": "Awaiting Screenshot",
+        "commit_sha": commit_sha,
+        "reused": reused,
+    }
+    # Jika Quality Gate gagal, simpan pesan lognya
+    if error_msg:
+        fields["log"] = error_msg
+
+    # Commit sama & screenshot lama masih ada -> selesai tanpa stage screenshot
+    if reused and screenshot_exists(cached_screenshot):
+        fields.update(screenshot_info=cached_screenshot, status=final_status)
+        _finish_task(job["dedupe_key"], task_id, **fields)
+        logger.info(f"--- WORKER DONE (reused {commit_sha}): task={task_id} status={final_status} ---")
+        return None
+
+    # Screenshot lama hilang: dashboard hanya boleh di-capture jika masih menampilkan commit ini,
+    # selain itu gambar analysis lain akan tercatat sebagai milik commit lama di scan index
+    if reused and latest_analysis_revision(project_key) != commit_sha:
+        note = (
+            f"Commit {commit_sha} was already analyzed, but its screenshot is gone and the dashboard "
+            "now shows a different analysis. No screenshot was taken; use Force rescan for a new one."
+        )
+        fields.update(
+            screenshot_info=None, status=final_status,
+            log=f"{error_msg}\n\n{note}" if error_msg else note,
+        )
+        _finish_task(job["dedupe_key"], task_id, **fields)
+        logger.info(f"--- WORKER DONE (reused {commit_sha}, no screenshot): task={task_id} status={final_status} ---")
+        return None
+
+    task_store.update(task_id, **fields)
+
+    return {
+        "task_id": task_id,
+        "project_key": project_key,
+        "ce_task_id": ce_task_id,
+        "final_status": final_status,
+        "clip_rect": job.get("clip_rect") or DEFAULT_CLIP_RECT,
+        "commit_sha": commit_sha,
+        "exclusions": exclusions,
+        "inclusions": inclusions,
+        "dedupe_key": job["dedupe_key"],
+    }
+
+
+def _run_screenshot_stage(shot: Dict[str, Any]) -> None:
+    """Stage 2: screenshot dashboard (analysis sudah ditunggu di stage readiness)."""
+    task_id = shot["task_id"]
+    final_status = shot["final_status"]
+    try:
+        task_store.update(task_id, status="Generating Screenshot")
+        screenshot_info = take_sonar_screenshot(
+            shot["project_key"], clip_rect=shot["clip_rect"], readiness=shot.get("readiness"),
+            stage_gate=scheduler.stage,
+        )
+        # Set status akhir (Completed atau Failed: Quality Gate)
+        _finish_task(shot["dedupe_key"], task_id, screenshot_info=screenshot_info, status=final_status)
+        _remember_screenshot(shot, screenshot_info)
+        logger.info(f"--- WORKER DONE: task={task_id} status={final_status} ---")
+
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error(f"--- SCREENSHOT ERROR: task={task_id} ---\n{tb}")
+        _finish_task(
+            shot["dedupe_key"], task_id,
+            status="Failed: Screenshot Error",
+            log=f"Scan success but screenshot failed: {str(e)}\n\n{tb}",
+        )
+
+
+def _dedupe_key(
+    repo_url: str, branch_name: str, project_key: str, exclusions: str, inclusions: str,
+    clip_rect: Optional[Dict[str, int]] = None,
+) -> Tuple[str, ...]:
+    # clip_rect ikut key: follower menerima screenshot primary, jadi area crop harus sama
+    rect = clip_rect or DEFAULT_CLIP_RECT
+    return (
+        repo_url.strip().rstrip("/").lower().removesuffix(".git"),
+        branch_name.strip(),
+        project_key.strip(),
+        (exclusions or "").strip(),
+        (inclusions or "").strip(),
+        ",".join(f"{k}={rect[k]}" for k in sorted(rect)),
+    )
+
+
+def _finish_task(dedupe_key: Tuple[str, ...], task_id: str, **fields: Any) -> None:
+    """
+    Tulis hasil akhir task lalu lepas slot in-flight. Task yang di-coalesce ke
+    task ini (followers) ikut menerima hasil yang sama.
+    """
+    with _inflight_lock:
+        entry = _inflight.get(dedupe_key)
+        followers: List[str] = []
+        if entry and entry["task_id"] == task_id:
+            followers = entry["followers"]
+            del _inflight[dedupe_key]
+
+    if fields:
+        task_store.update(task_id, **fields)
+    if not followers:
+        return
+    # Salin hasil primary (termasuk sonar_url/commit yang ditulis stage sebelumnya)
+    primary = task_store.get(task_id) or {}
+    shared = {
+        k: primary.get(k)
+        for k in ("status", "sonar_url", "screenshot_info", "log", "commit_sha", "reused")
+    }
+    for follower_id in followers:
+        task_store.update(follower_id, **shared)
+
+
+def _remember_screenshot(shot: Dict[str, Any], screenshot_info: Optional[Dict[str, Any]]) -> None:
+    """Simpan screenshot ke scan index agar submit ulang commit yang sama bisa langsung reuse."""
+    index = get_scan_index()
+    if not (index and screenshot_info and shot.get("commit_sha")):
+        return
+    try:
+        index.attach_screenshot(
+            shot["project_key"], shot["commit_sha"],
+            shot.get("exclusions"), shot.get("inclusions"), screenshot_info,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store screenshot in scan index: {e}")
+
+
+def _handoff_to_screenshot(shot: Dict[str, Any]) -> None:
+    """
+    Serahkan ke antrian screenshot. put() blocking saat antrian penuh =
+    backpressure: scan worker berhenti mengambil job baru sampai stage
+    screenshot mengejar.
+    """
+    global _handoff_blocked_ms
+    started = time.monotonic()
+    screenshot_queue.put(shot)
+    blocked_ms = int((time.monotonic() - started) * 1000)
+    if blocked_ms:
+        with _worker_lock:
+            _handoff_blocked_ms += blocked_ms
+
+
+def _abort_job(job: Dict[str, Any], log: str) -> None:
+    """Job yang tidak sempat selesai saat shutdown: tandai gagal agar status tidak menggantung."""
+    _finish_task(job["dedupe_key"], job["task_id"], status=SHUTDOWN_STATUS, log=log)
+
+
+def _schedule_readiness(shot: Dict[str, Any], delay: float) -> None:
+    global _readiness_seq
+    with _readiness_cv:
+        _readiness_seq += 1
+        heapq.heappush(_readiness_heap, (time.monotonic() + delay, _readiness_seq, shot))
+        _readiness_cv.notify()
+
+
+def _after_scan(shot: Dict[str, Any]) -> None:
+    """Shot dengan CE task menunggu di stage readiness dulu; tanpa CE task langsung ke screenshot."""
+    global _readiness_waiting
+    if shot.get("ce_task_id"):
+        with _readiness_cv:
+            _readiness_waiting += 1
+        shot["readiness_started"] = time.monotonic()
+        shot["readiness_delay"] = READINESS_POLL_SECONDS
+        _schedule_readiness(shot, 0)
+    else:
+        _handoff_to_screenshot(shot)
+
+
+def _leave_readiness() -> None:
+    global _readiness_waiting
+    with _readiness_cv:
+        _readiness_waiting -= 1
+
+
+def _next_due_shot(timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Ambil shot readiness yang sudah jatuh tempo (urut waktu cek); None jika `timeout` habis."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _readiness_cv:
+        while not _readiness_heap or _readiness_heap[0][0] > time.monotonic():
+            now = time.monotonic()
+            wait = _readiness_heap[0][0] - now if _readiness_heap else None
+            if deadline is not None:
+                if now >= deadline:
+                    return None
+                wait = deadline - now if wait is None else min(wait, deadline - now)
+            _readiness_cv.wait(wait)
+        return heapq.heappop(_readiness_heap)[2]
+
+
+def _check_readiness(shot: Dict[str, Any]) -> None:
+    """
+    Satu cek CE task untuk shot: belum selesai -> jadwal ulang dengan backoff; selesai,
+    gagal atau timeout -> stage screenshot (yang fallback ke badge polling jika tidak ready).
+    """
+    if _stopping.is_set():
+        _abort_job(shot, "Scan finished but the server stopped before the screenshot was taken.")
+        _leave_readiness()
+        return
+    try:
+        readiness = check_analysis(shot["ce_task_id"])
+    except Exception as e:
+        logger.warning(f"Readiness check failed for task={shot['task_id']}: {e}")
+        readiness = {"ready": False, "finished": False, "ce_status": None}
+    waited = time.monotonic() - shot["readiness_started"]
+    if not readiness["finished"] and waited < Config.SONAR_READINESS_TIMEOUT_SECONDS:
+        delay = shot["readiness_delay"]
+        shot["readiness_delay"] = min(delay * 1.5, READINESS_MAX_POLL_SECONDS)
+        _schedule_readiness(shot, delay)
+        return
+    if not readiness["finished"]:
+        logger.warning(
+            "CE task %s not finished after %.0fs (last status=%s).",
+            shot["ce_task_id"], waited, readiness.get("ce_status"),
+        )
+    readiness["waited_ms"] = int(waited * 1000)
+    shot["readiness"] = readiness
+    logger.info(
+        "CE task %s -> status=%s, quality_gate=%s (%dms)",
+        shot["ce_task_id"], readiness.get("ce_status"), readiness.get("quality_gate_status"), readiness["waited_ms"],
+    )
+    # put dulu baru keluar dari hitungan readiness: drain shutdown tidak melihat celah kosong
+    _handoff_to_screenshot(shot)
+    _leave_readiness()
+
+
+def _readiness_loop() -> None:
+    while True:
+        _check_readiness(_next_due_shot())
+
+
+def _scan_worker_loop() -> None:
     while True:
         job = task_queue.get()  # blocking wait
         try:
-            _process_job(job)
+            if _stopping.is_set():
+                _abort_job(job, "Server stopped before this scan could start. Submit it again.")
+                continue
+            with _inflight_lock:
+                # Setelah ini force_rescan job tidak bisa lagi dinaikkan oleh submit duplikat
+                job["started"] = True
+            shot = _run_scan_stage(job)
+            if shot:
+                _after_scan(shot)
         finally:
             task_queue.task_done()
 
 
+def _screenshot_worker_loop() -> None:
+    while True:
+        shot = screenshot_queue.get()
+        try:
+            if _stopping.is_set():
+                _abort_job(shot, "Scan finished but the server stopped before the screenshot was taken.")
+                continue
+            _run_screenshot_stage(shot)
+        finally:
+            screenshot_queue.task_done()
+
+
 def _ensure_workers_started() -> None:
     global _worker_started
     with _worker_lock:
         if _worker_started:
             return
         for i in range(_num_workers):
-            t = threading.Thread(target=_worker_loop, name=f"task-worker-{i+1}", daemon=True)
+            t = threading.Thread(target=_scan_worker_loop, name=f"task-worker-{i+1}", daemon=True)
+            t.start()
+        for i in range(_num_screenshot_workers):
+            t = threading.Thread(target=_screenshot_worker_loop, name=f"screenshot-worker-{i+1}", daemon=True)
             t.start()
+        threading.Thread(target=_readiness_loop, name="readiness-waiter", daemon=True).start()
         _worker_started = True
-        logger.info("Task queue workers started: %d worker(s).", _num_workers)
+        logger.info(
+            "Task pipeline started: %d scan worker(s), %d screenshot worker(s), screenshot queue max=%d.",
+            _num_workers, _num_screenshot_workers, screenshot_queue.maxsize,
+        )
+
+
+def _pipeline_pending() -> int:
+    with _readiness_cv:
+        waiting = _readiness_waiting
+    return task_queue.unfinished_tasks + waiting + screenshot_queue.unfinished_tasks
+
+
+def shutdown_pipeline(timeout: float) -> bool:
+    """
+    Graceful shutdown: beri worker `timeout` detik untuk menghabiskan antrian scan, readiness + screenshot.
+    Setelah itu job yang masih antri atau berjalan ditandai SHUTDOWN_STATUS (proses akan berhenti).
+    Return True jika semua job selesai.
+    """
+    with _worker_lock:
+        started = _worker_started
+    if not started:
+        task_store.flush()
+        return True
+
+    pending = _pipeline_pending()
+    if pending:
+        logger.info("Draining scan pipeline: %d job(s) queued or running, waiting up to %ds.", pending, timeout)
+    deadline = time.monotonic() + max(0, timeout)
+    while _pipeline_pending() and time.monotonic() < deadline:
+        time.sleep(0.5)
+    _stopping.set()
+    if not _pipeline_pending():
+        shutdown_browser_pool()
+        # Store SQLite menulis per batch di background: paksa tulis sebelum proses berhenti
+        task_store.flush()
+        return True
+
+    aborted = 0
+    with _readiness_cv:
+        waiting = [shot for _, _, shot in _readiness_heap]
+        _readiness_heap.clear()
+    for shot in waiting:
+        _abort_job(shot, "Scan finished but the server stopped before the screenshot was taken.")
+        _leave_readiness()
+        aborted += 1
+    for q, log in (
+        (task_queue, "Server stopped before this scan could start. Submit it again."),
+        (screenshot_queue, "Scan finished but the server stopped before the screenshot was taken."),
+    ):
+        while True:
+            try:
+                job = q.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                _abort_job(job, log)
+                aborted += 1
+            finally:
+                q.task_done()
+    # Yang tersisa di _inflight sedang dikerjakan worker dan ikut berhenti bersama proses
+    with _inflight_lock:
+        running = [(key, entry["task_id"]) for key, entry in _inflight.items()]
+    for key, task_id in running:
+        _finish_task(key, task_id, status=SHUTDOWN_STATUS, log="Server stopped while this scan was running. Submit it again.")
+    shutdown_browser_pool()
+    task_store.flush()
+    logger.warning("Shutdown drain timed out: %d queued and %d running job(s) marked failed.", aborted, len(running))
+    return False
+
+
+def get_scan_metrics() -> Dict[str, Any]:
+    """Snapshot metrics antrian scan, scheduler & browser pool untuk endpoint monitoring."""
+    with _worker_lock:
+        blocked_ms = _handoff_blocked_ms
+    with _inflight_lock:
+        inflight = len(_inflight)
+        coalesced = _coalesced_total
+    return {
+        "queue_depth": task_queue.qsize(),
+        "workers": _num_workers,
+        "pipeline": {
+            "scan_queue_depth": task_queue.qsize(),
+            "readiness_waiting": _readiness_waiting,
+            "screenshot_queue_depth": screenshot_queue.qsize(),
+            "screenshot_queue_max": screenshot_queue.maxsize,
+            "screenshot_workers": _num_screenshot_workers,
+            "handoff_blocked_ms": blocked_ms,
+        },
+        "dedupe": {
+            "inflight_jobs": inflight,
+            "coalesced_total": coalesced,
+        },
+        "scheduler": scheduler.stats(),
+        "browser_pool": browser_pool_stats(),
+        "repo_cache": repo_cache_stats(),
+        "task_logs": task_logs.stats(),
+    }
 
 
 def create_task(
@@ -146,19 +538,24 @@ def create_task(
     exclusions: str = "",
     inclusions: str = "",
     clip_rect: Dict[str, int] = None,
+    force_rescan: bool = False,
 ) -> str:
     """
     Enqueue task ke antrian (FIFO).
+    Submit identik (repo, branch, project, exclusions, inclusions, clip_rect) saat job yang
+    sama masih queued/running tidak di-enqueue ulang: task baru di-coalesce ke
+    job tersebut dan menerima hasil yang sama.
+    Submit force_rescan ke job non-force yang masih antri menaikkan flag job itu; jika job
+    tersebut sudah berjalan (hasilnya bisa reuse), submit force mendapat job sendiri.
     """
+    global _coalesced_total
     _ensure_workers_started()
-    
-    # BERSIHKAN MEMORY DULU SEBELUM NAMBAH TASK BARU
-    _cleanup_old_tasks()
 
     task_id = str(uuid.uuid4())
-    
+    dedupe_key = _dedupe_key(repo_url, branch_name, project_key, exclusions, inclusions, clip_rect)
+
     # Struktur data status awal
-    task_statuses[task_id] = {
+    record = {
         "task_id": task_id,
         "created_at": datetime.now().isoformat(),
         "status": "Queued",
@@ -168,6 +565,10 @@ def create_task(
         "sonar_url": None,
         "screenshot_info": None,
         "log": None,
+        "commit_sha": None,
+        "reused": False,
+        "coalesced_into": None,
+        "coalesced_task_ids": [],
     }
 
     job = {
@@ -178,8 +579,33 @@ def create_task(
         "exclusions": exclusions,
         "inclusions": inclusions,
         "clip_rect": clip_rect or DEFAULT_CLIP_RECT,
+        "force_rescan": force_rescan,
+        "dedupe_key": dedupe_key,
     }
 
+    with _inflight_lock:
+        entry = _inflight.get(dedupe_key)
+        if entry is not None and force_rescan and not entry["job"]["force_rescan"]:
+            if entry["job"].get("started"):
+                # Primary sudah berjalan tanpa force: job force terpisah (di-dedupe antar submit force)
+                dedupe_key = dedupe_key + ("force",)
+                job["dedupe_key"] = dedupe_key
+                entry = _inflight.get(dedupe_key)
+            else:
+                entry["job"]["force_rescan"] = True
+                logger.info(f"Queued task {entry['task_id']} upgraded to force rescan")
+        if entry is not None:
+            primary_id = entry["task_id"]
+            entry["followers"].append(task_id)
+            _coalesced_total += 1
+            record["coalesced_into"] = primary_id
+            task_store.create(record)
+            task_store.update(primary_id, coalesced_task_ids=list(entry["followers"]))
+            logger.info(f"Task {task_id} coalesced into in-flight task {primary_id}")
+            return task_id
+        _inflight[dedupe_key] = {"task_id": task_id, "followers": [], "job": job}
+        task_store.create(record)
+
     task_queue.put(job)
     logger.info(f"Task {task_id} enqueued: repo={repo_url} branch={branch_name}")
     return task_id
\ No newline at end of file
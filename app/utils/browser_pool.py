@@ -0,0 +1,319 @@
+# app/utils/browser_pool.py
+
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.sync_api import sync_playwright
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIEWPORT = {"width": 1920, "height": 1200}
+
+
+class BrowserPoolTimeout(Exception):
+    """Dilemparkan saat tidak ada browser idle dalam batas waktu acquire."""
+    pass
+
+
+class _BrowserSlot:
+    """
+    Satu Chromium yang hidup lama, dimiliki oleh satu thread khusus.
+    Playwright sync API terikat ke thread pembuatnya, jadi semua pemakaian
+    browser dikirim ke thread slot ini (bukan dipakai langsung oleh worker).
+    """
+
+    def __init__(self, pool: "BrowserPool", index: int):
+        self._pool = pool
+        self.index = index
+        self._inbox: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._playwright = None
+        self._browser = None
+        self.uses = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"browser-slot-{index + 1}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        fut: Future = Future()
+        self._inbox.put((fn, fut))
+        return fut
+
+    def stop(self, wait: bool = True) -> None:
+        self._inbox.put(None)
+        if wait:
+            self._thread.join(timeout=10.0)
+
+    # --- berjalan di thread slot ---
+
+    def _run(self) -> None:
+        try:
+            self._ensure_browser()
+        except Exception as e:
+            # Jangan matikan slot: launch dicoba ulang saat job pertama masuk
+            logger.warning("Browser slot %d failed to warm up: %s", self.index + 1, e)
+        self._pool._release(self)
+
+        while True:
+            work = self._inbox.get()
+            if work is None:
+                break
+            fn, fut = work
+            try:
+                if fut.set_running_or_notify_cancel():
+                    self._execute(fn, fut)
+            finally:
+                self._pool._release(self)
+
+        self._close_browser()
+
+    def _execute(self, fn: Callable[[Any], Any], fut: Future) -> None:
+        context = None
+        try:
+            self._ensure_browser()
+            context = self._browser.new_context(
+                viewport=DEFAULT_VIEWPORT,
+                storage_state=self._pool.storage_state,
+            )
+            fut.set_result(fn(context))
+        except Exception as e:
+            fut.set_exception(e)
+        finally:
+            if context is not None:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+            self.uses += 1
+            self._recycle_if_needed()
+
+    def _ensure_browser(self) -> None:
+        if self._browser is not None and self._browser.is_connected():
+            return
+        if self._browser is not None:
+            logger.warning("Browser slot %d disconnected (crash?), relaunching.", self.index + 1)
+            self._pool._record("crashes")
+            self._close_browser()
+
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self.uses = 0
+        self._pool._record("launches")
+        logger.info("Browser slot %d launched Chromium.", self.index + 1)
+
+    def _recycle_if_needed(self) -> None:
+        crashed = self._browser is not None and not self._browser.is_connected()
+        worn_out = self._pool.max_uses > 0 and self.uses >= self._pool.max_uses
+        if not (crashed or worn_out):
+            return
+        if crashed:
+            self._pool._record("crashes")
+        logger.info(
+            "Recycling browser slot %d (uses=%d, crashed=%s).",
+            self.index + 1, self.uses, crashed,
+        )
+        self._pool._record("recycles")
+        self._close_browser()
+        try:
+            # Langsung launch lagi supaya slot tetap warm untuk job berikutnya
+            self._ensure_browser()
+        except Exception as e:
+            logger.warning("Browser slot %d relaunch failed: %s", self.index + 1, e)
+
+    def _close_browser(self) -> None:
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._playwright = None
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Pool Chromium headless yang tetap hangat (warm) untuk screenshot SonarQube.
+    - size slot, masing-masing satu browser di thread sendiri
+    - browser di-recycle setelah max_uses pemakaian atau saat crash
+    - storage_state (cookie login SonarQube) dibagi antar slot
+    """
+
+    def __init__(
+        self, size: int = 1, max_uses: int = 20, acquire_timeout: float = 300.0, run_timeout: float = 180.0,
+    ):
+        if size < 1:
+            raise ValueError("size minimal 1")
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.run_timeout = run_timeout
+
+        self._idle: "queue.Queue[_BrowserSlot]" = queue.Queue()
+        self._slots: List[_BrowserSlot] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._storage_state: Optional[Dict[str, Any]] = None
+
+        self._metrics: Dict[str, float] = {
+            "acquisitions": 0,
+            "timeouts": 0,
+            "launches": 0,
+            "recycles": 0,
+            "crashes": 0,
+            "wedged": 0,
+            "total_wait_ms": 0,
+            "max_wait_ms": 0,
+            "last_wait_ms": 0,
+        }
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.size):
+                slot = _BrowserSlot(self, i)
+                self._slots.append(slot)
+                slot.start()
+            self._started = True
+        logger.info("BrowserPool started: size=%d max_uses=%d", self.size, self.max_uses)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            slots, self._slots = self._slots, []
+            self._started = False
+        for slot in slots:
+            slot.stop()
+        # Slot yang sudah berhenti tidak boleh dipinjam lagi setelah start() berikutnya
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        logger.info("BrowserPool stopped.")
+
+    @property
+    def storage_state(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._storage_state
+
+    def update_storage_state(self, state: Optional[Dict[str, Any]]) -> None:
+        """Simpan sesi login terbaru agar slot lain tidak perlu login ulang."""
+        with self._lock:
+            self._storage_state = state
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Jalankan fn(context) di salah satu browser idle dan kembalikan hasilnya.
+        Context baru dibuat per pemanggilan dan ditutup otomatis.
+        fn yang tidak selesai dalam run_timeout detik -> BrowserPoolTimeout, slot-nya diganti baru.
+        """
+        self.start()
+        wait_timeout = self.acquire_timeout if timeout is None else timeout
+
+        started = time.monotonic()
+        try:
+            slot = self._idle.get(timeout=wait_timeout)
+        except queue.Empty:
+            self._record("timeouts")
+            raise BrowserPoolTimeout(f"No idle browser within {wait_timeout:.0f}s")
+
+        waited_ms = int((time.monotonic() - started) * 1000)
+        with self._lock:
+            self._metrics["acquisitions"] += 1
+            self._metrics["total_wait_ms"] += waited_ms
+            self._metrics["last_wait_ms"] = waited_ms
+            self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], waited_ms)
+
+        fut = slot.submit(fn)
+        try:
+            return fut.result(timeout=self.run_timeout if self.run_timeout > 0 else None)
+        except FutureTimeout:
+            self._replace_wedged(slot)
+            raise BrowserPoolTimeout(f"Browser did not finish within {self.run_timeout:.0f}s")
+
+    def _replace_wedged(self, slot: _BrowserSlot) -> None:
+        """Slot macet: keluarkan dari pool (berhenti sendiri jika pulih) dan jalankan slot pengganti."""
+        with self._lock:
+            if slot not in self._slots:
+                return
+            replacement = _BrowserSlot(self, slot.index)
+            self._slots[self._slots.index(slot)] = replacement
+            self._metrics["wedged"] += 1
+        logger.warning("Browser slot %d wedged after %.0fs; replacing it.", slot.index + 1, self.run_timeout)
+        slot.stop(wait=False)
+        replacement.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            slot_uses = [s.uses for s in self._slots]
+        idle = self._idle.qsize()
+        acquisitions = metrics["acquisitions"]
+        metrics.update({
+            "size": self.size,
+            "idle": idle,
+            "in_use": max(0, len(slot_uses) - idle),
+            "max_uses": self.max_uses,
+            "slot_uses": slot_uses,
+            "avg_wait_ms": int(metrics["total_wait_ms"] / acquisitions) if acquisitions else 0,
+        })
+        return metrics
+
+    # --- dipanggil dari thread slot ---
+
+    def _release(self, slot: _BrowserSlot) -> None:
+        # Slot yang sudah dikeluarkan (shutdown / macet diganti) tidak kembali ke antrian idle
+        with self._lock:
+            if slot not in self._slots:
+                return
+        self._idle.put(slot)
+
+    def _record(self, key: str) -> None:
+        with self._lock:
+            self._metrics[key] += 1
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Pool global (lazy) yang dipakai bersama oleh semua task worker."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=Config.SCREENSHOT_BROWSER_POOL_SIZE,
+                max_uses=Config.SCREENSHOT_BROWSER_MAX_USES,
+                acquire_timeout=Config.SCREENSHOT_BROWSER_ACQUIRE_TIMEOUT,
+                run_timeout=Config.SCREENSHOT_BROWSER_RUN_TIMEOUT,
+            )
+        return _pool
+
+
+def shutdown_browser_pool() -> None:
+    """Tutup semua Chromium pool global (no-op jika pool belum pernah dipakai)."""
+    with _pool_lock:
+        pool = _pool
+    if pool:
+        pool.shutdown()
+
+
+def browser_pool_stats() -> Optional[Dict[str, Any]]:
+    """Metrics pool tanpa memaksa pool dibuat (None jika belum pernah dipakai)."""
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool else None
@@ -7,14 +7,26 @@ import tempfile
 import shutil
 import logging
 import queue
+import sqlite3
 import threading
+from collections import deque
+from contextlib import nullcontext
 from dataclasses import dataclass
 from concurrent.futures import Future
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, ContextManager
 
 from app.config import Config
+from app.utils.repo_cache import MirrorUnavailable, RepoMirrorCache
+from app.utils.scan_index import ScanIndex
+from app.utils.task_store import DEFAULT_SQLITE_PATH
 
 logger = logging.getLogger(__name__)
+
+# Output scanner yang disimpan di memori untuk pesan error (log lengkap ada di line_sink)
+_SCANNER_TAIL_LINES = 200
+
+LineSink = Callable[[str], None]
+
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
@@ -22,11 +34,36 @@ if not logger.handlers:
 class QualityGateFailed(Exception):
     """
     Dilemparkan saat SonarScanner keluar dengan kode 2 (Quality Gate gagal).
-    Membawa URL dashboard di .url
+    Membawa URL dashboard di .url dan ID compute-engine task di .ce_task_id
+    (reused=True jika hasilnya diambil dari scan index tanpa scan ulang)
     """
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        ce_task_id: Optional[str] = None,
+        commit_sha: Optional[str] = None,
+        reused: bool = False,
+        screenshot_info: Optional[Dict[str, Any]] = None,
+    ):
         super().__init__("Quality Gate failed")
         self.url = url
+        self.ce_task_id = ce_task_id
+        self.commit_sha = commit_sha
+        self.reused = reused
+        self.screenshot_info = screenshot_info
+
+
+@dataclass
+class ScanResult:
+    """
+    Hasil scan sukses: URL dashboard + ID compute-engine task SonarQube.
+    reused=True jika commit yang sama sudah pernah dianalisis (scan dilewati).
+    """
+    sonar_url: str
+    ce_task_id: Optional[str] = None
+    commit_sha: Optional[str] = None
+    reused: bool = False
+    screenshot_info: Optional[Dict[str, Any]] = None
 
 
 # Detect common token leaks in repo URL (prevent future incidents)
@@ -60,9 +97,104 @@ def _git_env() -> Dict[str, str]:
     return env
 
 
+def _run_git(cmd: List[str]) -> str:
+    """
+    Jalankan perintah git non-interaktif dan kembalikan stdout. Error git diubah
+    menjadi RuntimeError dengan detail stderr (dan hint .netrc jika relevan).
+    """
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=True,
+            env=_git_env(),
+        )
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or "").strip()
+        stdout = (e.stdout or "").strip()
+        detail = stderr or stdout or "unknown git error"
+        hint = ""
+        if "could not read Username" in detail:
+            hint = "Check .netrc in HOME and its permissions (600)."
+            detail = f"{detail}. {hint}"
+        raise RuntimeError(f"Git operation failed: {detail}") from e
+    return proc.stdout or ""
+
+
+def resolve_branch_head(repo_url: str, branch_name: str) -> Optional[str]:
+    """
+    SHA commit ujung branch di remote via `git ls-remote` (tanpa clone).
+    None jika branch tidak ditemukan atau remote tidak bisa dihubungi.
+    """
+    if _looks_like_credentialed_url(repo_url):
+        return None
+    try:
+        out = _run_git([
+            "git", "-c", "credential.helper=",
+            "ls-remote", "--heads",
+            "--", repo_url, f"refs/heads/{branch_name}",
+        ])
+    except RuntimeError as e:
+        logger.warning("ls-remote failed for %s (%s): %s", repo_url, branch_name, e)
+        return None
+    for line in out.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref.strip() == f"refs/heads/{branch_name}":
+            return sha.strip()
+    return None
+
+
+def _checkout_head(tmp_dir: str) -> Optional[str]:
+    """SHA HEAD checkout (bisa beda dari ls-remote jika branch di-push di antaranya)."""
+    try:
+        return _run_git(["git", "-C", tmp_dir, "rev-parse", "HEAD"]).strip() or None
+    except RuntimeError:
+        return None
+
+
+_repo_cache: Optional[RepoMirrorCache] = None
+_repo_cache_lock = threading.Lock()
+
+
+def get_repo_cache() -> Optional[RepoMirrorCache]:
+    """Mirror cache global (lazy); None jika REPO_CACHE_ENABLED=false."""
+    global _repo_cache
+    if not Config.REPO_CACHE_ENABLED:
+        return None
+    with _repo_cache_lock:
+        if _repo_cache is None:
+            root = Config.REPO_CACHE_DIR or os.path.join(
+                os.getenv("SONAR_USER_HOME", "/cache"), "repo-mirrors"
+            )
+            _repo_cache = RepoMirrorCache(
+                root=root,
+                max_bytes=Config.REPO_CACHE_MAX_MB * 1024 * 1024,
+                run_git=_run_git,
+            )
+            logger.info("Repo mirror cache at %s (budget %d MB)", root, Config.REPO_CACHE_MAX_MB)
+        return _repo_cache
+
+
+def _shallow_clone(source: str, branch_name: str, tmp_dir: str) -> None:
+    _run_git([
+        "git",
+        "-c", "credential.helper=", # Matikan helper lain, paksa baca config/netrc
+        "clone",
+        "--quiet",
+        "--depth", "1",
+        "--branch", branch_name,
+        "--", # Security: prevent argument injection
+        source,
+        tmp_dir,
+    ])
+
+
 def limited_clone(repo_url: str, branch_name: str) -> str:
     """
     Clone repo ke direktori sementara.
+    Jika mirror cache aktif, checkout dibuat dari bare mirror lokal yang
+    di-fetch incremental; network hanya dipakai untuk fetch delta.
     Auth murni mengandalkan ~/.netrc di folder user.
     """
     if _looks_like_credentialed_url(repo_url):
@@ -72,42 +204,59 @@ def limited_clone(repo_url: str, branch_name: str) -> str:
     logger.info("Cloning %s into %s", repo_url, tmp_dir)
 
     try:
-        cmd = [
-            "git",
-            "-c", "credential.helper=", # Matikan helper lain, paksa baca config/netrc
-            "clone",
-            "--quiet",
-            "--depth", "1",
-            "--branch", branch_name,
-            "--", # Security: prevent argument injection
-            repo_url,
-            tmp_dir,
-        ]
-
-        subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True,
-            env=_git_env(),
-        )
+        cache = None
+        try:
+            cache = get_repo_cache()
+        except OSError as e:
+            logger.warning("Repo mirror cache unavailable (%s); cloning directly.", e)
+
+        if cache:
+            try:
+                with cache.mirror(repo_url, branch_name) as mirror_path:
+                    # file:// agar --depth berlaku (checkout tetap shallow seperti dulu)
+                    _shallow_clone(f"file://{mirror_path}", branch_name, tmp_dir)
+            except MirrorUnavailable:
+                # Mirror tetap disimpan untuk job berikutnya; job ini clone langsung dari remote
+                _shallow_clone(repo_url, branch_name, tmp_dir)
+        else:
+            _shallow_clone(repo_url, branch_name, tmp_dir)
 
         logger.info("Clone successful (branch=%s).", branch_name)
         return tmp_dir
 
-    except subprocess.CalledProcessError as e:
+    except RuntimeError as e:
         shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.error("%s (repo=%s)", e, repo_url)
+        raise
 
-        stderr = (e.stderr or "").strip()
-        stdout = (e.stdout or "").strip()
-        detail = stderr or stdout or "unknown git error"
-        hint = ""
-        if "could not read Username" in detail:
-            hint = "Check .netrc in HOME and its permissions (600)."
-            detail = f"{detail}. {hint}"
 
-        logger.error("Git operation failed for %s. Detail: %s", repo_url, detail)
-        raise RuntimeError(f"Git operation failed: {detail}") from e
+_scan_index: Optional[ScanIndex] = None
+_scan_index_lock = threading.Lock()
+
+
+def get_scan_index() -> Optional[ScanIndex]:
+    """
+    Scan index global (lazy), satu file dengan task store SQLite.
+    None jika SCAN_REUSE_ENABLED=false.
+    """
+    global _scan_index
+    if not Config.SCAN_REUSE_ENABLED:
+        return None
+    with _scan_index_lock:
+        if _scan_index is None:
+            if Config.TASK_STORE_BACKEND == "memory":
+                path = ":memory:"
+            else:
+                path = Config.TASK_STORE_PATH or DEFAULT_SQLITE_PATH
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            _scan_index = ScanIndex(path)
+        return _scan_index
+
+
+def repo_cache_stats() -> Optional[Dict[str, Any]]:
+    with _repo_cache_lock:
+        cache = _repo_cache
+    return cache.stats() if cache else None
 
 
 def _get_sonar_config() -> Dict[str, Any]:
@@ -248,14 +397,23 @@ def _log_scanner_line(line: str) -> None:
         logger.debug("[SONAR] %s", text)
 
 
-def _collect_scanner_output(proc: subprocess.Popen) -> List[str]:
-    output: List[str] = []
+def _collect_scanner_output(proc: subprocess.Popen, line_sink: Optional[LineSink] = None) -> List[str]:
+    """
+    Teruskan setiap baris ke line_sink (log live per task) dan simpan hanya
+    tail terakhir untuk pesan error, bukan seluruh output.
+    """
+    tail: "deque[str]" = deque(maxlen=_SCANNER_TAIL_LINES)
     if not proc.stdout:
-        return output
+        return list(tail)
     for line in proc.stdout:
-        output.append(line)
+        tail.append(line)
         _log_scanner_line(line)
-    return output
+        if line_sink:
+            try:
+                line_sink(line)
+            except Exception as e:
+                logger.debug("Scanner line sink failed: %s", e)
+    return list(tail)
 
 
 def _scanner_failure_hint(output: str) -> str:
@@ -275,14 +433,17 @@ def _raise_scanner_failure(ret: int, output_lines: List[str]) -> None:
         output = f"{output}\nHint: {hint}\n"
         logger.error("SonarScanner failed. Hint: %s", hint)
     logger.error("SonarScanner ERROR (exit %d):\n%s", ret, output)
-    raise RuntimeError(f"SonarScanner failed (exit {ret})\n\n{output}")
+    raise RuntimeError(
+        f"SonarScanner failed (exit {ret}); last {len(output_lines)} line(s) of output:\n\n{output}"
+    )
 
 
 def _run_scanner_process(
     cmd: List[str],
     tmp_dir: str,
     config: Dict[str, Any],
-    custom_cache_dir: Optional[str] = None
+    custom_cache_dir: Optional[str] = None,
+    line_sink: Optional[LineSink] = None,
 ) -> int:
     env, final_cache_dir = _build_scanner_env(config, custom_cache_dir)
 
@@ -300,34 +461,58 @@ def _run_scanner_process(
         preexec_fn=_build_scanner_preexec(config),
     )
 
-    full_output = _collect_scanner_output(proc)
+    output_tail = _collect_scanner_output(proc, line_sink)
     ret = proc.wait()
-    _raise_scanner_failure(ret, full_output)
+    _raise_scanner_failure(ret, output_tail)
 
     return ret
 
 
+def _read_report_task(tmp_dir: str) -> Dict[str, str]:
+    """
+    Baca .scannerwork/report-task.txt yang ditulis sonar-scanner
+    (berisi ceTaskId, ceTaskUrl, dashboardUrl, dll).
+    """
+    path = os.path.join(tmp_dir, ".scannerwork", "report-task.txt")
+    report: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep:
+                    report[key] = value
+    except FileNotFoundError:
+        logger.warning("report-task.txt not found in %s; CE task id unknown.", tmp_dir)
+    except Exception as e:
+        logger.warning("Failed to read report-task.txt: %s", e)
+    return report
+
+
 def limited_sonar_scan(
     tmp_dir: str,
     project_key: str,
     exclusions: Optional[str] = None,
     inclusions: Optional[str] = None,
-    custom_cache_dir: Optional[str] = None
-) -> str:
+    custom_cache_dir: Optional[str] = None,
+    line_sink: Optional[LineSink] = None,
+) -> ScanResult:
     config = _get_sonar_config()
     cmd = _build_sonar_command(config, project_key, exclusions, inclusions, tmp_dir)
     
     # Pass custom_cache_dir ke process runner
-    exit_code = _run_scanner_process(cmd, tmp_dir, config, custom_cache_dir=custom_cache_dir)
+    exit_code = _run_scanner_process(
+        cmd, tmp_dir, config, custom_cache_dir=custom_cache_dir, line_sink=line_sink
+    )
 
     sonar_url = f"{config['host_url']}/dashboard?id={project_key}"
+    ce_task_id = _read_report_task(tmp_dir).get("ceTaskId")
 
     if exit_code == 2:
         logger.warning("🔴 Quality Gate FAILED (exit code 2) for %s", project_key)
-        raise QualityGateFailed(sonar_url)
+        raise QualityGateFailed(sonar_url, ce_task_id=ce_task_id)
 
-    logger.info("✅ Analysis successful for %s. Dashboard: %s", project_key, sonar_url)
-    return sonar_url
+    logger.info("✅ Analysis successful for %s. Dashboard: %s (ceTaskId=%s)", project_key, sonar_url, ce_task_id)
+    return ScanResult(sonar_url=sonar_url, ce_task_id=ce_task_id)
 
 
 def clone_and_scan(
@@ -336,11 +521,48 @@ def clone_and_scan(
     project_key: str,
     exclusions: Optional[str] = None,
     inclusions: Optional[str] = None,
-    per_job_cache: bool = False
-) -> str:
+    per_job_cache: bool = False,
+    stage_gate: Optional[Callable[[str], ContextManager]] = None,
+    force_rescan: bool = False,
+    line_sink: Optional[LineSink] = None,
+) -> ScanResult:
+    """
+    Clone lalu scan. stage_gate(nama_stage) opsional dipakai scheduler untuk
+    admission control per stage ("clone" dan "scan").
+
+    Sebelum clone, HEAD branch di-resolve via ls-remote. Jika commit tersebut
+    sudah pernah dianalisis dengan exclusions/inclusions yang sama, hasil lama
+    dikembalikan langsung (reused=True) kecuali force_rescan=True.
+    line_sink(baris) opsional menerima output sonar-scanner secara live.
+    """
+    gate = stage_gate or (lambda _stage: nullcontext())
     tmp_dir = None
     job_cache_dir = None
 
+    index = None
+    try:
+        index = get_scan_index()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Scan index unavailable (%s); scanning without reuse.", e)
+
+    if index and not force_rescan:
+        head_sha = resolve_branch_head(repo_url, branch_name)
+        cached = index.lookup(project_key, head_sha, exclusions, inclusions) if head_sha else None
+        if cached:
+            logger.info(
+                "♻️ Reusing analysis of %s@%s for %s (force_rescan to override).",
+                branch_name, head_sha[:12], project_key,
+            )
+            if cached["quality_gate_failed"]:
+                raise QualityGateFailed(
+                    cached["sonar_url"], ce_task_id=cached["ce_task_id"], commit_sha=head_sha,
+                    reused=True, screenshot_info=cached["screenshot_info"],
+                )
+            return ScanResult(
+                sonar_url=cached["sonar_url"], ce_task_id=cached["ce_task_id"], commit_sha=head_sha,
+                reused=True, screenshot_info=cached["screenshot_info"],
+            )
+
     try:
         # --- THREAD SAFE LOGIC ---
         # Hitung path cache secara lokal, JANGAN ubah os.environ global.
@@ -349,22 +571,56 @@ def clone_and_scan(
             job_cache_dir = os.path.abspath(os.path.join(base_cache, project_key.replace("/", "_")))
             logger.debug("Using per-job cache path: %s", job_cache_dir)
 
-        tmp_dir = limited_clone(repo_url, branch_name)
+        with gate("clone"):
+            tmp_dir = limited_clone(repo_url, branch_name)
+        commit_sha = _checkout_head(tmp_dir)
         
         # Kirim job_cache_dir ke fungsi scan
-        return limited_sonar_scan(
-            tmp_dir, 
-            project_key, 
-            exclusions=exclusions, 
-            inclusions=inclusions,
-            custom_cache_dir=job_cache_dir
-        )
+        with gate("scan"):
+            try:
+                result = limited_sonar_scan(
+                    tmp_dir, 
+                    project_key, 
+                    exclusions=exclusions, 
+                    inclusions=inclusions,
+                    custom_cache_dir=job_cache_dir,
+                    line_sink=line_sink,
+                )
+            except QualityGateFailed as qgf:
+                qgf.commit_sha = commit_sha
+                _record_scan(index, project_key, commit_sha, exclusions, inclusions,
+                             qgf.url, qgf.ce_task_id, quality_gate_failed=True)
+                raise
+
+        result.commit_sha = commit_sha
+        _record_scan(index, project_key, commit_sha, exclusions, inclusions,
+                     result.sonar_url, result.ce_task_id)
+        return result
     finally:
         if tmp_dir:
             shutil.rmtree(tmp_dir, ignore_errors=True)
             logger.debug("Removed temporary directory %s", tmp_dir)
 
 
+def _record_scan(
+    index: Optional[ScanIndex],
+    project_key: str,
+    commit_sha: Optional[str],
+    exclusions: Optional[str],
+    inclusions: Optional[str],
+    sonar_url: str,
+    ce_task_id: Optional[str],
+    quality_gate_failed: bool = False,
+) -> None:
+    if not index or not commit_sha:
+        return
+    try:
+        index.record(project_key, commit_sha, exclusions, inclusions, sonar_url,
+                     ce_task_id=ce_task_id, quality_gate_failed=quality_gate_failed)
+    except sqlite3.Error as e:
+        logger.warning("Failed to record scan index for %s@%s: %s", project_key, commit_sha, e)
+
+
 @dataclass
 class ScanJob:
     repo_url: str
@@ -402,7 +658,7 @@ class SonarScanQueue:
 
             if fut.set_running_or_notify_cancel():
                 try:
-                    url = clone_and_scan(
+                    result = clone_and_scan(
                         job.repo_url,
                         job.branch_name,
                         job.project_key,
@@ -410,7 +666,7 @@ class SonarScanQueue:
                         job.inclusions,
                         per_job_cache=job.per_job_cache,
                     )
-                    fut.set_result(url)
+                    fut.set_result(result)
                 except Exception as e:
                     fut.set_exception(e)
                 finally:
@@ -467,8 +723,8 @@ if __name__ == "__main__":
 
     for i, fut in enumerate(futures, 1):
         try:
-            url = fut.result()
-            print(f"[{i}] SUCCESS -> {url}")
+            result = fut.result()
+            print(f"[{i}] SUCCESS -> {result.sonar_url}")
         except QualityGateFailed as qg:
             print(f"[{i}] QUALITY GATE FAILED -> {qg.url}")
         except Exception as e:
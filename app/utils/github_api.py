@@ -1,70 +1,26 @@
 # app/utils/github_api.py
 
-import os
 import requests
-import netrc
 import logging
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.config import Config
+from app.utils.github_client import GITHUB_API_URL, get_github_client
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
-GITHUB_API_URL = "https://api.github.com"
-
-def _get_token_from_netrc() -> Optional[str]:
-    """Mencoba mengambil token dari file ~/.netrc"""
-    try:
-        netrc_path = os.path.expanduser("~/.netrc")
-        if os.path.exists(netrc_path):
-            auth_data = netrc.netrc(netrc_path)
-            # Cari entry untuk machine 'github.com'
-            authenticators = auth_data.authenticators("github.com")
-            if authenticators:
-                return authenticators[2]
-        else:
-            logger.debug(f".netrc file not found at {netrc_path}")
-            
-    except Exception as e:
-        logger.warning(f"Failed to read .netrc: {e}")
-    return None
-
-def _get_auth_headers() -> Dict[str, str]:
-    """
-    Membungkus pembuatan header.
-    Prioritas:
-    1. Environment Variable GITHUB_TOKEN
-    2. File ~/.netrc
-    """
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-    # 1. Cek Environment Variable
-    token = os.getenv("GITHUB_TOKEN")
-
-    # 2. Jika tidak ada di env, cek .netrc
-    if not token:
-        token = _get_token_from_netrc()
-
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    else:
-        logger.warning("No GitHub Token found in Env ('GITHUB_TOKEN') or .netrc. API calls might fail or be rate-limited.")
-
-    return headers
-
 def add_collaborator_to_repo(owner: str, repo: str, username: str, permission: str = "push") -> dict:
     """
     Mengundang atau mengupdate user sebagai kolaborator di sebuah repositori.
     """
     url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/collaborators/{username}"
-    
-    # Header diambil dari .netrc
-    headers = _get_auth_headers()
     data = {"permission": permission}
 
     try:
-        response = requests.put(url, headers=headers, json=data, timeout=10)
+        # Session bersama (keep-alive + retry 5xx); header auth dari kredensial cache
+        response = get_github_client().put(url, json=data)
 
         # Kasus sukses: Pengguna baru diundang
         if response.status_code == 201:
@@ -84,6 +40,15 @@ def add_collaborator_to_repo(owner: str, repo: str, username: str, permission: s
                 "role": permission
             }
             
+        # Repo tidak ada / tidak terlihat oleh token (menggantikan cek keberadaan repo terpisah)
+        elif response.status_code == 404:
+            return {
+                "ok": False,
+                "status": "not_found",
+                "message": f"Repository '{owner}/{repo}' not found.",
+                "role": None
+            }
+
         # Kasus lain (kemungkinan error)
         else:
             try:
@@ -111,10 +76,55 @@ def is_user_already_invited(owner: str, repo: str, username: str) -> bool:
     Mengecek apakah seorang pengguna sudah menjadi kolaborator.
     """
     url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/collaborators/{username}"
-    headers = _get_auth_headers()
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_github_client().get(url)
         return response.status_code == 204
     except requests.RequestException:
         return False
+
+def github_user_exists(username: str) -> Optional[bool]:
+    """
+    True/False jika user GitHub ada/tidak; None jika tidak bisa dipastikan (error jaringan, 5xx).
+    """
+    try:
+        response = get_github_client().get(f"{GITHUB_API_URL}/users/{username}")
+    except requests.RequestException:
+        return None
+    if response.status_code == 200:
+        return True
+    if response.status_code == 404:
+        return False
+    return None
+
+def grant_access_bulk(
+    owner: str,
+    username: str,
+    repo_roles: Iterable[Tuple[str, str]],
+    max_workers: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Grant akses ke banyak repo secara paralel (konkurensi dibatasi).
+    Tidak ada cek keberadaan repo terpisah: PUT yang 404 dilaporkan sebagai
+    status "not_found". Hasil di-yield per repo begitu selesai (urutan selesai,
+    bukan urutan input; "index" menunjuk posisi input).
+    """
+    repo_roles = list(repo_roles)
+    workers = max(1, min(max_workers or Config.GITHUB_GRANT_CONCURRENCY, len(repo_roles) or 1))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gh-grant")
+    try:
+        futures = {
+            executor.submit(add_collaborator_to_repo, owner, repo, username, role): (index, repo, role)
+            for index, (repo, role) in enumerate(repo_roles)
+        }
+        for future in as_completed(futures):
+            index, repo, role = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error granting {role} on {owner}/{repo} to {username}: {e}")
+                result = {"ok": False, "status": "failed", "message": f"Error: {e}", "role": None}
+            yield {"index": index, "repo": repo, **result}
+    finally:
+        # Client putus di tengah stream: batalkan grant yang belum dimulai
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,246 @@
+# app/utils/github_cache.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_CACHE_DIR = os.path.join(_PROJECT_ROOT, 'data', 'github_cache')
+
+
+class CachedResponse:
+    """Response GET 200 yang disajikan dari cache (antarmuka minimal requests.Response)."""
+
+    status_code = 200
+
+    def __init__(self, entry: Dict[str, Any], revalidated: bool):
+        self._entry = entry
+        self.url = entry["url"]
+        self.links = entry.get("links") or {}
+        self.from_cache = True
+        self.revalidated = revalidated   # True = dikonfirmasi lewat 304
+
+    @property
+    def text(self) -> str:
+        return json.dumps(self._entry["body"])
+
+    def json(self) -> Any:
+        return self._entry["body"]
+
+
+class ConditionalCache:
+    """
+    Cache GET GitHub per URL (memory LRU + file JSON di disk).
+    - Dalam TTL: disajikan langsung tanpa request
+    - Setelah TTL: request ulang dengan If-None-Match / If-Modified-Since;
+      304 (tidak dihitung ke rate limit GitHub) memperpanjang entry
+    - Key mencakup Accept + identitas token, karena isi listing bergantung akses token
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: int, max_entries: int, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = max(0, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # key -> {"size": bytes, "last_used": epoch} untuk file di disk
+        self._disk: Dict[str, Dict[str, float]] = {}
+        self._stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                st = entry.stat()
+                self._disk[entry.name[:-5]] = {"size": st.st_size, "last_used": st.st_mtime}
+
+    @staticmethod
+    def _key(url: str, accept: str, token: Optional[str]) -> str:
+        identity = hashlib.sha1((token or "").encode("utf-8")).hexdigest()
+        return hashlib.sha1(f"{identity}\n{accept}\n{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _bump(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if key not in self._disk:
+                return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self._disk.pop(key, None)
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, key: str, entry: Dict[str, Any]) -> None:
+        self._remember(key, entry)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning("Failed to write GitHub cache entry: %s", e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._disk[key] = {"size": size, "last_used": time.time()}
+            self._stats["stores"] += 1
+        self._evict_if_needed(keep=key)
+
+    def _touch(self, key: str, entry: Dict[str, Any]) -> None:
+        """Entry dikonfirmasi 304: perpanjang TTL (di memory & di disk)."""
+        entry["fetched_ts"] = time.time()
+        self._store(key, entry)
+
+    def _evict_if_needed(self, keep: str) -> None:
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            total = sum(e["size"] for e in self._disk.values())
+            if total <= self.max_bytes:
+                return
+            candidates = sorted(
+                (k for k in self._disk if k != keep),
+                key=lambda k: self._disk[k]["last_used"],
+            )
+            victims = []
+            for key in candidates:
+                if total <= self.max_bytes:
+                    break
+                total -= self._disk.pop(key)["size"]
+                self._memory.pop(key, None)
+                victims.append(key)
+            self._stats["evictions"] += len(victims)
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get(self, client, url: str, headers: Optional[Dict[str, str]] = None):
+        """
+        GET lewat cache. Return CachedResponse (200 dari cache/304) atau
+        requests.Response asli (200 baru disimpan; status lain tidak di-cache).
+        """
+        url = client.url(url)
+        request_headers = dict(headers or {})
+        accept = request_headers.get("Accept", "")
+        key = self._key(url, accept, client.credentials.token())
+
+        entry = self._load(key)
+        if entry is not None and time.time() - entry["fetched_ts"] < self.ttl_seconds:
+            self._bump("fresh_hits")
+            with self._lock:
+                if key in self._disk:
+                    self._disk[key]["last_used"] = time.time()
+            return CachedResponse(entry, revalidated=False)
+
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = client.get(url, headers=request_headers)
+        if resp.status_code == 304 and entry is not None:
+            self._bump("revalidated")
+            self._touch(key, entry)
+            return CachedResponse(entry, revalidated=True)
+
+        self._bump("misses")
+        if resp.status_code == 200:
+            try:
+                body = resp.json()
+            except ValueError:
+                return resp
+            self._store(key, {
+                "url": url,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "links": resp.links or {},
+                "body": body,
+                "fetched_ts": time.time(),
+            })
+        return resp
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = len(self._disk)
+            stats["disk_bytes"] = int(sum(e["size"] for e in self._disk.values()))
+        lookups = stats["fresh_hits"] + stats["revalidated"] + stats["misses"]
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["max_bytes"] = self.max_bytes
+        stats["hit_ratio"] = round((stats["fresh_hits"] + stats["revalidated"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[ConditionalCache] = None
+_cache_disabled = False
+_cache_lock = threading.Lock()
+
+
+def get_github_cache() -> Optional[ConditionalCache]:
+    """Cache global (lazy); None jika GITHUB_CACHE_ENABLED=false."""
+    global _cache, _cache_disabled
+    if not Config.GITHUB_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None and not _cache_disabled:
+            try:
+                _cache = ConditionalCache(
+                    cache_dir=Config.GITHUB_CACHE_DIR or DEFAULT_CACHE_DIR,
+                    ttl_seconds=Config.GITHUB_CACHE_TTL_SECONDS,
+                    max_entries=Config.GITHUB_CACHE_MAX_ENTRIES,
+                    max_bytes=Config.GITHUB_CACHE_MAX_MB * 1024 * 1024,
+                )
+            except OSError as e:
+                # Direktori cache tidak bisa dibuat: jalan tanpa cache
+                logger.warning("GitHub cache disabled: %s", e)
+                _cache_disabled = True
+        return _cache
+
+
+def cached_get(client, url: str, headers: Optional[Dict[str, str]] = None):
+    """GET via cache jika aktif, selain itu langsung ke client."""
+    cache = get_github_cache()
+    if cache is None:
+        return client.get(url, headers=headers)
+    return cache.get(client, url, headers=headers)
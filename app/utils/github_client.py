@@ -0,0 +1,233 @@
+# app/utils/github_client.py
+
+import os
+import netrc
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import Config
+from app.utils.github_rate_limit import GitHubRateLimiter, RateLimited, resource_for_path
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+DEFAULT_ACCEPT = "application/vnd.github+json"
+
+# Method yang aman di-retry saat GitHub membalas 5xx (PUT collaborator idempotent)
+_RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class _CredentialCache:
+    """
+    Token GitHub dari env GITHUB_TOKEN atau ~/.netrc (machine github.com).
+    Hasil parse .netrc di-cache dan hanya di-parse ulang jika mtime/size file berubah.
+    """
+
+    def __init__(self, netrc_path: Optional[str] = None):
+        self._netrc_path = netrc_path or os.path.expanduser("~/.netrc")
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._netrc_token: Optional[str] = None
+        self._warned_missing = False
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self._netrc_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def netrc_token(self) -> Optional[str]:
+        stamp = self._file_stamp()
+        with self._lock:
+            if stamp == self._stamp:
+                return self._netrc_token
+            token = None
+            if stamp is None:
+                logger.debug(f".netrc file not found at {self._netrc_path}")
+            else:
+                try:
+                    authenticators = netrc.netrc(self._netrc_path).authenticators("github.com")
+                    if authenticators:
+                        # Di GitHub, password di .netrc adalah Personal Access Token (PAT)
+                        token = authenticators[2] or None
+                except Exception as e:
+                    logger.warning(f"Failed to read .netrc: {e}")
+            self._stamp = stamp
+            self._netrc_token = token
+            self._warned_missing = False
+            return token
+
+    def token(self) -> Optional[str]:
+        # 1. Environment Variable (murah, dibaca tiap kali agar bisa diganti runtime)
+        token = os.getenv("GITHUB_TOKEN")
+        if token:
+            return token
+        # 2. File ~/.netrc (cached)
+        token = self.netrc_token()
+        if not token and not self._warned_missing:
+            self._warned_missing = True
+            # Rate limit GitHub sangat rendah untuk unauthenticated request (60/jam)
+            logger.warning(
+                "No GitHub Token found in Env ('GITHUB_TOKEN') or .netrc. "
+                "API calls might fail or be rate-limited."
+            )
+        return token
+
+
+class _TokenAuth(requests.auth.AuthBase):
+    """
+    Pasang Bearer token dari cache. Dengan auth eksplisit, requests tidak lagi
+    mem-parse ~/.netrc sendiri di setiap request (trust_env tetap aktif untuk proxy).
+    """
+
+    def __init__(self, credentials: _CredentialCache):
+        self._credentials = credentials
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        if "Authorization" not in r.headers:
+            token = self._credentials.token()
+            if token:
+                r.headers["Authorization"] = f"Bearer {token}"
+        return r
+
+
+class GitHubClient:
+    """
+    Client GitHub API bersama:
+    - satu requests.Session keep-alive dengan connection pool (pool_size)
+    - retry + backoff otomatis (urllib3) untuk error koneksi dan 5xx
+    - header auth dari kredensial yang di-cache
+    - semua request lewat GitHubRateLimiter (pacing dari header rate limit,
+      antri + retry saat 403/429 rate limit)
+    """
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_API_URL,
+        pool_size: int = 10,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        netrc_path: Optional[str] = None,
+        rate_limiter: Optional[GitHubRateLimiter] = None,
+        rate_limit_retries: int = 2,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or GitHubRateLimiter(max_concurrency=pool_size)
+        self.rate_limit_retries = max(0, rate_limit_retries)
+        self.credentials = _CredentialCache(netrc_path)
+        self._auth = _TokenAuth(self.credentials)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=_RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, pool_size), max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def auth_headers(self, accept: str = DEFAULT_ACCEPT) -> Dict[str, str]:
+        headers = {"Accept": accept}
+        token = self.credentials.token()
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    def url(self, path_or_url: str) -> str:
+        if path_or_url.startswith(("http://", "https://")):
+            return path_or_url
+        return f"{self.base_url}/{path_or_url.lstrip('/')}"
+
+    def request(self, method: str, path_or_url: str, **kwargs: Any) -> requests.Response:
+        """
+        Kirim request ke GitHub. headers dari pemanggil ditimpakan di atas header auth
+        default; timeout default dari konfigurasi client.
+        Request menunggu giliran di rate limiter; response 403/429 karena rate limit
+        di-retry setelah jeda yang diminta GitHub (jika masih dalam max_wait),
+        selain itu response dikembalikan apa adanya ke pemanggil.
+        """
+        headers = {"Accept": DEFAULT_ACCEPT}
+        headers.update(kwargs.pop("headers", None) or {})
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path_or_url)
+        resource = resource_for_path(url)
+
+        attempt = 0
+        while True:
+            try:
+                with self.rate_limiter.slot(resource):
+                    resp = self.session.request(method, url, headers=headers, auth=self._auth, **kwargs)
+            except RateLimited as e:
+                # Dibungkus agar pemanggil yang menangkap RequestException tetap bekerja
+                raise requests.exceptions.RetryError(str(e)) from e
+            message = resp.text if resp.status_code == 403 else ""
+            wait = self.rate_limiter.observe(resource, resp.status_code, resp.headers, message)
+            if wait is None or attempt >= self.rate_limit_retries or wait > self.rate_limiter.max_wait:
+                return resp
+            attempt += 1
+            resp.close()
+
+    def get(self, path_or_url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path_or_url, **kwargs)
+
+    def put(self, path_or_url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PUT", path_or_url, **kwargs)
+
+    def post(self, path_or_url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", path_or_url, **kwargs)
+
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        POST ke endpoint GraphQL. Return body JSON ({"data": ..., "errors": [...]}).
+        RuntimeError jika HTTP gagal / body bukan JSON (caller bisa fallback ke REST).
+        """
+        try:
+            resp = self.post("/graphql", json={"query": query, "variables": variables or {}})
+        except requests.RequestException as e:
+            raise RuntimeError(f"GraphQL network error: {e}") from e
+        if resp.status_code != 200:
+            raise RuntimeError(f"GraphQL request failed: {resp.status_code} - {resp.text[:200]}")
+        try:
+            return resp.json()
+        except ValueError as e:
+            raise RuntimeError("GraphQL returned a non-JSON response") from e
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> GitHubClient:
+    """Client global (lazy) yang dipakai semua helper GitHub."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient(
+                pool_size=Config.GITHUB_HTTP_POOL_SIZE,
+                timeout=Config.GITHUB_HTTP_TIMEOUT,
+                retries=Config.GITHUB_HTTP_RETRIES,
+                rate_limiter=GitHubRateLimiter(
+                    max_concurrency=Config.GITHUB_MAX_CONCURRENCY,
+                    reserve=Config.GITHUB_RATE_LIMIT_RESERVE,
+                    max_wait=Config.GITHUB_RATE_LIMIT_MAX_WAIT,
+                ),
+            )
+        return _client
@@ -0,0 +1,235 @@
+# app/utils/github_rate_limit.py
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_CORE = "core"
+RESOURCE_GRAPHQL = "graphql"
+RESOURCE_SEARCH = "search"
+
+# Tunggu default untuk secondary rate limit tanpa Retry-After (anjuran GitHub: >= 1 menit)
+SECONDARY_LIMIT_WAIT_S = 60.0
+
+
+def resource_for_path(path: str) -> str:
+    """Bucket rate limit GitHub untuk sebuah path/URL API."""
+    path = path.split("?", 1)[0].rstrip("/")
+    if path.endswith("/graphql"):
+        return RESOURCE_GRAPHQL
+    if "/search/" in path:
+        return RESOURCE_SEARCH
+    return RESOURCE_CORE
+
+
+class RateLimited(Exception):
+    """Budget tidak akan tersedia dalam batas waktu tunggu (max_wait)."""
+
+    def __init__(self, resource: str, wait_s: float):
+        super().__init__(f"GitHub {resource} rate limit: budget available in {wait_s:.0f}s")
+        self.resource = resource
+        self.wait_s = wait_s
+
+
+class _Bucket:
+    """Token bucket satu resource, diisi dari header X-RateLimit-*."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_ts: Optional[float] = None   # epoch detik
+        self.next_grant = 0.0                   # monotonic: paling cepat request berikutnya
+        self.throttled = 0
+
+    def refill(self, now_wall: float) -> None:
+        if self.reset_ts is not None and now_wall >= self.reset_ts:
+            # Window baru: budget kembali penuh sampai header berikutnya datang
+            self.remaining = self.limit
+            self.reset_ts = None
+
+    def delay(self, now_wall: float, now: float, reserve: int) -> float:
+        """Berapa detik request berikutnya harus menunggu (0 = boleh jalan)."""
+        self.refill(now_wall)
+        if self.remaining is None:
+            return 0.0
+        if self.remaining <= 0:
+            # reset_ts None = waktu reset tidak diketahui; biarkan response berikutnya yang menentukan
+            return max(0.0, self.reset_ts - now_wall) if self.reset_ts is not None else 0.0
+        if self.remaining > reserve:
+            return 0.0
+        # Mendekati limit: sebar sisa budget secara merata sampai reset
+        return max(0.0, self.next_grant - now)
+
+    def take(self, now_wall: float, now: float, reserve: int) -> None:
+        if self.remaining is None:
+            return
+        self.remaining -= 1
+        if self.remaining < reserve and self.reset_ts is not None:
+            window = max(0.0, self.reset_ts - now_wall)
+            self.next_grant = now + window / max(1, self.remaining + 1)
+
+    def snapshot(self, now_wall: float) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_in_s": round(self.reset_ts - now_wall, 1) if self.reset_ts else None,
+            "throttled": self.throttled,
+        }
+
+
+class GitHubRateLimiter:
+    """
+    Scheduler request GitHub bersama untuk semua thread:
+    - token bucket per resource (core/graphql/search) dari header X-RateLimit-*;
+      saat sisa budget <= reserve, request di-pace merata sampai waktu reset
+    - request menunggu (antri) alih-alih gagal, maksimal max_wait detik
+    - konkurensi adaptif (AIMD): dibagi dua saat 403/429 secondary limit,
+      naik satu per `limit` request sukses
+    """
+
+    def __init__(self, max_concurrency: int = 10, reserve: int = 50, max_wait: float = 120.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserve = max(0, reserve)
+        self.max_wait = max(0.0, max_wait)
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._limit = self.max_concurrency
+        self._in_flight = 0
+        self._waiting = 0
+        self._successes = 0
+        self._blocked_until = 0.0   # monotonic; dari Retry-After / secondary limit
+        self._stats = {"requests": 0, "queued": 0, "total_wait_ms": 0, "rate_limited": 0, "rejected": 0}
+
+    def _bucket(self, resource: str) -> _Bucket:
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            bucket = self._buckets[resource] = _Bucket(resource)
+        return bucket
+
+    def _delay(self, bucket: _Bucket) -> float:
+        now = time.monotonic()
+        delay = max(0.0, self._blocked_until - now)
+        return max(delay, bucket.delay(time.time(), now, self.reserve))
+
+    @contextmanager
+    def slot(self, resource: str = RESOURCE_CORE) -> Iterator[None]:
+        """Tunggu slot konkurensi + budget resource. RateLimited jika > max_wait."""
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        queued = False
+        with self._cond:
+            bucket = self._bucket(resource)
+            self._waiting += 1
+            try:
+                while True:
+                    delay = self._delay(bucket)
+                    if delay <= 0 and self._in_flight < self._limit:
+                        break
+                    if delay > 0 and time.monotonic() + delay > deadline:
+                        self._stats["rejected"] += 1
+                        raise RateLimited(resource, delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["rejected"] += 1
+                        raise RateLimited(resource, delay)
+                    queued = True
+                    self._cond.wait(min(remaining, delay) if delay > 0 else remaining)
+            finally:
+                self._waiting -= 1
+            bucket.take(time.time(), time.monotonic(), self.reserve)
+            self._in_flight += 1
+            self._stats["requests"] += 1
+            if queued:
+                self._stats["queued"] += 1
+                self._stats["total_wait_ms"] += int((time.monotonic() - started) * 1000)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def observe(self, resource: str, status_code: int, headers: Any, message: str = "") -> Optional[float]:
+        """
+        Perbarui budget dari response. Return detik yang harus ditunggu sebelum
+        retry jika response adalah rate limit (403/429), selain itu None.
+        message: body response 403 (secondary limit kadang hanya terlihat dari pesannya).
+        """
+        now_wall = time.time()
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        retry_after = _int_header(headers, "Retry-After")
+        with self._cond:
+            bucket = self._bucket(headers.get("X-RateLimit-Resource") or resource)
+            limit = _int_header(headers, "X-RateLimit-Limit")
+            reset = _int_header(headers, "X-RateLimit-Reset")
+            if limit is not None:
+                bucket.limit = limit
+            if remaining is not None:
+                bucket.remaining = remaining
+            if reset is not None:
+                bucket.reset_ts = float(reset)
+
+            limited = status_code == 429 or (
+                status_code == 403
+                and (remaining == 0 or retry_after is not None or "rate limit" in message.lower())
+            )
+            if not limited:
+                if 200 <= status_code < 500:
+                    self._successes += 1
+                    if self._limit < self.max_concurrency and self._successes >= self._limit:
+                        self._limit += 1
+                        self._successes = 0
+                        self._cond.notify_all()
+                return None
+
+            bucket.throttled += 1
+            self._stats["rate_limited"] += 1
+            if retry_after is not None:
+                wait = float(retry_after)
+            elif remaining == 0 and bucket.reset_ts:
+                wait = max(1.0, bucket.reset_ts - now_wall)
+            else:
+                wait = SECONDARY_LIMIT_WAIT_S
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+            if remaining != 0:
+                # Secondary limit = terlalu banyak request paralel: kurangi konkurensi
+                self._limit = max(1, self._limit // 2)
+                self._successes = 0
+            logger.warning(
+                "GitHub rate limit hit (%s, HTTP %s); pausing %.0fs, concurrency %d.",
+                bucket.name, status_code, wait, self._limit,
+            )
+            return wait
+
+    def stats(self) -> Dict[str, Any]:
+        now_wall = time.time()
+        with self._cond:
+            stats: Dict[str, Any] = dict(self._stats)
+            for bucket in self._buckets.values():
+                bucket.refill(now_wall)
+            stats.update({
+                "concurrency_limit": self._limit,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "blocked_for_s": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+                "reserve": self.reserve,
+                "max_wait_s": self.max_wait,
+                "resources": {name: b.snapshot(now_wall) for name, b in self._buckets.items()},
+            })
+        queued = stats["queued"]
+        stats["avg_queue_wait_ms"] = int(stats["total_wait_ms"] / queued) if queued else 0
+        return stats
+
+
+def _int_header(headers: Any, name: str) -> Optional[int]:
+    value = headers.get(name) if headers is not None else None
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -2,126 +2,334 @@
 
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qs, urlparse
 from flask import current_app
 
-# [PERUBAHAN] Import helper auth dari file sebelah agar konsisten & support .netrc
-from app.utils.github_api import _get_auth_headers
+from app.config import Config
 
-def fetch_all_pages(url, headers):
-    """Helper function to fetch all pages of a GitHub API endpoint."""
-    all_items = []
-    page = 1
-
-    while True:
-        # Menangani URL yang mungkin sudah ada query params (misal ?foo=bar)
-        separator = "&" if "?" in url else "?"
-        full_url = f"{url}{separator}per_page=100&page={page}"
-        
-        try:
-            resp = requests.get(full_url, headers=headers, timeout=10)
-        except requests.RequestException as e:
-            raise RuntimeError(f"Network error fetching page {page}: {e}")
+# Semua request lewat GitHubClient bersama (keep-alive pool, retry 5xx, kredensial cache)
+from app.utils.github_client import get_github_client
+# Listing org/team/repo lewat cache ETag (304 tidak memakai rate limit)
+from app.utils.github_cache import cached_get
 
-        if resp.status_code != 200:
-            raise RuntimeError(f"Failed to fetch page {page}: {resp.status_code} - {resp.text}")
+PER_PAGE = 100
 
-        items = resp.json()
-        if not isinstance(items, list):
-            # Kadang jika error, GitHub return dict message, bukan list
-            raise ValueError(f"Unexpected response format at page {page}: {items}")
 
-        if not items:
-            break  # No more data
+def _page_url(url, page, per_page=PER_PAGE):
+    # Menangani URL yang mungkin sudah ada query params (misal ?foo=bar)
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}per_page={per_page}&page={page}"
 
-        all_items.extend(items)
-        page += 1
 
-    return all_items
+def _fetch_page(client, url, page, headers=None):
+    """Ambil satu halaman. Return (items, response)."""
+    try:
+        resp = cached_get(client, _page_url(url, page), headers=headers)
+    except requests.RequestException as e:
+        raise RuntimeError(f"Network error fetching page {page}: {e}")
 
-def fetch_repositories(org, mode, team_slugs):
-    """Fetch repos based on mode: all repos or team repos."""
-    
-    # [PERUBAHAN] Ambil headers dari central config (Env / .netrc)
-    headers = _get_auth_headers()
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch page {page}: {resp.status_code} - {resp.text}")
+
+    items = resp.json()
+    if not isinstance(items, list):
+        # Kadang jika error, GitHub return dict message, bukan list
+        raise ValueError(f"Unexpected response format at page {page}: {items}")
+    return items, resp
+
+
+def _last_page(resp):
+    """Nomor halaman terakhir dari header Link rel="last" (None jika tidak ada)."""
+    last = (resp.links or {}).get("last", {}).get("url")
+    if not last:
+        return None
+    values = parse_qs(urlparse(last).query).get("page")
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+def iter_pages(url, headers=None, max_workers=None):
+    """
+    Generator item dari semua halaman endpoint GitHub.
+    - Halaman 1 dibaca dulu; header Link rel="last" menentukan jumlah halaman
+    - Halaman 2..last diambil paralel, item di-yield berurutan per halaman
+      (caller bisa mulai memproses halaman awal sebelum semua selesai)
+    - Tidak ada request tambahan untuk halaman kosong di akhir
+    """
+    client = get_github_client()
+    items, resp = _fetch_page(client, url, 1, headers)
+    yield from items
+
+    last_page = _last_page(resp)
+    if last_page is None:
+        # Tanpa rel="last": ikuti rel="next" secara serial (jarang; endpoint lama)
+        page = 1
+        while "next" in (resp.links or {}) and len(items) >= PER_PAGE:
+            page += 1
+            items, resp = _fetch_page(client, url, page, headers)
+            yield from items
+        return
 
+    if last_page < 2:
+        return
+
+    workers = min(max_workers or Config.GITHUB_PAGINATION_WORKERS, last_page - 1)
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="gh-page")
+    try:
+        futures = [
+            executor.submit(_fetch_page, client, url, page, headers)
+            for page in range(2, last_page + 1)
+        ]
+        for future in futures:
+            page_items, _ = future.result()
+            yield from page_items
+    finally:
+        # Caller berhenti lebih awal / error: batalkan halaman yang belum jalan
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_all_pages(url, headers=None):
+    """Helper function to fetch all pages of a GitHub API endpoint."""
+    return list(iter_pages(url, headers=headers))
+
+
+def iter_repositories(org, mode, team_slugs):
+    """
+    Stream repo berdasarkan mode: all repos atau team repos.
+    Validasi mode dilakukan langsung (bukan saat generator pertama kali dibaca).
+    """
     if mode == "all":
-        return fetch_all_pages(f"https://api.github.com/orgs/{org}/repos", headers)
+        return iter_pages(f"https://api.github.com/orgs/{org}/repos")
 
     elif mode == "team":
         if not team_slugs:
             raise ValueError("Team slug(s) required for team mode.")
 
-        all_repos = []
-        for slug in team_slugs:
-            # Menggunakan set untuk mencegah duplikasi repo
-            team_repos = fetch_all_pages(f"https://api.github.com/orgs/{org}/teams/{slug}/repos", headers)
-            all_repos.extend(team_repos)
-        
-        # Deduplikasi repo berdasarkan ID (jika satu repo ada di >1 team)
-        unique_repos = {r['id']: r for r in all_repos}.values()
-        return list(unique_repos)
+        def _team_repos():
+            # Deduplikasi repo berdasarkan ID (jika satu repo ada di >1 team)
+            seen = set()
+            for slug in team_slugs:
+                for repo in iter_pages(f"https://api.github.com/orgs/{org}/teams/{slug}/repos"):
+                    if repo.get("id") in seen:
+                        continue
+                    seen.add(repo.get("id"))
+                    yield repo
+
+        return _team_repos()
 
     else:
         raise ValueError("Invalid mode. Must be 'all' or 'team'.")
 
-def check_user_permissions(org, username, repos, max_workers=10):
-    """Check user's role across repositories using multithreading."""
 
-    # [PERUBAHAN] Ambil headers dari central config (Env / .netrc)
-    headers = _get_auth_headers()
+def fetch_repositories(org, mode, team_slugs):
+    """Fetch repos based on mode: all repos or team repos."""
+    return list(iter_repositories(org, mode, team_slugs))
 
-    def check_repo(repo_name):
-        url = f"https://api.github.com/repos/{org}/{repo_name}/collaborators/{username}/permission"
-        try:
-            # Timeout penting untuk thread worker
-            resp = requests.get(url, headers=headers, timeout=10)
 
-            if resp.status_code == 200:
-                perm = resp.json().get("permission", "-")
-                return {
-                    "repo": repo_name,
-                    "status": "found",
-                    "role": perm
-                }
-            elif resp.status_code == 404:
-                return {
-                    "repo": repo_name,
-                    "status": "not_found",
-                    "role": "-"
-                }
-            else:
-                return {
-                    "repo": repo_name,
-                    "status": "error",
-                    "role": f"Error {resp.status_code}"
-                }
-        except Exception as e:
+# GraphQL RepositoryPermission -> nilai legacy REST /collaborators/{user}/permission
+_GRAPHQL_PERMISSION_MAP = {
+    "ADMIN": "admin",
+    "MAINTAIN": "write",
+    "WRITE": "write",
+    "TRIAGE": "read",
+    "READ": "read",
+}
+
+ENGINE_GRAPHQL = "graphql"
+ENGINE_REST = "rest"
+
+# collaborators(query:) adalah pencarian fuzzy login/nama; 100 = ukuran halaman maksimum GraphQL
+_COLLABORATOR_PAGE = 100
+
+
+def _check_repo_rest(client, org, username, repo_name):
+    """Satu REST call: /repos/{org}/{repo}/collaborators/{user}/permission."""
+    url = f"https://api.github.com/repos/{org}/{repo_name}/collaborators/{username}/permission"
+    try:
+        # Timeout penting untuk thread worker
+        resp = client.get(url)
+
+        if resp.status_code == 200:
+            perm = resp.json().get("permission", "-")
+            return {
+                "repo": repo_name,
+                "status": "found",
+                "role": perm
+            }
+        elif resp.status_code == 404:
+            return {
+                "repo": repo_name,
+                "status": "not_found",
+                "role": "-"
+            }
+        else:
             return {
                 "repo": repo_name,
                 "status": "error",
-                "role": f"NetError: {str(e)}"
+                "role": f"Error {resp.status_code}"
             }
-
-    results = []
-    
-    # Threading untuk mempercepat pengecekan banyak repo
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Mapping future ke nama repo untuk error handling
-        future_to_repo = {
-            executor.submit(check_repo, r.get("name")): r.get("name") 
-            for r in repos if r.get("name")
+    except Exception as e:
+        return {
+            "repo": repo_name,
+            "status": "error",
+            "role": f"NetError: {str(e)}"
         }
 
-        for future in as_completed(future_to_repo):
-            try:
-                results.append(future.result())
-            except Exception as e:
-                repo_name = future_to_repo[future]
+
+def _build_permission_query(repo_names):
+    """Satu query GraphQL untuk banyak repo (alias r0..rN)."""
+    fields = []
+    for i, _ in enumerate(repo_names):
+        fields.append(
+            f"r{i}: repository(owner: $org, name: $n{i}) {{"
+            f" collaborators(query: $login, first: {_COLLABORATOR_PAGE}) {{"
+            f" pageInfo {{ hasNextPage }} edges {{ permission node {{ login }} }} }}"
+            f" }}"
+        )
+    params = ", ".join(["$org: String!", "$login: String!"] + [f"$n{i}: String!" for i in range(len(repo_names))])
+    return f"query({params}) {{ {' '.join(fields)} }}"
+
+
+def _check_batch_graphql(client, org, username, repo_names):
+    """
+    Permission untuk satu batch repo via satu request GraphQL.
+    Return (results, repo yang perlu fallback REST). Repo yang null/error
+    (tidak ditemukan, tanpa akses admin, dll.) dikembalikan untuk dicek via REST,
+    begitu juga repo yang hasil pencarian collaborator-nya lebih dari satu halaman
+    tanpa login yang persis sama (login bisa ada di halaman berikutnya).
+    """
+    variables = {"org": org, "login": username}
+    variables.update({f"n{i}": name for i, name in enumerate(repo_names)})
+    body = client.graphql(_build_permission_query(repo_names), variables)
+
+    data = body.get("data")
+    if not isinstance(data, dict):
+        raise RuntimeError(f"GraphQL returned no data: {body.get('errors')}")
+
+    results, fallback = [], []
+    for i, repo_name in enumerate(repo_names):
+        repo = data.get(f"r{i}")
+        collaborators = (repo or {}).get("collaborators")
+        if collaborators is None:
+            fallback.append(repo_name)
+            continue
+        role = None
+        for edge in collaborators.get("edges") or []:
+            # query: mencocokkan login ATAU nama; ambil yang login-nya persis sama
+            if ((edge.get("node") or {}).get("login") or "").lower() == username.lower():
+                role = _GRAPHQL_PERMISSION_MAP.get(edge.get("permission"), "-")
+                break
+        if role is None:
+            if (collaborators.get("pageInfo") or {}).get("hasNextPage"):
+                fallback.append(repo_name)
+                continue
+            role = "none"
+        results.append({"repo": repo_name, "status": "found", "role": role})
+    return results, fallback
+
+
+def _user_exists(client, username):
+    """True/False dari user(login:); None jika tidak bisa dipastikan (pengecekan jalan seperti biasa)."""
+    try:
+        body = client.graphql("query($login: String!) { user(login: $login) { login } }", {"login": username})
+    except RuntimeError:
+        return None
+    data = body.get("data")
+    if not isinstance(data, dict):
+        return None
+    return data.get("user") is not None
+
+
+def check_user_permissions(org, username, repos, max_workers=10, engine=None):
+    """
+    Check user's role across repositories.
+    repos boleh berupa generator (iter_repositories): pengecekan dimulai
+    begitu halaman pertama tiba, tanpa menunggu semua halaman.
+
+    engine:
+    - "graphql" (default, GITHUB_PERMISSION_ENGINE): banyak repo per request;
+      batch/repo yang gagal otomatis dicek ulang via REST
+    - "rest": satu request per repo (perilaku lama)
+    """
+    engine = (engine or Config.GITHUB_PERMISSION_ENGINE or ENGINE_GRAPHQL).lower()
+    if engine == ENGINE_REST:
+        return _check_permissions_rest(org, username, repos, max_workers)
+    return _check_permissions_graphql(org, username, repos, max_workers)
+
+
+def _repo_names(repos):
+    for r in repos:
+        name = r.get("name")
+        if name:
+            yield name
+
+
+def _collect(futures, describe):
+    """Kumpulkan hasil future; future yang error dicatat sebagai WorkerError."""
+    results = []
+    for future in as_completed(futures):
+        try:
+            outcome = future.result()
+            results.extend(outcome if isinstance(outcome, list) else [outcome])
+        except Exception as e:
+            for repo_name in describe(futures[future]):
                 current_app.logger.error(f"❌ Error checking permission for {repo_name}: {e}")
                 results.append({
                     "repo": repo_name,
                     "status": "error",
                     "role": "WorkerError"
                 })
+    return results
+
+
+def _check_permissions_rest(org, username, repos, max_workers):
+    client = get_github_client()
+
+    # Threading untuk mempercepat pengecekan banyak repo
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Mapping future ke nama repo untuk error handling
+        future_to_repo = {
+            executor.submit(_check_repo_rest, client, org, username, name): name
+            for name in _repo_names(repos)
+        }
+        return _collect(future_to_repo, lambda name: [name])
+
+
+def _check_permissions_graphql(org, username, repos, max_workers):
+    client = get_github_client()
+    batch_size = max(1, Config.GITHUB_GRAPHQL_BATCH_SIZE)
+    # Worker thread tidak punya app context
+    logger = current_app.logger
+
+    # User yang tidak ada: sama dengan REST (404 -> not_found), tanpa query per batch
+    if _user_exists(client, username) is False:
+        return [{"repo": name, "status": "not_found", "role": "-"} for name in _repo_names(repos)]
+
+    def run_batch(batch):
+        try:
+            results, fallback = _check_batch_graphql(client, org, username, batch)
+        except Exception as e:
+            logger.warning(
+                f"GraphQL permission batch failed ({len(batch)} repos), falling back to REST: {e}"
+            )
+            results, fallback = [], list(batch)
+        # Fallback REST serial di thread batch ini (jumlahnya biasanya kecil)
+        results.extend(_check_repo_rest(client, org, username, name) for name in fallback)
+        return results
+
+    def batches():
+        batch = []
+        for name in _repo_names(repos):
+            batch.append(name)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
-    return results
\ No newline at end of file
+    # Batch dikirim begitu terkumpul (stream repo dari pagination)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, Config.GITHUB_GRAPHQL_CONCURRENCY))) as executor:
+        future_to_batch = {executor.submit(run_batch, b): b for b in batches()}
+        return _collect(future_to_batch, lambda batch: batch)
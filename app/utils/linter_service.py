@@ -3,17 +3,47 @@
 from yamllint import linter
 from yamllint.config import YamlLintConfig
 from ruamel.yaml import YAML
-import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple
+import multiprocessing
+import threading
+import hashlib
 import os
+import re
 import io
 import logging
 
+from app.config import Config
+
 # Siapkan logger untuk file ini jika diperlukan
 logger = logging.getLogger(__name__)
 
+# Config yamllint di-compile sekali; hanya dibaca oleh linter.run sehingga aman dipakai bersama antar thread
+LINT_CONFIG = YamlLintConfig('extends: default')
+
+# Instance YAML() ruamel menyimpan state parser -> satu instance per thread
+_local = threading.local()
+
+
+def _syntax_parser() -> YAML:
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = YAML()
+    return parser
+
+
+def normalize_newlines(content: str) -> str:
+    # Sebelumnya konten dibaca ulang dari file (universal newlines): CRLF/CR menjadi LF
+    if "\r" not in content:
+        return content
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+
 def run_yaml_linting(content: str) -> dict:
     """
     Menjalankan validasi dan linting pada konten YAML dalam dua tahap.
+    Konten diproses langsung dari memory (tanpa file sementara).
     
     Returns:
         dict: Berisi 'status' dan data pendukungnya.
@@ -21,25 +51,20 @@ def run_yaml_linting(content: str) -> dict:
     if not content:
         return {"status": "INVALID_SYNTAX", "error_message": "Konten tidak boleh kosong."}
 
+    content = normalize_newlines(content)
+
     # Tahap 1: Validasi Sintaksis dengan ruamel.yaml
-    yaml_parser = YAML()
     try:
-        yaml_parser.load(content)
+        _syntax_parser().load(content)
     except Exception as e:
         logger.warning(f"Invalid YAML syntax: {e}")
+        # Parser yang gagal di tengah jalan tidak dipakai ulang
+        _local.parser = None
         return {"status": "INVALID_SYNTAX", "error_message": f"Kesalahan sintaksis YAML: {str(e)}"}
 
     # Tahap 2: Validasi Kualitas (Linting) dengan yamllint
-    tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml', encoding='utf-8') as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        conf = YamlLintConfig('extends: default')
-        with open(tmp_path, 'r', encoding='utf-8') as tmp_file:
-            problems = list(linter.run(tmp_file, conf, tmp_path))
-        
+        problems = linter.run(content, LINT_CONFIG)
         results = [{'line': p.line, 'col': p.column, 'level': p.level, 'message': p.desc} for p in problems]
 
         if not results:
@@ -50,9 +75,6 @@ def run_yaml_linting(content: str) -> dict:
     except Exception as e:
         logger.exception("Error during yamllint process")
         raise e
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
 
 # [FUNGSI YANG PERLU DITAMBAHKAN]
 def auto_fix_yaml(content: str) -> str:
@@ -71,36 +93,244 @@ def auto_fix_yaml(content: str) -> str:
     if not content or not content.strip():
         return content
 
-    yaml = YAML()
-    # Konfigurasi indentasi standar:
-    # mapping=2: indentasi anak key 2 spasi
-    # sequence=4: indentasi list (dash) 4 spasi dari parent (2 spasi extra)
-    # offset=2: jarak antara dash dan kontennya
-    yaml.indent(mapping=2, sequence=4, offset=2)
-    yaml.preserve_quotes = True
-    yaml.explicit_start = True  # Paksa '---' di awal dokumen
-    yaml.width = 4096           # Hindari wrapping line yang tidak perlu
-
     try:
         # Gunakan load_all untuk mendukung multi-document (misal K8s manifests)
-        data = list(yaml.load_all(content))
-        
-        # Jika hasil load kosong (misal hanya komentar), kembalikan aslinya
-        if not data:
-            return content
-
-        string_stream = io.StringIO()
-        yaml.dump_all(data, string_stream)
-        fixed_content = string_stream.getvalue()
-        
-        # ruamel.yaml kadang tidak menambahkan newline di akhir file
-        if not fixed_content.endswith('\n'):
-            fixed_content += '\n'
-            
-        return fixed_content
+        data = list(_fixer().load_all(content))
+        return _dump_fixed(data, content)
 
     except Exception as e:
         # Jika gagal memparsing (syntax fatal), kembalikan konten asli
         # agar user bisa memperbaiki manual berdasarkan error linter.
+        _local.fixer = None
         logger.warning(f"Auto-fix failed (syntax error?): {e}")
         return content
+
+
+def _fixer() -> YAML:
+    """Instance YAML() untuk auto-fix (load + dump), satu per thread."""
+    yaml = getattr(_local, "fixer", None)
+    if yaml is None:
+        yaml = _local.fixer = YAML()
+        # Konfigurasi indentasi standar:
+        # mapping=2: indentasi anak key 2 spasi
+        # sequence=4: indentasi list (dash) 4 spasi dari parent (2 spasi extra)
+        # offset=2: jarak antara dash dan kontennya
+        yaml.indent(mapping=2, sequence=4, offset=2)
+        yaml.preserve_quotes = True
+        yaml.explicit_start = True  # Paksa '---' di awal dokumen
+        yaml.width = 4096           # Hindari wrapping line yang tidak perlu
+    return yaml
+
+
+def _dump_fixed(data: list, content: str) -> str:
+    # Jika hasil load kosong (misal hanya komentar), kembalikan aslinya
+    if not data:
+        return content
+
+    string_stream = io.StringIO()
+    _fixer().dump_all(data, string_stream)
+    fixed_content = string_stream.getvalue()
+
+    # ruamel.yaml kadang tidak menambahkan newline di akhir file
+    if not fixed_content.endswith('\n'):
+        fixed_content += '\n'
+
+    return fixed_content
+
+
+class _AnalysisCache:
+    """LRU hasil analyze_yaml, key = sha256 konten; dibatasi jumlah entry dan total ukuran teks."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self._stats["hits"] += 1
+            return item[0]
+
+    def put(self, key: str, value: dict, size: int) -> None:
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._items), "bytes": self._bytes}
+
+
+_analysis_cache = _AnalysisCache(
+    max_entries=Config.YAML_ANALYZE_CACHE_ENTRIES,
+    max_bytes=Config.YAML_ANALYZE_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def analyze_yaml(content: str) -> dict:
+    """
+    Sintaks, lint, dan hasil auto-fix sekaligus dari satu parse ruamel
+    (yamllint tetap memakai tokenizer-nya sendiri). Hasil di-cache per hash konten,
+    jadi submit ulang konten yang sama tidak diproses lagi.
+
+    Returns:
+        dict: {"results": <format run_yaml_linting>, "fixed_content": str | None, "cached": bool}
+    """
+    if not content:
+        return {"results": {"status": "INVALID_SYNTAX", "error_message": "Konten tidak boleh kosong."},
+                "fixed_content": None, "cached": False}
+
+    content = normalize_newlines(content)
+    key = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    cached = _analysis_cache.get(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    # Satu parse (multi-document) untuk cek sintaks sekaligus sumber auto-fix
+    try:
+        data = list(_fixer().load_all(content))
+    except Exception as e:
+        _local.fixer = None
+        logger.warning(f"Invalid YAML syntax: {e}")
+        analysis = {
+            "results": {"status": "INVALID_SYNTAX", "error_message": f"Kesalahan sintaksis YAML: {str(e)}"},
+            "fixed_content": None,
+        }
+    else:
+        problems = [{'line': p.line, 'col': p.column, 'level': p.level, 'message': p.desc}
+                    for p in linter.run(content, LINT_CONFIG)]
+        try:
+            fixed_content = _dump_fixed(data, content)
+        except Exception as e:
+            _local.fixer = None
+            logger.warning(f"Auto-fix failed: {e}")
+            fixed_content = None
+        analysis = {
+            "results": {"status": "VALID_WITH_ISSUES" if problems else "PERFECT", "problems": problems},
+            "fixed_content": fixed_content,
+        }
+
+    size = len(content) + len(analysis["fixed_content"] or "")
+    _analysis_cache.put(key, analysis, size)
+    return {**analysis, "cached": False}
+
+
+def analysis_cache_stats() -> dict:
+    return _analysis_cache.stats()
+
+
+# --- Mode per dokumen (manifest besar, mis. output `helm template`) ---
+
+# Penanda dokumen '---' di kolom 0 (boleh diikuti spasi/komentar/konten inline)
+_DOC_START_RE = re.compile(r'^---(?=[ \t]|$)', re.MULTILINE)
+
+_doc_pool: Optional[ProcessPoolExecutor] = None
+_doc_pool_lock = threading.Lock()
+
+
+def split_documents(content: str) -> Iterator[Tuple[int, str]]:
+    """
+    Pecah konten di setiap '---' kolom 0. Yield (nomor baris awal, teks dokumen);
+    bagian sebelum '---' pertama hanya di-yield jika berisi sesuatu selain baris kosong.
+    """
+    starts = [m.start() for m in _DOC_START_RE.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    line = 1
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(content)
+        text = content[start:end]
+        first_line = line
+        line += text.count('\n')
+        if i == 0 and not text.strip():
+            continue
+        yield first_line, text
+
+
+def lint_document(args: Tuple[int, int, str, bool, bool]) -> dict:
+    """
+    Sintaks + lint (+ auto-fix) satu dokumen; nomor baris dijadikan absolut.
+    Dijalankan di process pool, jadi argumen/hasil harus bisa di-pickle.
+    """
+    index, first_line, text, is_last, fix = args
+    offset = first_line - 1
+    if not is_last:
+        # Baris kosong sebelum '---' berikutnya bukan "akhir file" bagi yamllint
+        text = text.rstrip('\n') + '\n'
+    result = {
+        "type": "document",
+        "index": index,
+        "start_line": first_line,
+        "end_line": offset + max(1, text.count('\n')),
+    }
+
+    try:
+        data = list(_fixer().load_all(text))
+    except Exception as e:
+        _local.fixer = None
+        mark = getattr(e, 'problem_mark', None)
+        result.update({
+            "status": "INVALID_SYNTAX",
+            "error_message": f"Kesalahan sintaksis YAML: {str(e)}",
+            # Error "stream end" menunjuk baris setelah dokumen: batasi ke baris terakhirnya
+            "error_line": min(offset + mark.line + 1, result["end_line"]) if mark is not None else first_line,
+        })
+        return result
+
+    problems = [{'line': offset + p.line, 'col': p.column, 'level': p.level, 'message': p.desc}
+                for p in linter.run(text, LINT_CONFIG)]
+    result.update({"status": "VALID_WITH_ISSUES" if problems else "PERFECT", "problems": problems})
+    if fix:
+        try:
+            result["fixed_content"] = _dump_fixed(data, text)
+        except Exception as e:
+            _local.fixer = None
+            logger.warning(f"Auto-fix failed for document {index}: {e}")
+            result["fixed_content"] = text
+    return result
+
+
+def _document_workers() -> int:
+    return max(1, Config.YAML_STREAM_WORKERS or min(4, os.cpu_count() or 1))
+
+
+def _document_pool() -> ProcessPoolExecutor:
+    global _doc_pool
+    with _doc_pool_lock:
+        if _doc_pool is None:
+            workers = _document_workers()
+            # spawn: fork dari proses web yang punya banyak thread (scheduler, monitor) tidak aman
+            _doc_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _doc_pool
+
+
+def lint_documents(content: str, fix: bool = False) -> Iterator[dict]:
+    """
+    Lint per dokumen, hasil di-yield berurutan begitu tersedia.
+    Input besar (>= YAML_STREAM_PARALLEL_MIN_KB, > 1 dokumen) diproses paralel di process pool.
+    """
+    content = normalize_newlines(content)
+    docs = list(split_documents(content))
+    jobs = [(i, first_line, text, i == len(docs) - 1, fix) for i, (first_line, text) in enumerate(docs)]
+    if len(jobs) > 1 and len(content) >= Config.YAML_STREAM_PARALLEL_MIN_KB * 1024:
+        chunksize = max(1, len(jobs) // (_document_workers() * 4))
+        yield from _document_pool().map(lint_document, jobs, chunksize=chunksize)
+    else:
+        for job in jobs:
+            yield lint_document(job)
@@ -0,0 +1,336 @@
+# app/utils/permission_index.py
+
+import os
+import gzip
+import json
+import time
+import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from app.config import Config
+from app.utils.github_client import GITHUB_API_URL
+from app.utils.github_role_checker import iter_pages
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_INDEX_DIR = os.path.join(_PROJECT_ROOT, 'data', 'permission_index')
+
+# Satu byte per (user, repo): 0 = tidak ada akses
+ROLE_NAMES = ["none", "read", "triage", "write", "maintain", "admin"]
+ROLE_CODES = {name: code for code, name in enumerate(ROLE_NAMES)}
+# Nilai legacy REST /collaborators/{user}/permission (dipakai halaman Access Check)
+_LEGACY_ROLE = ["none", "read", "read", "write", "write", "admin"]
+
+
+def role_code(collaborator: Dict[str, Any]) -> int:
+    """Level akses dari item /collaborators (custom role dinilai dari flag permissions)."""
+    perms = collaborator.get("permissions") or {}
+    for flag, name in (("admin", "admin"), ("maintain", "maintain"), ("push", "write"),
+                       ("triage", "triage"), ("pull", "read")):
+        if perms.get(flag):
+            return ROLE_CODES[name]
+    return ROLE_CODES.get((collaborator.get("role_name") or "").lower(), 0)
+
+
+class PermissionMatrix:
+    """
+    Matrix user x repo untuk satu org.
+    - users: list login (append-only) + dict login(lower) -> kolom
+    - tiap repo punya satu bytearray (panjang = jumlah user saat ditulis),
+      byte ke-i = level akses user ke-i; kolom di luar panjang row = 0
+    - marker per repo (pushed_at/updated_at) untuk refresh incremental
+    Row diganti utuh (copy-on-write), jadi pembaca tidak pernah melihat row setengah jadi.
+    """
+
+    def __init__(self, org: str):
+        self.org = org
+        self._lock = threading.Lock()
+        self._users: List[str] = []
+        self._user_idx: Dict[str, int] = {}
+        self._rows: Dict[str, bytearray] = {}
+        self._markers: Dict[str, str] = {}
+        self.built_ts: Optional[float] = None
+        self.full_ts: Optional[float] = None
+
+    def _column(self, login: str) -> int:
+        key = login.lower()
+        idx = self._user_idx.get(key)
+        if idx is None:
+            idx = self._user_idx[key] = len(self._users)
+            self._users.append(login)
+        return idx
+
+    def marker(self, repo: str) -> Optional[str]:
+        with self._lock:
+            return self._markers.get(repo)
+
+    def repos(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    def set_repo(self, repo: str, marker: str, collaborators: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            cells = [(self._column(c["login"]), role_code(c)) for c in collaborators if c.get("login")]
+            row = bytearray(len(self._users))
+            for idx, code in cells:
+                row[idx] = code
+            self._rows[repo] = row
+            self._markers[repo] = marker
+
+    def retain(self, repos) -> int:
+        """Hapus repo yang sudah tidak ada di org. Return jumlah yang dihapus."""
+        keep = set(repos)
+        with self._lock:
+            gone = [r for r in self._rows if r not in keep]
+            for repo in gone:
+                self._rows.pop(repo, None)
+                self._markers.pop(repo, None)
+        return len(gone)
+
+    def user_permissions(self, login: str) -> Optional[List[Dict[str, Any]]]:
+        """Role user di semua repo (format check_user_permissions); None jika user tidak dikenal."""
+        with self._lock:
+            idx = self._user_idx.get(login.lower())
+            if idx is None:
+                return None
+            results = []
+            for repo, row in self._rows.items():
+                code = row[idx] if idx < len(row) else 0
+                results.append({"repo": repo, "status": "found", "role": _LEGACY_ROLE[code]})
+        return results
+
+    def repo_collaborators(self, repo: str, min_role: str = "read") -> Optional[List[Dict[str, str]]]:
+        """Reverse query: siapa yang punya akses >= min_role di repo. None jika repo tidak di-index."""
+        threshold = ROLE_CODES.get(min_role, 1)
+        with self._lock:
+            row = self._rows.get(repo)
+            if row is None:
+                return None
+            return [
+                {"login": self._users[idx], "role": ROLE_NAMES[code]}
+                for idx, code in enumerate(row) if code >= max(1, threshold)
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "org": self.org,
+                "users": len(self._users),
+                "repos": len(self._rows),
+                "matrix_bytes": sum(len(row) for row in self._rows.values()),
+                "built_ts": self.built_ts,
+                "full_refresh_ts": self.full_ts,
+            }
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "org": self.org,
+                "users": list(self._users),
+                "repos": {
+                    repo: {"marker": self._markers.get(repo, ""), "row": base64.b64encode(row).decode("ascii")}
+                    for repo, row in self._rows.items()
+                },
+                "built_ts": self.built_ts,
+                "full_ts": self.full_ts,
+            }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "PermissionMatrix":
+        matrix = cls(data["org"])
+        for login in data.get("users", []):
+            matrix._column(login)
+        for repo, entry in (data.get("repos") or {}).items():
+            matrix._rows[repo] = bytearray(base64.b64decode(entry["row"]))
+            matrix._markers[repo] = entry.get("marker", "")
+        matrix.built_ts = data.get("built_ts")
+        matrix.full_ts = data.get("full_ts")
+        return matrix
+
+
+class PermissionIndexer:
+    """
+    Indexer background: secara periodik membangun PermissionMatrix untuk org
+    yang dikonfigurasi. Tiap siklus hanya repo baru / yang pushed_at/updated_at
+    berubah yang collaborator-nya diambil ulang; full refresh berkala menangkap
+    perubahan akses yang tidak mengubah timestamp repo. Snapshot disimpan ke disk
+    (gzip JSON) agar restart tidak mulai dari kosong.
+    """
+
+    def __init__(self, orgs: List[str], index_dir: str, interval_seconds: int,
+                 full_refresh_seconds: int, workers: int):
+        self.orgs = [o for o in orgs if o]
+        self.index_dir = index_dir
+        self.interval_seconds = max(60, interval_seconds)
+        self.full_refresh_seconds = full_refresh_seconds
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._matrices: Dict[str, PermissionMatrix] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        os.makedirs(index_dir, exist_ok=True)
+        for org in self.orgs:
+            self._load(org)
+
+    def _snapshot_path(self, org: str) -> str:
+        return os.path.join(self.index_dir, f"{os.path.basename(org.lower())}.json.gz")
+
+    def _load(self, org: str) -> None:
+        path = self._snapshot_path(org)
+        if not os.path.isfile(path):
+            return
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self._matrices[org.lower()] = PermissionMatrix.from_snapshot(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable permission index %s: %s", path, e)
+
+    def _save(self, matrix: PermissionMatrix) -> None:
+        path = self._snapshot_path(matrix.org)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(matrix.to_snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to save permission index for %s: %s", matrix.org, e)
+
+    def matrix(self, org: str, max_age_seconds: Optional[float] = None) -> Optional[PermissionMatrix]:
+        """Matrix org jika ada (dan, jika max_age_seconds diberikan, cukup baru)."""
+        with self._lock:
+            matrix = self._matrices.get(org.lower())
+        if matrix is None or matrix.built_ts is None:
+            return None
+        if max_age_seconds is not None and time.time() - matrix.built_ts > max_age_seconds:
+            return None
+        return matrix
+
+    def refresh(self, org: str, full: bool = False) -> Dict[str, Any]:
+        started = time.time()
+        with self._lock:
+            matrix = self._matrices.get(org.lower())
+            if matrix is None:
+                matrix = self._matrices[org.lower()] = PermissionMatrix(org)
+        full = full or matrix.full_ts is None or (
+            self.full_refresh_seconds > 0 and started - matrix.full_ts > self.full_refresh_seconds
+        )
+
+        current = {}
+        for repo in iter_pages(f"{GITHUB_API_URL}/orgs/{org}/repos"):
+            name = repo.get("name")
+            if name:
+                current[name] = f"{repo.get('pushed_at') or ''}|{repo.get('updated_at') or ''}"
+        removed = matrix.retain(current)
+        changed = [name for name, marker in current.items() if full or matrix.marker(name) != marker]
+
+        def fetch(name):
+            return list(iter_pages(f"{GITHUB_API_URL}/repos/{org}/{name}/collaborators?affiliation=all"))
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="perm-index") as executor:
+            futures = {executor.submit(fetch, name): name for name in changed}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    matrix.set_repo(name, current[name], future.result())
+                except Exception as e:
+                    # Marker tidak diperbarui: repo dicoba lagi di siklus berikutnya
+                    failed += 1
+                    logger.warning("Permission index: failed to read collaborators of %s/%s: %s", org, name, e)
+
+        finished = time.time()
+        if not failed:
+            # Refresh yang gagal sebagian tidak memperbarui built_ts: index tetap
+            # dianggap basi (cek live setelah PERMISSION_INDEX_MAX_AGE_SECONDS)
+            matrix.built_ts = finished
+            if full:
+                matrix.full_ts = finished
+        self._save(matrix)
+
+        status = {
+            "org": org,
+            "full": full,
+            "repos": len(current),
+            "refreshed": len(changed) - failed,
+            "failed": failed,
+            "removed": removed,
+            "duration_ms": int((time.time() - started) * 1000),
+            "finished_ts": finished,
+        }
+        with self._lock:
+            self._status[org.lower()] = status
+        logger.info(
+            "Permission index %s: %d repos, %d refreshed (%s), %d failed, %d removed in %dms.",
+            org, len(current), status["refreshed"], "full" if full else "incremental",
+            failed, removed, status["duration_ms"],
+        )
+        return status
+
+    def _loop(self) -> None:
+        while True:
+            for org in self.orgs:
+                try:
+                    self.refresh(org)
+                except Exception as e:
+                    logger.error("Permission index refresh for %s failed: %s", org, e)
+                    with self._lock:
+                        self._status[org.lower()] = {"org": org, "error": str(e), "finished_ts": time.time()}
+            self._wakeup.wait(self.interval_seconds)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None or not self.orgs:
+                return
+            self._thread = threading.Thread(target=self._loop, name="permission-indexer", daemon=True)
+            self._thread.start()
+        logger.info("Permission indexer started for %s (every %ds).", ", ".join(self.orgs), self.interval_seconds)
+
+    def trigger(self) -> None:
+        """Jalankan siklus refresh berikutnya sekarang."""
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            matrices = dict(self._matrices)
+            status = dict(self._status)
+        return {
+            "orgs": self.orgs,
+            "interval_seconds": self.interval_seconds,
+            "running": self._thread is not None,
+            "indexes": {key: m.stats() for key, m in matrices.items()},
+            "last_refresh": status,
+        }
+
+
+_indexer: Optional[PermissionIndexer] = None
+_indexer_lock = threading.Lock()
+
+
+def get_permission_indexer() -> Optional[PermissionIndexer]:
+    """Indexer global (lazy); None jika PERMISSION_INDEX_ORGS kosong."""
+    global _indexer
+    orgs = [o.strip() for o in Config.PERMISSION_INDEX_ORGS.split(",") if o.strip()]
+    if not orgs:
+        return None
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = PermissionIndexer(
+                orgs=orgs,
+                index_dir=Config.PERMISSION_INDEX_DIR or DEFAULT_INDEX_DIR,
+                interval_seconds=Config.PERMISSION_INDEX_INTERVAL_SECONDS,
+                full_refresh_seconds=Config.PERMISSION_INDEX_FULL_REFRESH_HOURS * 3600,
+                workers=Config.PERMISSION_INDEX_WORKERS,
+            )
+        return _indexer
+
+
+def start_permission_indexer() -> None:
+    indexer = get_permission_indexer()
+    if indexer is not None:
+        indexer.start()
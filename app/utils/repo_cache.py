@@ -0,0 +1,216 @@
+# app/utils/repo_cache.py
+
+import os
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GitRunner = Callable[[List[str]], None]
+
+# Percobaan fetch ke mirror sebelum job beralih ke clone langsung
+FETCH_ATTEMPTS = 2
+FETCH_RETRY_DELAY_SECONDS = 2.0
+
+
+class MirrorUnavailable(RuntimeError):
+    """Fetch ke mirror gagal (network/auth/timeout) tapi mirror utuh: job clone langsung dari remote."""
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    """https://GitHub.com/Org/Repo.git/ -> https://github.com/org/repo"""
+    url = repo_url.strip().rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    return url.lower()
+
+
+class RepoMirrorCache:
+    """
+    Cache bare mirror (`git clone --mirror`) per URL repo.
+    - Mirror di-fetch incremental (hanya branch yang diminta) setiap dipakai
+    - Checkout per job dibuat dari mirror lokal (tanpa network)
+    - Lock per repo agar job paralel untuk repo yang sama tidak bentrok
+    - Eviction LRU saat total ukuran melewati max_bytes
+    """
+
+    def __init__(self, root: str, max_bytes: int, run_git: GitRunner):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._run_git = run_git
+        self._mirrors_dir = os.path.join(root, "mirrors")
+        os.makedirs(self._mirrors_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._repo_locks: Dict[str, threading.Lock] = {}
+        # key -> {"size": bytes, "last_used": epoch}
+        self._index: Dict[str, Dict[str, float]] = {}
+        self._stats = {"hits": 0, "misses": 0, "fetch_failures": 0, "recloned": 0, "evictions": 0}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        for entry in os.scandir(self._mirrors_dir):
+            if not entry.is_dir() or not entry.name.endswith(".git"):
+                continue
+            key = entry.name[:-4]
+            self._index[key] = {
+                "size": _dir_size(entry.path),
+                "last_used": entry.stat().st_mtime,
+            }
+
+    def _key(self, repo_url: str) -> str:
+        return hashlib.sha1(normalize_repo_url(repo_url).encode("utf-8")).hexdigest()
+
+    def _mirror_path(self, key: str) -> str:
+        return os.path.join(self._mirrors_dir, f"{key}.git")
+
+    def _repo_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._repo_locks.get(key)
+            if lock is None:
+                lock = self._repo_locks[key] = threading.Lock()
+            return lock
+
+    def _bump(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    @contextmanager
+    def mirror(self, repo_url: str, branch_name: str) -> Iterator[str]:
+        """
+        Pastikan mirror ada & branch ter-update, lalu yield path mirror.
+        Lock repo tetap dipegang selama blok with (saat checkout dibuat),
+        sehingga fetch/eviction lain tidak mengubah pack di tengah clone.
+        """
+        key = self._key(repo_url)
+        path = self._mirror_path(key)
+
+        with self._repo_lock(key):
+            if os.path.isdir(path):
+                self._fetch_branch(repo_url, path, branch_name)
+            else:
+                self._clone_mirror(repo_url, path)
+
+            with self._lock:
+                self._index[key] = {"size": self._index.get(key, {}).get("size", 0), "last_used": time.time()}
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+            yield path
+
+            size = _dir_size(path)
+            with self._lock:
+                self._index[key]["size"] = size
+
+        self._evict_if_needed(keep=key)
+
+    def _fetch_branch(self, repo_url: str, path: str, branch_name: str) -> None:
+        """
+        Fetch incremental satu branch ke mirror. Error sementara (network, auth, timeout) di-retry;
+        mirror hanya dibuang dan di-clone ulang jika memang rusak (fsck gagal).
+        """
+        error: Optional[RuntimeError] = None
+        for attempt in range(FETCH_ATTEMPTS):
+            if attempt:
+                time.sleep(FETCH_RETRY_DELAY_SECONDS)
+            try:
+                self._run_git([
+                    "git", "-C", path, "-c", "credential.helper=",
+                    "fetch", "--quiet", "--prune", "origin",
+                    f"+refs/heads/{branch_name}:refs/heads/{branch_name}",
+                ])
+                self._bump("hits")
+                return
+            except RuntimeError as e:
+                self._bump("fetch_failures")
+                if "couldn't find remote ref" in str(e):
+                    # Branch memang tidak ada di remote; mirror tetap valid
+                    raise
+                error = e
+
+        if self._is_intact(path):
+            logger.warning("Mirror fetch failed for %s; keeping mirror, cloning directly: %s", repo_url, error)
+            raise MirrorUnavailable(str(error)) from error
+
+        logger.warning("Mirror for %s is corrupt; re-cloning mirror.", repo_url)
+        shutil.rmtree(path, ignore_errors=True)
+        self._bump("recloned")
+        self._clone_mirror(repo_url, path)
+
+    def _is_intact(self, path: str) -> bool:
+        try:
+            self._run_git(["git", "-C", path, "rev-parse", "--git-dir"])
+            self._run_git(["git", "-C", path, "fsck", "--connectivity-only", "--no-dangling", "--no-progress"])
+            return True
+        except RuntimeError:
+            return False
+
+    def _clone_mirror(self, repo_url: str, path: str) -> None:
+        self._bump("misses")
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        logger.info("Creating mirror for %s", repo_url)
+        try:
+            self._run_git([
+                "git", "-c", "credential.helper=",
+                "clone", "--quiet", "--mirror",
+                "--", repo_url, tmp_path,
+            ])
+            os.replace(tmp_path, path)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _evict_if_needed(self, keep: Optional[str] = None) -> None:
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            total = sum(e["size"] for e in self._index.values())
+            candidates = sorted(
+                (k for k in self._index if k != keep),
+                key=lambda k: self._index[k]["last_used"],
+            )
+        for key in candidates:
+            if total <= self.max_bytes:
+                break
+            lock = self._repo_lock(key)
+            # Mirror yang sedang dipakai job lain dilewati
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                shutil.rmtree(self._mirror_path(key), ignore_errors=True)
+                with self._lock:
+                    entry = self._index.pop(key, None)
+                    self._stats["evictions"] += 1
+                if entry:
+                    total -= entry["size"]
+                logger.info("Evicted repo mirror %s (LRU).", key)
+            finally:
+                lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["mirrors"] = len(self._index)
+            stats["total_bytes"] = int(sum(e["size"] for e in self._index.values()))
+        lookups = stats["hits"] + stats["misses"]
+        stats["max_bytes"] = self.max_bytes
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
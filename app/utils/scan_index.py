@@ -0,0 +1,131 @@
+# app/utils/scan_index.py
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ScanIndex:
+    """
+    Index hasil scan per (project_key, commit SHA, exclusions, inclusions).
+    Dipakai untuk melewati sonar-scanner jika HEAD branch sudah pernah dianalisis
+    dengan parameter yang sama. Disimpan di file SQLite yang sama dengan task
+    store (path ":memory:" untuk backend memory).
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scan_index (
+            project_key         TEXT NOT NULL,
+            commit_sha          TEXT NOT NULL,
+            exclusions          TEXT NOT NULL,
+            inclusions          TEXT NOT NULL,
+            sonar_url           TEXT NOT NULL,
+            ce_task_id          TEXT,
+            quality_gate_failed INTEGER NOT NULL DEFAULT 0,
+            screenshot_info     TEXT,
+            updated_ts          REAL NOT NULL,
+            PRIMARY KEY (project_key, commit_sha, exclusions, inclusions)
+        );
+        CREATE INDEX IF NOT EXISTS idx_scan_index_project_updated ON scan_index (project_key, updated_ts);
+    """
+
+    def __init__(self, path: str, max_per_project: int = 20):
+        self._max_per_project = max_per_project
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+
+    @staticmethod
+    def _key(project_key: str, commit_sha: str, exclusions: Optional[str], inclusions: Optional[str]):
+        return (project_key, commit_sha, (exclusions or "").strip(), (inclusions or "").strip())
+
+    def lookup(
+        self,
+        project_key: str,
+        commit_sha: str,
+        exclusions: Optional[str] = None,
+        inclusions: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT * FROM scan_index
+                WHERE project_key = ? AND commit_sha = ? AND exclusions = ? AND inclusions = ?
+                """,
+                self._key(project_key, commit_sha, exclusions, inclusions),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "sonar_url": row["sonar_url"],
+            "ce_task_id": row["ce_task_id"],
+            "quality_gate_failed": bool(row["quality_gate_failed"]),
+            "screenshot_info": json.loads(row["screenshot_info"]) if row["screenshot_info"] else None,
+            "updated_ts": row["updated_ts"],
+        }
+
+    def record(
+        self,
+        project_key: str,
+        commit_sha: str,
+        exclusions: Optional[str],
+        inclusions: Optional[str],
+        sonar_url: str,
+        ce_task_id: Optional[str] = None,
+        quality_gate_failed: bool = False,
+    ) -> None:
+        """Simpan hasil scan baru (screenshot lama untuk key ini di-reset)."""
+        key = self._key(project_key, commit_sha, exclusions, inclusions)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO scan_index (project_key, commit_sha, exclusions, inclusions,
+                                        sonar_url, ce_task_id, quality_gate_failed, screenshot_info, updated_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?)
+                ON CONFLICT(project_key, commit_sha, exclusions, inclusions) DO UPDATE SET
+                    sonar_url           = excluded.sonar_url,
+                    ce_task_id          = excluded.ce_task_id,
+                    quality_gate_failed = excluded.quality_gate_failed,
+                    screenshot_info     = NULL,
+                    updated_ts          = excluded.updated_ts
+                """,
+                (*key, sonar_url, ce_task_id, int(quality_gate_failed), time.time()),
+            )
+            # Simpan hanya N commit terakhir per project
+            self._conn.execute(
+                """
+                DELETE FROM scan_index WHERE project_key = ? AND rowid NOT IN (
+                    SELECT rowid FROM scan_index WHERE project_key = ?
+                    ORDER BY updated_ts DESC LIMIT ?
+                )
+                """,
+                (project_key, project_key, self._max_per_project),
+            )
+            self._conn.commit()
+
+    def attach_screenshot(
+        self,
+        project_key: str,
+        commit_sha: str,
+        exclusions: Optional[str],
+        inclusions: Optional[str],
+        screenshot_info: Dict[str, Any],
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE scan_index SET screenshot_info = ?
+                WHERE project_key = ? AND commit_sha = ? AND exclusions = ? AND inclusions = ?
+                """,
+                (json.dumps(screenshot_info, default=str),
+                 *self._key(project_key, commit_sha, exclusions, inclusions)),
+            )
+            self._conn.commit()
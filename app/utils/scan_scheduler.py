@@ -0,0 +1,236 @@
+# app/utils/scan_scheduler.py
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Jendela rolling untuk menghitung throughput per stage
+THROUGHPUT_WINDOW_S = 300
+
+_HEAP_RE = re.compile(r"(\d+)\s*([kKmMgG]?)")
+
+STAGE_CLONE = "clone"
+STAGE_SCAN = "scan"
+STAGE_SCREENSHOT = "screenshot"
+
+
+def parse_heap_mb(value: Optional[str], default_mb: int = 1024) -> int:
+    """'-Xmx1900m' -> 1900, '-Xmx2g' -> 2048, '524288k' -> 512."""
+    if not value:
+        return default_mb
+    match = _HEAP_RE.search(value)
+    if not match:
+        return default_mb
+    amount = int(match.group(1))
+    unit = match.group(2).lower()
+    if unit == "g":
+        return amount * 1024
+    if unit == "k":
+        return max(1, amount // 1024)
+    if unit == "m":
+        return amount
+    # Tanpa unit = bytes (perilaku JVM)
+    return max(1, amount // (1024 * 1024))
+
+
+def detect_memory_mb() -> int:
+    """Batas memori container (cgroup v2/v1) atau RAM fisik host."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path, "r") as f:
+                raw = f.read().strip()
+            if raw.isdigit() and int(raw) < (1 << 60):
+                return int(raw) // (1024 * 1024)
+        except OSError:
+            continue
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+class ResourceBudget:
+    """
+    Budget memori (MB) & CPU (slot) bersama untuk semua stage.
+    Job hanya di-admit jika sisa budget cukup; jika tidak, menunggu.
+    """
+
+    def __init__(self, memory_mb: int, cpu_slots: int):
+        self.memory_mb = max(1, memory_mb)
+        self.cpu_slots = max(1, cpu_slots)
+        self._used_mem = 0
+        self._used_cpu = 0
+        self._cond = threading.Condition()
+
+    def _clamp(self, memory_mb: int, cpu: int):
+        # Job yang lebih besar dari total budget tetap bisa jalan (sendirian)
+        return min(memory_mb, self.memory_mb), min(cpu, self.cpu_slots)
+
+    def acquire(self, memory_mb: int, cpu: int, timeout: Optional[float] = None) -> bool:
+        memory_mb, cpu = self._clamp(memory_mb, cpu)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while (self._used_mem + memory_mb > self.memory_mb
+                   or self._used_cpu + cpu > self.cpu_slots):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self._used_mem += memory_mb
+            self._used_cpu += cpu
+            return True
+
+    def release(self, memory_mb: int, cpu: int) -> None:
+        memory_mb, cpu = self._clamp(memory_mb, cpu)
+        with self._cond:
+            self._used_mem = max(0, self._used_mem - memory_mb)
+            self._used_cpu = max(0, self._used_cpu - cpu)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "memory_mb": self.memory_mb,
+                "memory_used_mb": self._used_mem,
+                "cpu_slots": self.cpu_slots,
+                "cpu_used": self._used_cpu,
+            }
+
+
+class Stage:
+    """Satu tahap pipeline (clone/scan/screenshot) dengan batas konkurensi sendiri."""
+
+    def __init__(self, name: str, concurrency: int, memory_mb: int, cpu: int, budget: ResourceBudget):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.memory_mb = memory_mb
+        self.cpu = cpu
+        self._budget = budget
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, float] = {
+            "waiting": 0,
+            "active": 0,
+            "completed": 0,
+            "failed": 0,
+            "total_wait_ms": 0,
+            "total_latency_ms": 0,
+            "max_latency_ms": 0,
+            "last_latency_ms": 0,
+        }
+        self._finished_at: "deque[float]" = deque()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self._bump("waiting", 1)
+        queued = time.monotonic()
+        self._slots.acquire()
+        try:
+            self._budget.acquire(self.memory_mb, self.cpu)
+        except BaseException:
+            self._slots.release()
+            self._bump("waiting", -1)
+            raise
+
+        started = time.monotonic()
+        with self._lock:
+            self._metrics["waiting"] -= 1
+            self._metrics["active"] += 1
+            self._metrics["total_wait_ms"] += int((started - queued) * 1000)
+
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            latency_ms = int((time.monotonic() - started) * 1000)
+            self._budget.release(self.memory_mb, self.cpu)
+            self._slots.release()
+            with self._lock:
+                self._metrics["active"] -= 1
+                self._metrics["completed" if ok else "failed"] += 1
+                self._metrics["total_latency_ms"] += latency_ms
+                self._metrics["last_latency_ms"] = latency_ms
+                self._metrics["max_latency_ms"] = max(self._metrics["max_latency_ms"], latency_ms)
+                self._finished_at.append(time.monotonic())
+                self._trim_window()
+
+    def _trim_window(self) -> None:
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW_S
+        while self._finished_at and self._finished_at[0] < cutoff:
+            self._finished_at.popleft()
+
+    def _bump(self, key: str, delta: int) -> None:
+        with self._lock:
+            self._metrics[key] += delta
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            m = dict(self._metrics)
+            self._trim_window()
+            recent = len(self._finished_at)
+        done = m["completed"] + m["failed"]
+        m.update({
+            "concurrency": self.concurrency,
+            "memory_mb": self.memory_mb,
+            "cpu": self.cpu,
+            "avg_wait_ms": int(m["total_wait_ms"] / done) if done else 0,
+            "avg_latency_ms": int(m["total_latency_ms"] / done) if done else 0,
+            "throughput_per_min": round(recent * 60 / THROUGHPUT_WINDOW_S, 2),
+        })
+        return m
+
+
+class ScanScheduler:
+    """
+    Admission control untuk job scan. Pekerjaan berat (JVM sonar-scanner,
+    Chromium) sudah berjalan sebagai proses terpisah; scheduler ini mengatur
+    berapa banyak proses itu boleh hidup bersamaan sesuai budget RAM/CPU.
+    """
+
+    def __init__(self, budget: ResourceBudget, stages: Dict[str, Stage]):
+        self.budget = budget
+        self.stages = stages
+
+    def stage(self, name: str):
+        """Context manager: tunggu slot + budget untuk stage `name`."""
+        return self.stages[name].slot()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget.snapshot(),
+            "stages": {name: st.stats() for name, st in self.stages.items()},
+        }
+
+
+def create_scan_scheduler() -> ScanScheduler:
+    """Bangun scheduler dari Config (heap scanner = SCANNER_HEAP_LIMIT, -Xmx yang dipakai git_sonar)."""
+    scan_mem = parse_heap_mb(Config.SCANNER_HEAP_LIMIT) + Config.SCANNER_OVERHEAD_MB
+
+    memory_budget = Config.SCHEDULER_MEMORY_BUDGET_MB or int(detect_memory_mb() * 0.8)
+    cpu_budget = Config.SCHEDULER_CPU_BUDGET or (os.cpu_count() or 1)
+    budget = ResourceBudget(memory_budget, cpu_budget)
+
+    stages = {
+        STAGE_CLONE: Stage(STAGE_CLONE, Config.CLONE_CONCURRENCY, Config.CLONE_MEMORY_MB, 1, budget),
+        STAGE_SCAN: Stage(STAGE_SCAN, Config.SCAN_CONCURRENCY, scan_mem, Config.SCAN_CPU, budget),
+        STAGE_SCREENSHOT: Stage(
+            STAGE_SCREENSHOT, Config.SCREENSHOT_CONCURRENCY, Config.CHROMIUM_MEMORY_MB, 1, budget
+        ),
+    }
+    logger.info(
+        "ScanScheduler budget: %dMB / %d cpu; scan=%dMB x%d, screenshot=%dMB x%d, clone x%d",
+        memory_budget, cpu_budget, scan_mem, stages[STAGE_SCAN].concurrency,
+        Config.CHROMIUM_MEMORY_MB, stages[STAGE_SCREENSHOT].concurrency,
+        stages[STAGE_CLONE].concurrency,
+    )
+    return ScanScheduler(budget, stages)
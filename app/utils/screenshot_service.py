@@ -2,10 +2,11 @@ import os
 import uuid
 import time
 import logging
-from typing import Tuple, Optional
+from contextlib import nullcontext
+from typing import Tuple, Optional, Callable, ContextManager
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from app.config import Config
+from app.utils.browser_pool import get_browser_pool
 
 logger = logging.getLogger(__name__)
 
@@ -126,6 +127,161 @@ def _wait_for_quality_gate_update(
         page.wait_for_timeout(interval_ms)
 
 
+############################################
+#   Login (sekali per pool, bukan per scan)
+############################################
+def _is_logged_in(context, sonar_web_url: str) -> bool:
+    try:
+        resp = context.request.get(f"{sonar_web_url}/api/users/current", timeout=15000)
+        return resp.ok and bool(resp.json().get("isLoggedIn"))
+    except Exception:
+        return False
+
+
+def _login(page, sonar_web_url: str, sonar_user: str, sonar_pass: str) -> None:
+    page.goto(sonar_web_url, timeout=60000)
+    page.locator('input[name="login"]').fill(sonar_user)
+    page.locator('input[name="password"]').fill(sonar_pass)
+    page.locator('button[type="submit"]').click()
+    page.wait_for_url(f"{sonar_web_url}/projects", timeout=30000)
+
+
+def _ensure_authenticated(pool, context, page, sonar_web_url: str, sonar_user: str, sonar_pass: str) -> None:
+    """
+    Pakai storage_state dari pool jika masih valid; login form hanya
+    dilakukan saat sesi belum ada / kedaluwarsa, lalu disimpan ke pool.
+    """
+    if pool.storage_state and _is_logged_in(context, sonar_web_url):
+        logger.info("Reusing SonarQube session from browser pool.")
+        return
+    _login(page, sonar_web_url, sonar_user, sonar_pass)
+    pool.update_storage_state(context.storage_state())
+    logger.info("Login OK.")
+
+
+############################################
+#   Capture (berjalan di thread browser pool)
+############################################
+def _capture_dashboard(
+    pool,
+    context,
+    project_key: str,
+    selector: Optional[str],
+    clip_rect: Optional[dict],
+    max_wait_ms: int,
+    interval_ms: int,
+    fixed_delay_ms: int,
+    readiness: Optional[dict],
+) -> dict | None:
+    sonar_web_url = Config.SONARQUBE_WEB_URL
+    target_url = f"{sonar_web_url}/dashboard?id={project_key}"
+    page = context.new_page()
+
+    #####################################
+    # LOGIN
+    #####################################
+    try:
+        _ensure_authenticated(
+            pool, context, page, sonar_web_url, Config.SONAR_USERNAME, Config.SONAR_PASSWORD
+        )
+    except Exception as e:
+        logger.error(f"Login failed: {e}")
+        pool.update_storage_state(None)
+        return None
+
+    #####################################
+    # NAVIGATE TO PROJECT
+    #####################################
+    logger.info(f"Opening Sonar project dashboard: {target_url}")
+    page.goto(target_url, wait_until="domcontentloaded", timeout=90000)
+
+    try:
+        page.wait_for_selector(
+            "div[data-test='overview__quality-gate-panel']", timeout=90000
+        )
+        logger.info("Dashboard panel loaded.")
+    except Exception:
+        logger.warning("Dashboard panel not detected, continue anyway.")
+
+    #####################################
+    # READINESS
+    #####################################
+    quality_gate_updated = False
+    quality_gate_status = None
+    waited_ms = 0
+
+    if readiness and readiness.get("ready"):
+        # CE task sudah SUCCESS: data dashboard pasti fresh, tidak perlu polling badge
+        quality_gate_updated = True
+        quality_gate_status = readiness.get("quality_gate_status")
+        waited_ms = readiness.get("waited_ms", 0)
+        try:
+            page.wait_for_load_state("networkidle", timeout=15000)
+        except Exception:
+            logger.debug("networkidle not reached, continue anyway.")
+    else:
+        badge_selector = _get_quality_gate_badge_selector(page)
+        if badge_selector:
+            logger.info("Polling badge update...")
+            try:
+                quality_gate_updated, quality_gate_status, waited_ms = (
+                    _wait_for_quality_gate_update(
+                        page,
+                        badge_selector,
+                        max_wait_ms=max_wait_ms,
+                        interval_ms=interval_ms,
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Polling crashed: {e}")
+        else:
+            logger.info("Skipping badge polling (selector not found).")
+
+    #####################################
+    # FIXED DELAY (opt-in fallback)
+    #####################################
+    if fixed_delay_ms > 0:
+        logger.info(f"Waiting {fixed_delay_ms} ms fixed delay...")
+        page.wait_for_timeout(fixed_delay_ms)
+
+    #####################################
+    # TAKE SCREENSHOT
+    #####################################
+    filename = f"{project_key}-{uuid.uuid4()}.png"
+    filepath = os.path.join(SCREENSHOT_DIR, filename)
+
+    if clip_rect and all(k in clip_rect for k in ["x", "y", "width", "height"]):
+        page.screenshot(path=filepath, clip=clip_rect)
+    elif selector:
+        try:
+            page.locator(selector).screenshot(path=filepath)
+        except Exception:
+            page.screenshot(path=filepath, full_page=True)
+    else:
+        page.screenshot(path=filepath, full_page=True)
+
+    logger.info(f"Screenshot saved: {filepath}")
+
+    return {
+        "display_url": f"/static/screenshots/{filename}",
+        "filename": filename,
+        "quality_gate_updated": quality_gate_updated,
+        "quality_gate_status": quality_gate_status,
+        "waited_ms": waited_ms,
+        "fixed_delay_ms": fixed_delay_ms,
+        "readiness": "ce_task" if readiness and readiness.get("ready") else "badge_polling",
+        "ce_task_status": readiness.get("ce_status") if readiness else None,
+    }
+
+
+def screenshot_exists(screenshot_info: Optional[dict]) -> bool:
+    """True jika file screenshot lama masih ada (belum dibersihkan TTL)."""
+    filename = (screenshot_info or {}).get("filename")
+    if not filename:
+        return False
+    return os.path.isfile(os.path.join(SCREENSHOT_DIR, os.path.basename(filename)))
+
+
 ############################################
 #   MAIN FUNCTION
 ############################################
@@ -133,14 +289,19 @@ def take_sonar_screenshot(
     project_key: str,
     selector: str = None,
     clip_rect: dict = None,
+    readiness: Optional[dict] = None,
+    stage_gate: Optional[Callable[[str], ContextManager]] = None,
 ) -> dict | None:
     """
-    Ambil screenshot SonarQube:
-    - Login
+    Ambil screenshot SonarQube memakai browser dari pool global:
+    - readiness: hasil cek CE task (sonar_readiness) yang sudah ditunggu caller
+      di luar slot screenshot; None/belum ready -> polling badge
+    - Login (hanya jika sesi di pool belum ada / expired)
     - Buka project
-    - Polling badge Quality Gate
-    - Hard wait 30 detik agar benar2 fresh
+    - Polling badge Quality Gate (fallback jika CE task tidak diketahui/timeout)
+    - Fixed delay opsional (SCREENSHOT_FIXED_DELAY_MS, default 0)
     - Screenshot
+    stage_gate("screenshot") opsional membungkus pemakaian browser (scheduler).
     """
     _ensure_screenshot_dir()
     _cleanup_old_screenshots(_get_screenshot_ttl_seconds())
@@ -153,115 +314,28 @@ def take_sonar_screenshot(
         logger.error("Config SONARQUBE_WEB_URL/SONAR_USERNAME/SONAR_PASSWORD missing.")
         return None
 
-    target_url = f"{sonar_web_url}/dashboard?id={project_key}"
-
     # Polling config (tetap, biarkan default)
     max_wait_ms = 60000
     interval_ms = 2000
 
-    # Hard fixed delay 30 detik
-    fixed_delay_ms = 30000
+    # Fixed delay hanya jika di-set (dulu hardcode 30 detik)
+    fixed_delay_ms = max(0, Config.SCREENSHOT_FIXED_DELAY_MS)
 
     logger.info(
-        f"Screenshot config: max_wait={max_wait_ms}ms, interval={interval_ms}ms, fixed_delay={fixed_delay_ms}ms"
+        f"Screenshot config: ce_status={readiness.get('ce_status') if readiness else None}, "
+        f"max_wait={max_wait_ms}ms, interval={interval_ms}ms, fixed_delay={fixed_delay_ms}ms"
     )
 
+    gate = stage_gate or (lambda _stage: nullcontext())
+    pool = get_browser_pool()
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(viewport={"width": 1920, "height": 1200})
-            page = context.new_page()
-
-            #####################################
-            # LOGIN
-            #####################################
-            try:
-                page.goto(sonar_web_url, timeout=60000)
-                page.locator('input[name="login"]').fill(sonar_user)
-                page.locator('input[name="password"]').fill(sonar_pass)
-                page.locator('button[type="submit"]').click()
-                page.wait_for_url(f"{sonar_web_url}/projects", timeout=30000)
-                logger.info("Login OK.")
-            except Exception as e:
-                logger.error(f"Login failed: {e}")
-                browser.close()
-                return None
-
-            #####################################
-            # NAVIGATE TO PROJECT
-            #####################################
-            logger.info(f"Opening Sonar project dashboard: {target_url}")
-            page.goto(target_url, wait_until="domcontentloaded", timeout=90000)
-
-            try:
-                page.wait_for_selector(
-                    "div[data-test='overview__quality-gate-panel']", timeout=90000
+        with gate("screenshot"):
+            return pool.run(
+                lambda context: _capture_dashboard(
+                    pool, context, project_key, selector, clip_rect,
+                    max_wait_ms, interval_ms, fixed_delay_ms, readiness,
                 )
-                logger.info("Dashboard panel loaded.")
-            except Exception:
-                logger.warning("Dashboard panel not detected, continue anyway.")
-
-            #####################################
-            # POLLING BADGE
-            #####################################
-            badge_selector = _get_quality_gate_badge_selector(page)
-
-            quality_gate_updated = False
-            quality_gate_status = None
-            waited_ms = 0
-
-            if badge_selector:
-                logger.info("Polling badge update...")
-                try:
-                    quality_gate_updated, quality_gate_status, waited_ms = (
-                        _wait_for_quality_gate_update(
-                            page,
-                            badge_selector,
-                            max_wait_ms=max_wait_ms,
-                            interval_ms=interval_ms,
-                        )
-                    )
-                except Exception as e:
-                    logger.error(f"Polling crashed: {e}")
-            else:
-                logger.info("Skipping badge polling (selector not found).")
-
-            #####################################
-            # FIXED DELAY 30 SECONDS
-            #####################################
-            logger.info(f"Waiting {fixed_delay_ms} ms fixed delay (30 seconds)...")
-            page.wait_for_timeout(fixed_delay_ms)
-
-            #####################################
-            # TAKE SCREENSHOT
-            #####################################
-            filename = f"{project_key}-{uuid.uuid4()}.png"
-            filepath = os.path.join(SCREENSHOT_DIR, filename)
-
-            try:
-                if clip_rect and all(k in clip_rect for k in ["x", "y", "width", "height"]):
-                    page.screenshot(path=filepath, clip=clip_rect)
-                elif selector:
-                    try:
-                        page.locator(selector).screenshot(path=filepath)
-                    except Exception:
-                        page.screenshot(path=filepath, full_page=True)
-                else:
-                    page.screenshot(path=filepath, full_page=True)
-
-                logger.info(f"Screenshot saved: {filepath}")
-            finally:
-                browser.close()
-
-            return {
-                "display_url": f"/static/screenshots/{filename}",
-                "filename": filename,
-                "quality_gate_updated": quality_gate_updated,
-                "quality_gate_status": quality_gate_status,
-                "waited_ms": waited_ms,
-                "fixed_delay_ms": fixed_delay_ms,
-            }
-
+            )
     except Exception as e:
         logger.error(f"Unexpected screenshot error: {e}")
         return None
@@ -0,0 +1,91 @@
+# app/utils/sonar_readiness.py
+
+import logging
+from typing import Any, Dict, Optional
+
+import requests
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Status akhir compute-engine task SonarQube
+CE_TERMINAL_STATUSES = {"SUCCESS", "FAILED", "CANCELED"}
+
+
+def _sonar_get(session: requests.Session, path: str, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    host_url = (Config.SONAR_HOST_URL or "").rstrip("/")
+    try:
+        resp = session.get(f"{host_url}{path}", params=params, timeout=10)
+    except requests.RequestException as e:
+        logger.warning("SonarQube API %s unreachable: %s", path, e)
+        return None
+    if resp.status_code != 200:
+        logger.warning("SonarQube API %s returned %s", path, resp.status_code)
+        return None
+    try:
+        return resp.json()
+    except ValueError:
+        return None
+
+
+def _session() -> requests.Session:
+    session = requests.Session()
+    token = (Config.SONAR_LOGIN_TOKEN or "").strip()
+    if token:
+        # Token SonarQube dikirim sebagai username basic-auth dengan password kosong
+        session.auth = (token, "")
+    return session
+
+
+def latest_analysis_revision(project_key: str) -> Optional[str]:
+    """Commit (SCM revision) dari analysis terbaru project; None jika tidak diketahui."""
+    session = _session()
+    try:
+        data = _sonar_get(session, "/api/project_analyses/search", {"project": project_key, "ps": "1"})
+    finally:
+        session.close()
+    analyses = (data or {}).get("analyses") or []
+    return analyses[0].get("revision") if analyses else None
+
+
+def _fetch_quality_gate_status(session: requests.Session, analysis_id: str) -> Optional[str]:
+    data = _sonar_get(session, "/api/qualitygates/project_status", {"analysisId": analysis_id})
+    if not data:
+        return None
+    return (data.get("projectStatus") or {}).get("status")
+
+
+def check_analysis(ce_task_id: str) -> Dict[str, Any]:
+    """
+    Satu kali cek compute-engine task hasil sonar-scanner (tanpa menunggu); polling dan
+    timeout dijadwalkan caller (stage readiness di app.tasks).
+
+    Returns dict:
+        ready               -> True jika CE task SUCCESS
+        finished            -> True jika CE task sudah di status akhir (SUCCESS/FAILED/CANCELED)
+        ce_status           -> status terakhir (PENDING/IN_PROGRESS/SUCCESS/...), None jika tidak terbaca
+        analysis_id         -> ID analysis (jika ada)
+        quality_gate_status -> OK / ERROR / WARN / None
+    """
+    session = _session()
+    result: Dict[str, Any] = {
+        "ready": False,
+        "finished": False,
+        "ce_status": None,
+        "analysis_id": None,
+        "quality_gate_status": None,
+    }
+    try:
+        data = _sonar_get(session, "/api/ce/task", {"id": ce_task_id})
+        task = (data or {}).get("task") or {}
+        result["ce_status"] = task.get("status")
+        if result["ce_status"] in CE_TERMINAL_STATUSES:
+            result["finished"] = True
+            result["analysis_id"] = task.get("analysisId")
+            result["ready"] = result["ce_status"] == "SUCCESS"
+        if result["ready"] and result["analysis_id"]:
+            result["quality_gate_status"] = _fetch_quality_gate_status(session, result["analysis_id"])
+    finally:
+        session.close()
+    return result
@@ -0,0 +1,111 @@
+# app/utils/ssl_batch.py
+
+import ssl
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.utils.ssl_service import (
+    apply_score,
+    describe_ssl_error,
+    is_valid_target,
+    new_result,
+    parse_target,
+    probe_https_async,
+)
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def parse_targets(raw_targets: List[Any]) -> List[Tuple[str, int]]:
+    """Normalisasi + dedupe daftar target (hostname, host:port, atau URL); urutan dijaga."""
+    targets = []
+    for raw in raw_targets:
+        if not isinstance(raw, str) or not raw.strip():
+            continue
+        hostname, port = parse_target(raw)
+        if hostname:
+            targets.append((hostname.lower(), port))
+    return list(dict.fromkeys(targets))
+
+
+async def _check_one(hostname: str, port: int, context: ssl.SSLContext, timeout: float) -> Dict[str, Any]:
+    result = new_result(hostname)
+    result["port"] = port
+    if not is_valid_target(hostname):
+        result["error"] = "Invalid target or Restricted IP (Private/Local)"
+        return result
+
+    started = time.monotonic()
+    try:
+        # Satu koneksi non-blocking untuk cert + header; timeout mencakup semua tahap
+        details, headers, timing = await asyncio.wait_for(
+            probe_https_async(hostname, port, context), timeout=timeout
+        )
+        result["timing"] = timing
+        apply_score(result, details, headers)
+    except asyncio.TimeoutError:
+        result["error"] = f"Timed out after {timeout:.0f}s"
+    except Exception as e:
+        describe_ssl_error(hostname, result, e)
+    result["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+    return result
+
+
+async def _run_batch(targets, concurrency: int, timeout: float, emit) -> None:
+    context = ssl.create_default_context()
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, hostname: str, port: int) -> None:
+        async with sem:
+            result = await _check_one(hostname, port, context, timeout)
+        emit({"index": index, "target": f"{hostname}:{port}", "result": result})
+
+    await asyncio.gather(*(run(i, host, port) for i, (host, port) in enumerate(targets)))
+
+
+def check_ssl_batch(targets: List[Tuple[str, int]], concurrency: int, timeout: float) -> Iterator[Dict[str, Any]]:
+    """
+    Cek banyak target secara konkuren (asyncio, maksimal `concurrency` sekaligus).
+    Event loop berjalan di thread sendiri; hasil di-yield begitu tiap target selesai.
+    Jika caller berhenti membaca (client putus), semua cek yang tersisa dibatalkan.
+    """
+    results: "queue.Queue[Any]" = queue.Queue()
+    loop = asyncio.new_event_loop()
+    holder: Dict[str, asyncio.Future] = {}
+
+    def runner() -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            holder["task"] = loop.create_task(_run_batch(targets, concurrency, timeout, results.put))
+            loop.run_until_complete(holder["task"])
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"SSL batch failed: {e}")
+        finally:
+            results.put(_DONE)
+            # getaddrinfo memakai default executor loop
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    thread = threading.Thread(target=runner, name="ssl-batch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        task = holder.get("task")
+        if task is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # loop baru saja selesai
@@ -0,0 +1,362 @@
+# app/utils/ssl_monitor.py
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.utils.ssl_batch import parse_targets
+from app.utils.ssl_service import get_ssl_details
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_WATCHLIST_FILE = os.path.join(_PROJECT_ROOT, 'data', 'ssl_monitor.json')
+
+STATUS_ORDER = ["expired", "error", "critical", "warning", "ok", "pending"]
+
+# Field hasil get_ssl_details yang disimpan per host (header/score detail tidak perlu untuk monitor)
+_DETAIL_KEYS = ("common_name", "issuer", "expiry_date", "expires_ts", "protocol", "serial_number")
+
+
+def target_key(hostname: str, port: int) -> str:
+    return f"{hostname.lower()}:{port}"
+
+
+class SSLMonitor:
+    """
+    Watchlist sertifikat: host dicek ulang terjadwal oleh worker pool background,
+    hasil terakhir + riwayat expiry disimpan per host (memory + file JSON).
+    Query dashboard/feed hanya membaca cache ini, tidak pernah menunggu jaringan.
+    """
+
+    def __init__(self, watchlist_file: str, interval_seconds: int, retry_seconds: int,
+                 workers: int, history_size: int, warn_days: int, critical_days: int,
+                 max_hosts: int, seed: Optional[List[Tuple[str, int]]] = None):
+        self.watchlist_file = watchlist_file
+        self.interval_seconds = max(60, interval_seconds)
+        self.retry_seconds = max(30, min(retry_seconds, self.interval_seconds))
+        self.workers = max(1, workers)
+        self.history_size = max(2, history_size)
+        self.warn_days = warn_days
+        self.critical_days = critical_days
+        self.max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._last_cycle: Dict[str, Any] = {}
+        self._load()
+        for hostname, port in seed or []:
+            self._entries.setdefault(target_key(hostname, port), self._new_entry(hostname, port))
+
+    @staticmethod
+    def _new_entry(hostname: str, port: int) -> Dict[str, Any]:
+        return {
+            "target": target_key(hostname, port),
+            "hostname": hostname.lower(),
+            "port": port,
+            "added_ts": time.time(),
+            "next_check_ts": 0.0,
+            "last_checked_ts": None,
+            "last_ok_ts": None,
+            "error": None,
+            "failures": 0,
+            "grade": None,
+            "score": None,
+            "valid": False,
+            "details": {},
+            "renewed_ts": None,
+            "history": [],   # [{"ts", "expires_ts", "days_left"}], terlama dulu
+        }
+
+    # --- Persistensi ---
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.watchlist_file):
+            return
+        try:
+            with open(self.watchlist_file, "r", encoding="utf-8") as f:
+                hosts = json.load(f).get("hosts") or []
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Ignoring unreadable SSL watchlist %s: %s", self.watchlist_file, e)
+            return
+        for entry in hosts:
+            if isinstance(entry, dict) and entry.get("hostname") and entry.get("port"):
+                base = self._new_entry(entry["hostname"], int(entry["port"]))
+                base.update(entry)
+                self._entries[base["target"]] = base
+
+    def _save(self) -> None:
+        with self._lock:
+            payload = json.dumps({"hosts": list(self._entries.values())})
+        path = self.watchlist_file
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with self._save_lock:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning("Failed to save SSL watchlist: %s", e)
+
+    # --- Watchlist ---
+
+    def add(self, targets: List[Tuple[str, int]]) -> Dict[str, List[str]]:
+        """Tambah host ke watchlist (dicek di siklus berikutnya, yang langsung dipicu)."""
+        added, existing, rejected = [], [], []
+        with self._lock:
+            for hostname, port in targets:
+                key = target_key(hostname, port)
+                if key in self._entries:
+                    existing.append(key)
+                elif len(self._entries) >= self.max_hosts:
+                    rejected.append(key)
+                else:
+                    self._entries[key] = self._new_entry(hostname, port)
+                    added.append(key)
+        if added:
+            self._save()
+            self.trigger()
+        return {"added": added, "existing": existing, "rejected": rejected}
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            removed = self._entries.pop(key.lower(), None) is not None
+        if removed:
+            self._save()
+        return removed
+
+    def recheck(self, key: Optional[str] = None) -> int:
+        """Jadwalkan cek ulang sekarang untuk satu host (atau semua jika key None)."""
+        with self._lock:
+            entries = [self._entries[key.lower()]] if key and key.lower() in self._entries else (
+                [] if key else list(self._entries.values())
+            )
+            for entry in entries:
+                entry["next_check_ts"] = 0.0
+        if entries:
+            self.trigger()
+        return len(entries)
+
+    # --- Pengecekan ---
+
+    def _record(self, key: str, result: Dict[str, Any], checked_ts: float) -> None:
+        details = result.get("details") or {}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return   # dihapus selama cek berjalan
+            entry["last_checked_ts"] = checked_ts
+            entry["error"] = result.get("error")
+            if not details.get("expires_ts"):
+                # Gagal total (DNS/timeout/handshake): simpan sertifikat terakhir, retry lebih cepat
+                entry["failures"] += 1
+                entry["valid"] = False
+                entry["next_check_ts"] = checked_ts + self.retry_seconds
+                return
+
+            previous = entry["details"].get("expires_ts")
+            if previous and details["expires_ts"] > previous:
+                entry["renewed_ts"] = checked_ts
+            entry.update({
+                "failures": 0,
+                "last_ok_ts": checked_ts,
+                "next_check_ts": checked_ts + self.interval_seconds,
+                "grade": result.get("grade"),
+                "score": result.get("score"),
+                "valid": bool(result.get("valid")),
+                "details": {k: details.get(k) for k in _DETAIL_KEYS},
+            })
+            history = entry["history"]
+            history.append({"ts": checked_ts, "expires_ts": details["expires_ts"], "days_left": details.get("days_left")})
+            del history[:-self.history_size]
+
+    def _check(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            target = f"{entry['hostname']}:{entry['port']}" if entry else None
+        if target is None:
+            return
+        try:
+            result = get_ssl_details(target)
+        except Exception as e:
+            result = {"error": str(e), "details": {}}
+        self._record(key, result, time.time())
+
+    def run_due(self) -> Dict[str, Any]:
+        """Cek semua host yang sudah jatuh tempo (paralel, maksimal `workers`)."""
+        started = time.time()
+        with self._lock:
+            due = [key for key, e in self._entries.items() if e["next_check_ts"] <= started]
+        if due:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ssl-monitor") as executor:
+                for future in as_completed([executor.submit(self._check, key) for key in due]):
+                    future.result()
+            self._save()
+        with self._lock:
+            failed = sum(1 for key in due if key in self._entries and self._entries[key]["failures"])
+        status = {
+            "checked": len(due),
+            "failed": failed,
+            "duration_ms": int((time.time() - started) * 1000),
+            "finished_ts": time.time(),
+        }
+        if due:
+            self._last_cycle = status
+            logger.info("SSL monitor: %d hosts checked, %d failed in %dms.", len(due), failed, status["duration_ms"])
+        return status
+
+    def _next_wait(self) -> float:
+        with self._lock:
+            upcoming = [e["next_check_ts"] for e in self._entries.values()]
+        if not upcoming:
+            return float(self.interval_seconds)
+        return min(float(self.interval_seconds), max(1.0, min(upcoming) - time.time()))
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error("SSL monitor cycle failed: %s", e)
+            self._wakeup.wait(self._next_wait())
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="ssl-monitor", daemon=True)
+            self._thread.start()
+        logger.info("SSL monitor started (%d hosts, every %ds).", len(self._entries), self.interval_seconds)
+
+    def trigger(self) -> None:
+        self._wakeup.set()
+
+    # --- Query (hanya dari cache) ---
+
+    def _view(self, entry: Dict[str, Any], now: float) -> Dict[str, Any]:
+        expires_ts = entry["details"].get("expires_ts")
+        # Dihitung ulang saat query: hasil cache tetap akurat walau cek terakhir sudah lama
+        days_left = math.floor((expires_ts - now) / 86400) if expires_ts else None
+
+        if entry["last_checked_ts"] is None:
+            status = "pending"
+        elif days_left is not None and days_left < 0:
+            status = "expired"
+        elif entry["error"] or days_left is None:
+            status = "error"
+        elif days_left <= self.critical_days:
+            status = "critical"
+        elif days_left <= self.warn_days:
+            status = "warning"
+        else:
+            status = "ok"
+
+        history = entry["history"]
+        if len(history) > 1 and history[-2]["expires_ts"] < history[-1]["expires_ts"]:
+            trend = "renewed"
+        elif len(history) > 1 and history[-2]["expires_ts"] > history[-1]["expires_ts"]:
+            trend = "shortened"   # sertifikat diganti dengan yang kedaluwarsa lebih cepat
+        elif history:
+            trend = "steady"
+        else:
+            trend = None
+
+        view = {k: entry[k] for k in ("target", "hostname", "port", "added_ts", "last_checked_ts",
+                                      "last_ok_ts", "next_check_ts", "error", "failures", "grade",
+                                      "score", "valid", "renewed_ts")}
+        view.update({
+            "status": status,
+            "days_left": days_left,
+            "details": dict(entry["details"]),
+            "trend": trend,
+            "history": [{"ts": h["ts"], "days_left": h["days_left"]} for h in history],
+        })
+        return view
+
+    def feed(self, page: int = 1, per_page: int = 50, status: Optional[str] = None,
+             query: Optional[str] = None) -> Dict[str, Any]:
+        """Watchlist terurut expiry (paling cepat habis dulu; tanpa sertifikat di akhir), per halaman."""
+        now = time.time()
+        with self._lock:
+            views = [self._view(e, now) for e in self._entries.values()]
+
+        counts = {name: 0 for name in STATUS_ORDER}
+        for view in views:
+            counts[view["status"]] += 1
+        if status:
+            views = [v for v in views if v["status"] == status]
+        if query:
+            views = [v for v in views if query.lower() in v["target"]]
+        views.sort(key=lambda v: (v["days_left"] is None, v["days_left"] or 0, v["target"]))
+
+        per_page = max(1, min(per_page, 200))
+        total = len(views)
+        pages = max(1, math.ceil(total / per_page))
+        page = max(1, min(page, pages))
+        start = (page - 1) * per_page
+        return {
+            "items": views[start:start + per_page],
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "pages": pages,
+            "counts": counts,
+            "warn_days": self.warn_days,
+            "critical_days": self.critical_days,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = len(self._entries)
+            next_check = min((e["next_check_ts"] for e in self._entries.values()), default=None)
+        return {
+            "hosts": hosts,
+            "max_hosts": self.max_hosts,
+            "interval_seconds": self.interval_seconds,
+            "retry_seconds": self.retry_seconds,
+            "workers": self.workers,
+            "running": self._thread is not None,
+            "next_check_in_s": round(max(0.0, next_check - time.time()), 1) if next_check is not None else None,
+            "last_cycle": self._last_cycle,
+        }
+
+
+_monitor: Optional[SSLMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_ssl_monitor() -> Optional[SSLMonitor]:
+    """Monitor global (lazy); None jika SSL_MONITOR_ENABLED=false."""
+    global _monitor
+    if not Config.SSL_MONITOR_ENABLED:
+        return None
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = SSLMonitor(
+                watchlist_file=Config.SSL_MONITOR_FILE or DEFAULT_WATCHLIST_FILE,
+                interval_seconds=Config.SSL_MONITOR_INTERVAL_SECONDS,
+                retry_seconds=Config.SSL_MONITOR_RETRY_SECONDS,
+                workers=Config.SSL_MONITOR_WORKERS,
+                history_size=Config.SSL_MONITOR_HISTORY,
+                warn_days=Config.SSL_MONITOR_WARN_DAYS,
+                critical_days=Config.SSL_MONITOR_CRITICAL_DAYS,
+                max_hosts=Config.SSL_MONITOR_MAX_HOSTS,
+                seed=parse_targets(Config.SSL_MONITOR_HOSTS.split(",")),
+            )
+        return _monitor
+
+
+def start_ssl_monitor() -> None:
+    monitor = get_ssl_monitor()
+    if monitor is not None:
+        monitor.start()
@@ -1,13 +1,21 @@
+import io
 import ssl
+import time
 import socket
+import asyncio
 import datetime
-import requests
+import http.client
 import ipaddress
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 import logging
 
+from app.config import Config
+
 logger = logging.getLogger(__name__)
 
+# Batas ukuran status line + header response yang dibaca probe
+MAX_HEAD_BYTES = 64 * 1024
+
 def is_valid_target(hostname: str) -> bool:
     """
     Check if target is valid.
@@ -16,156 +24,379 @@ def is_valid_target(hostname: str) -> bool:
     """
     return True
 
-def check_security_headers(hostname: str) -> dict:
+# --- STRICT RULES DEFINITION (ADDITIVE - MAX 40 POINTS) ---
+HEADER_CHECKS = [
+    {
+        "key": "strict-transport-security",
+        "label": "HSTS",
+        "desc": "Prevents Man-in-the-Middle & enforces HTTPS.",
+        "points": 10
+    },
+    {
+        "key": "content-security-policy",
+        "label": "CSP",
+        "desc": "Primary mitigation for XSS & Data Injection attacks.",
+        "points": 10
+    },
+    {
+        "key": "x-frame-options",
+        "label": "X-Frame-Options",
+        "desc": "Prevents Clickjacking attacks.",
+        "points": 5
+    },
+    {
+        "key": "x-content-type-options",
+        "label": "X-Content-Type",
+        "desc": "Prevents MIME-Sniffing (nosniff).",
+        "points": 5
+    },
+    {
+        "key": "referrer-policy",
+        "label": "Referrer-Policy",
+        "desc": "Controls referrer data privacy.",
+        "points": 5
+    },
+    {
+        "key": "permissions-policy",
+        "label": "Permissions-Policy",
+        "desc": "Controls browser features (camera, mic, etc).",
+        "points": 5
+    }
+]
+
+# Info Leak Checks (Warning Only)
+LEAK_CHECKS = [
+    {"key": "server", "label": "Server Info Leak"},
+    {"key": "x-powered-by", "label": "X-Powered-By Leak"},
+    {"key": "x-aspnet-version", "label": "ASP.NET Version Leak"}
+]
+
+# Browser-like User-Agent to avoid WAF/Firewall blocking
+BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def evaluate_security_headers(raw_headers) -> dict:
     """
-    Fetches HTTP headers and evaluates them strictly based on modern security standards.
-    Returns penalty score (negative) and details.
+    Evaluates response headers strictly based on modern security standards.
+    raw_headers: mapping header -> value (case apa pun). Tanpa I/O.
     """
-    target_url = f"https://{hostname}"
-    headers_info = {
+    headers = {k.lower(): v for k, v in raw_headers.items()}
+    total_points = 0
+    details = []
+
+    # 1. Check Headers (Bonus Points)
+    for check in HEADER_CHECKS:
+        val = headers.get(check["key"])
+        item = {
+            "name": check["label"],
+            "header": check["key"],
+            "value": val,
+            "desc": check["desc"],
+            "status": "missing"
+        }
+
+        if val:
+            item["status"] = "good"
+            total_points += check["points"]
+        else:
+            item["status"] = "missing"
+
+        details.append(item)
+
+    # 2. Check Info Leaks (No Score Impact, just warning)
+    for check in LEAK_CHECKS:
+        val = headers.get(check["key"])
+        if val:
+            details.append({
+                "name": check["label"],
+                "header": check["key"],
+                "value": val,
+                "desc": "Potentially helps hackers identify server version.",
+                "status": "warning"
+            })
+
+    return {
+        "score_penalty": 0,
+        "details": details,
+        "raw": dict(raw_headers),
+        "missing_critical": [],
+        "score_bonus": total_points,
+    }
+
+
+def _headers_error(error: str) -> dict:
+    return {
         "score_penalty": 0,
         "details": [],
         "raw": {},
-        "missing_critical": [] 
+        "missing_critical": [],
+        "error": error,
     }
 
-    try:
-        # Browser-like User-Agent to avoid WAF/Firewall blocking
-        req_headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
 
-        # Disable InsecureRequestWarning because we strictly set verify=False
-        # (SSL Validation is done separately in get_ssl_details via socket)
-        requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
-
-        # verify=False: To allow fetching headers even if SSL is considered invalid by container (e.g. Self-Signed)
-        resp = requests.get(target_url, headers=req_headers, timeout=10, allow_redirects=True, verify=False)
-        
-        headers = {k.lower(): v for k, v in resp.headers.items()} 
-        headers_info["raw"] = dict(resp.headers)
-
-        # --- STRICT RULES DEFINITION (ADDITIVE - MAX 40 POINTS) ---
-        checks = [
-            {
-                "key": "strict-transport-security",
-                "label": "HSTS",
-                "desc": "Prevents Man-in-the-Middle & enforces HTTPS.",
-                "points": 10
-            },
-            {
-                "key": "content-security-policy",
-                "label": "CSP",
-                "desc": "Primary mitigation for XSS & Data Injection attacks.",
-                "points": 10
-            },
-            {
-                "key": "x-frame-options",
-                "label": "X-Frame-Options",
-                "desc": "Prevents Clickjacking attacks.",
-                "points": 5
-            },
-            {
-                "key": "x-content-type-options",
-                "label": "X-Content-Type",
-                "desc": "Prevents MIME-Sniffing (nosniff).",
-                "points": 5
-            },
-            {
-                "key": "referrer-policy",
-                "label": "Referrer-Policy",
-                "desc": "Controls referrer data privacy.",
-                "points": 5
-            },
-            {
-                "key": "permissions-policy",
-                "label": "Permissions-Policy",
-                "desc": "Controls browser features (camera, mic, etc).",
-                "points": 5
-            }
-        ]
-
-        # Info Leak Checks (Warning Only)
-        leak_checks = [
-            {"key": "server", "label": "Server Info Leak"},
-            {"key": "x-powered-by", "label": "X-Powered-By Leak"},
-            {"key": "x-aspnet-version", "label": "ASP.NET Version Leak"}
-        ]
-
-        total_points = 0
-        details = []
-
-        # 1. Check Headers (Bonus Points)
-        for check in checks:
-            val = headers.get(check["key"])
-            item = {
-                "name": check["label"],
-                "header": check["key"],
-                "value": val,
-                "desc": check["desc"],
-                "status": "missing"
-            }
-
-            if val:
-                item["status"] = "good"
-                total_points += check["points"]
-            else:
-                item["status"] = "missing"
-            
-            details.append(item)
-
-        # 2. Check Info Leaks (No Score Impact, just warning)
-        for check in leak_checks:
-            val = headers.get(check["key"])
-            if val:
-                details.append({
-                    "name": check["label"],
-                    "header": check["key"],
-                    "value": val,
-                    "desc": "Potentially helps hackers identify server version.",
-                    "status": "warning"
-                })
-
-        headers_info["details"] = details
-        headers_info["score_bonus"] = total_points
+def _ms(start: float) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _request_bytes(method: str, hostname: str, port: int, path: str) -> bytes:
+    if not hostname.isascii():
+        hostname = hostname.encode("idna").decode("ascii")
+    host = hostname if port == 443 else f"{hostname}:{port}"
+    return (
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        f"User-Agent: {BROWSER_USER_AGENT}\r\n"
+        "Accept: */*\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("ascii")
+
+
+def parse_response_head(raw: bytes):
+    """b"HTTP/1.1 200 OK\\r\\nK: v..." -> (status, HTTPMessage header case-insensitive)."""
+    head = raw.split(b"\r\n\r\n", 1)[0]
+    status_line, _, header_block = head.partition(b"\r\n")
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise ValueError(f"Invalid HTTP response: {status_line[:80]!r}")
+    headers = http.client.parse_headers(io.BytesIO(header_block + b"\r\n\r\n"))
+    return int(parts[1]), headers
+
+
+def redirect_target(location: str, hostname: str, port: int, path: str):
+    """Location -> (hostname, port, path) untuk hop HTTPS berikutnya; None jika bukan https."""
+    url = urlparse(urljoin(f"https://{hostname}:{port}{path}", location))
+    if url.scheme != "https" or not url.hostname:
+        return None
+    return url.hostname, url.port or 443, (url.path or "/") + (f"?{url.query}" if url.query else "")
+
+
+def _read_head_sync(sock) -> bytes:
+    buf = b""
+    while b"\r\n\r\n" not in buf and len(buf) < MAX_HEAD_BYTES:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        buf += chunk
+    return buf
+
+
+def _connect_sync(hostname: str, port: int, timeout: float, timing: dict = None):
+    """DNS + TCP connect (semua alamat dicoba berurutan) dengan timing opsional."""
+    t = time.perf_counter()
+    infos = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+    if timing is not None:
+        timing["dns_ms"] = _ms(t)
+    t = time.perf_counter()
+    last_error = None
+    for family, socktype, proto, _name, addr in infos:
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(addr)
+        except OSError as e:
+            sock.close()
+            last_error = e
+            continue
+        if timing is not None:
+            timing["connect_ms"] = _ms(t)
+        return sock
+    raise last_error or OSError(f"Could not connect to {hostname}:{port}")
+
+
+def _unverified_context() -> ssl.SSLContext:
+    # Hop redirect / fallback GET hanya untuk membaca header (sama seperti verify=False sebelumnya)
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
 
-    except Exception as e:
-        logger.warning(f"Failed to fetch headers for {hostname}: {e}")
-        headers_info["error"] = str(e)
 
-    return headers_info
+def _fetch_head_sync(hostname: str, port: int, path: str, method: str, timeout: float):
+    with _connect_sync(hostname, port, timeout) as sock:
+        with _unverified_context().wrap_socket(sock, server_hostname=hostname) as ssock:
+            ssock.sendall(_request_bytes(method, hostname, port, path))
+            return parse_response_head(_read_head_sync(ssock))
 
 
-def get_ssl_details(url_or_domain: str):
+def _header_results(status: int, headers, hops: list, final_url: str) -> dict:
+    result = evaluate_security_headers(headers)
+    result["status"] = status
+    result["final_url"] = final_url
+    result["redirects"] = hops
+    return result
+
+
+def _probe_method() -> str:
+    method = (Config.SSL_PROBE_METHOD or "HEAD").upper()
+    return method if method in ("HEAD", "GET") else "HEAD"
+
+
+def probe_https(hostname: str, port: int = 443, timeout: float = 5.0, max_redirects: int = None):
     """
-    Connect to a domain, retrieve SSL certificate, calculate grade based on ADDITIVE POINTS.
+    Satu koneksi TLS untuk sertifikat + header keamanan:
+    DNS -> connect -> handshake (terverifikasi) -> cert/cipher/protocol ->
+    HEAD/GET di socket yang sama -> header. Redirect hanya diikuti jika
+    max_redirects > 0 (default SSL_FOLLOW_REDIRECTS); tiap hop = koneksi baru.
+    Return (details, header_results, timing). Error handshake/verifikasi di-raise.
     """
-    # 1. Clean Input
+    max_redirects = Config.SSL_FOLLOW_REDIRECTS if max_redirects is None else max_redirects
+    method = _probe_method()
+    timing = {}
+    started = time.perf_counter()
+
+    sock = _connect_sync(hostname, port, timeout, timing)
+    with sock:
+        t = time.perf_counter()
+        with ssl.create_default_context().wrap_socket(sock, server_hostname=hostname) as ssock:
+            timing["tls_ms"] = _ms(t)
+            details = certificate_details(ssock.getpeercert(), ssock.cipher(), ssock.version())
+
+            path = "/"
+            try:
+                t = time.perf_counter()
+                ssock.sendall(_request_bytes(method, hostname, port, path))
+                status, headers = parse_response_head(_read_head_sync(ssock))
+                timing["ttfb_ms"] = _ms(t)
+            except Exception as e:
+                logger.warning(f"Failed to fetch headers for {hostname}: {e}")
+                timing["total_ms"] = _ms(started)
+                return details, _headers_error(str(e)), timing
+
+    try:
+        if method == "HEAD" and status in (405, 501):
+            # Server menolak HEAD: ulangi dengan GET (hanya header yang dibaca)
+            method = "GET"
+            status, headers = _fetch_head_sync(hostname, port, path, method, timeout)
+
+        hops = []
+        host, hop_port = hostname, port
+        while 300 <= status < 400 and headers.get("Location") and len(hops) < max_redirects:
+            target = redirect_target(headers["Location"], host, hop_port, path)
+            if target is None:
+                break
+            host, hop_port, path = target
+            hops.append(f"https://{host}:{hop_port}{path}")
+            status, headers = _fetch_head_sync(host, hop_port, path, method, timeout)
+        header_results = _header_results(status, headers, hops, f"https://{host}:{hop_port}{path}")
+    except Exception as e:
+        logger.warning(f"Failed to fetch headers for {hostname}: {e}")
+        header_results = _headers_error(str(e))
+
+    timing["total_ms"] = _ms(started)
+    return details, header_results, timing
+
+
+async def _read_head_async(reader) -> bytes:
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        return await reader.read(MAX_HEAD_BYTES)
+
+
+async def _fetch_head_async(hostname: str, port: int, path: str, method: str):
+    reader, writer = await asyncio.open_connection(
+        hostname, port, ssl=_unverified_context(), server_hostname=hostname, limit=MAX_HEAD_BYTES
+    )
+    try:
+        writer.write(_request_bytes(method, hostname, port, path))
+        await writer.drain()
+        return parse_response_head(await _read_head_async(reader))
+    finally:
+        writer.close()
+
+
+async def probe_https_async(hostname: str, port: int = 443, context: ssl.SSLContext = None,
+                            max_redirects: int = None):
+    """Versi asyncio dari probe_https (timeout diatur pemanggil via asyncio.wait_for)."""
+    max_redirects = Config.SSL_FOLLOW_REDIRECTS if max_redirects is None else max_redirects
+    method = _probe_method()
+    context = context or ssl.create_default_context()
+    loop = asyncio.get_running_loop()
+    timing = {}
+    started = time.perf_counter()
+
+    t = time.perf_counter()
+    infos = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+    timing["dns_ms"] = _ms(t)
+
+    t = time.perf_counter()
+    last_error = None
+    for info in infos:
+        try:
+            reader, writer = await asyncio.open_connection(info[4][0], port, limit=MAX_HEAD_BYTES)
+            break
+        except OSError as e:
+            last_error = e
+    else:
+        raise last_error or OSError(f"Could not connect to {hostname}:{port}")
+    timing["connect_ms"] = _ms(t)
+    try:
+        t = time.perf_counter()
+        await writer.start_tls(context, server_hostname=hostname)
+        timing["tls_ms"] = _ms(t)
+        ssock = writer.get_extra_info("ssl_object")
+        details = certificate_details(ssock.getpeercert(), ssock.cipher(), ssock.version())
+
+        path = "/"
+        try:
+            t = time.perf_counter()
+            writer.write(_request_bytes(method, hostname, port, path))
+            await writer.drain()
+            status, headers = parse_response_head(await _read_head_async(reader))
+            timing["ttfb_ms"] = _ms(t)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            logger.warning(f"Failed to fetch headers for {hostname}: {e}")
+            timing["total_ms"] = _ms(started)
+            return details, _headers_error(str(e)), timing
+    finally:
+        writer.close()
+
+    try:
+        if method == "HEAD" and status in (405, 501):
+            method = "GET"
+            status, headers = await _fetch_head_async(hostname, port, path, method)
+
+        hops = []
+        host, hop_port = hostname, port
+        while 300 <= status < 400 and headers.get("Location") and len(hops) < max_redirects:
+            target = redirect_target(headers["Location"], host, hop_port, path)
+            if target is None:
+                break
+            host, hop_port, path = target
+            hops.append(f"https://{host}:{hop_port}{path}")
+            status, headers = await _fetch_head_async(host, hop_port, path, method)
+        header_results = _header_results(status, headers, hops, f"https://{host}:{hop_port}{path}")
+    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+        logger.warning(f"Failed to fetch headers for {hostname}: {e}")
+        header_results = _headers_error(str(e))
+
+    timing["total_ms"] = _ms(started)
+    return details, header_results, timing
+
+
+def parse_target(url_or_domain: str):
+    """'https://example.com:8443/path' -> ('example.com', 8443). Port default 443."""
     hostname = url_or_domain.strip()
     if "://" in hostname:
         parsed = urlparse(hostname)
         hostname = parsed.netloc or parsed.path
     if "/" in hostname:
         hostname = hostname.split("/")[0]
+    port = 443
     if ":" in hostname:
-        hostname = hostname.split(":")[0]
+        hostname, _, port_str = hostname.partition(":")
+        if port_str.isdigit() and 0 < int(port_str) < 65536:
+            port = int(port_str)
+    return hostname, port
 
-    # Validate Hostname to prevent SSRF
-    if not is_valid_target(hostname):
-         return {
-            "hostname": hostname,
-            "grade": "F",
-            "score": 0,
-            "valid": False,
-            "error": "Invalid target or Restricted IP (Private/Local)",
-            "details": {},
-            "headers": {}
-        }
 
-    port = 443
-    context = ssl.create_default_context()
-    
-    result = {
+def new_result(hostname: str) -> dict:
+    return {
         "hostname": hostname,
         "grade": "F",
         "score": 0,
@@ -175,122 +406,150 @@ def get_ssl_details(url_or_domain: str):
         "headers": {}
     }
 
-    try:
-        # 2. SSL / Socket Check
-        with socket.create_connection((hostname, port), timeout=5.0) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                
-                cert = ssock.getpeercert()
-                cipher = ssock.cipher()
-                version = ssock.version()
-                
-                not_after_str = cert['notAfter']
-                ssl_date_fmt = r'%b %d %H:%M:%S %Y %Z'
-                expiry_date = datetime.datetime.strptime(not_after_str, ssl_date_fmt)
-                remaining = expiry_date - datetime.datetime.utcnow()
-                days_left = remaining.days
-
-                subject = dict(x[0] for x in cert['subject'])
-                issuer = dict(x[0] for x in cert['issuer'])
-                
-                sans = []
-                if 'subjectAltName' in cert:
-                    sans = [x[1] for x in cert['subjectAltName'] if x[0] == 'DNS']
-
-                details = {
-                    "common_name": subject.get('commonName'),
-                    "issuer": issuer.get('organizationName') or issuer.get('commonName'),
-                    "expiry_date": expiry_date.strftime("%Y-%m-%d"),
-                    "days_left": days_left,
-                    "protocol": version,
-                    "cipher_name": cipher[0],
-                    "cipher_bits": cipher[2],
-                    "serial_number": cert.get('serialNumber'),
-                    "sans": sans[:10]
-                }
-
-                result["details"] = details
-                result["valid"] = True
-
-                # --- 3. SCORING SYSTEM (ADDITIVE START = 0) ---
-                score = 0
-                reasons = []
-                critical_failure = False
-
-                # A. BASE SSL SCORE (Max 30)
-                if days_left >= 0:
-                    score += 30
-                    reasons.append("Valid Certificate (+30)")
-                else:
-                    reasons.append("Certificate EXPIRED (Critical)")
-                    critical_failure = True
-
-                # B. PROTOCOL SCORE (Max 20)
-                if version == "TLSv1.3":
-                    score += 20
-                    reasons.append("Modern Protocol TLS 1.3 (+20)")
-                elif version == "TLSv1.2":
-                    score += 15
-                    reasons.append("Standard Protocol TLS 1.2 (+15)")
-                else:
-                    reasons.append("Obsolete/Weak Protocol (0)")
-                    critical_failure = True
-
-                # C. KEY STRENGTH (Max 10)
-                if cipher[2] >= 128:
-                    score += 10
-                    reasons.append("Strong Encryption >= 128 bit (+10)")
-                else:
-                    reasons.append("Weak Encryption (0)")
-                    critical_failure = True
-
-                # D. HEADER BONUS (Max 40)
-                header_results = check_security_headers(hostname)
-                result["headers"] = header_results
-                
-                bonus = header_results.get("score_bonus", 0)
-                if bonus > 0:
-                    score += bonus
-                    reasons.append(f"Security Headers Bonus (+{bonus})")
-                
-                # --- 4. FINAL GRADING RULES ---
-                
-                # Cap Score at 100
-                score = min(100, score)
-
-                if critical_failure:
-                    final_grade = "F"
-                    score = 0
-                else:
-                    # Score Mapping
-                    # Total Max = 30 + 20 + 10 + 40 = 100
-                    
-                    if score == 100: final_grade = "A+"
-                    elif score >= 85: final_grade = "A"
-                    elif score >= 70: final_grade = "B"
-                    elif score >= 55: final_grade = "C"
-                    elif score >= 40: final_grade = "D"
-                    else: final_grade = "F"
-
-                result["score"] = score
-                result["grade"] = final_grade
-                result["reasons"] = reasons
-
-    except ssl.SSLCertVerificationError as e:
+
+def certificate_details(cert: dict, cipher, version: str) -> dict:
+    """Ringkasan sertifikat dari getpeercert() + cipher()/version() koneksi TLS."""
+    not_after_str = cert['notAfter']
+    ssl_date_fmt = r'%b %d %H:%M:%S %Y %Z'
+    expiry_date = datetime.datetime.strptime(not_after_str, ssl_date_fmt)
+    remaining = expiry_date - datetime.datetime.utcnow()
+    days_left = remaining.days
+
+    subject = dict(x[0] for x in cert['subject'])
+    issuer = dict(x[0] for x in cert['issuer'])
+
+    sans = []
+    if 'subjectAltName' in cert:
+        sans = [x[1] for x in cert['subjectAltName'] if x[0] == 'DNS']
+
+    return {
+        "common_name": subject.get('commonName'),
+        "issuer": issuer.get('organizationName') or issuer.get('commonName'),
+        "expiry_date": expiry_date.strftime("%Y-%m-%d"),
+        "expires_ts": int(expiry_date.replace(tzinfo=datetime.timezone.utc).timestamp()),
+        "days_left": days_left,
+        "protocol": version,
+        "cipher_name": cipher[0],
+        "cipher_bits": cipher[2],
+        "serial_number": cert.get('serialNumber'),
+        "sans": sans[:10]
+    }
+
+
+def score_ssl(details: dict, header_results: dict):
+    """
+    ADDITIVE scoring (start = 0). Return (score, grade, reasons).
+    Total Max = 30 (cert) + 20 (protocol) + 10 (key) + 40 (headers) = 100
+    """
+    score = 0
+    reasons = []
+    critical_failure = False
+
+    # A. BASE SSL SCORE (Max 30)
+    if details["days_left"] >= 0:
+        score += 30
+        reasons.append("Valid Certificate (+30)")
+    else:
+        reasons.append("Certificate EXPIRED (Critical)")
+        critical_failure = True
+
+    # B. PROTOCOL SCORE (Max 20)
+    version = details["protocol"]
+    if version == "TLSv1.3":
+        score += 20
+        reasons.append("Modern Protocol TLS 1.3 (+20)")
+    elif version == "TLSv1.2":
+        score += 15
+        reasons.append("Standard Protocol TLS 1.2 (+15)")
+    else:
+        reasons.append("Obsolete/Weak Protocol (0)")
+        critical_failure = True
+
+    # C. KEY STRENGTH (Max 10)
+    if details["cipher_bits"] >= 128:
+        score += 10
+        reasons.append("Strong Encryption >= 128 bit (+10)")
+    else:
+        reasons.append("Weak Encryption (0)")
+        critical_failure = True
+
+    # D. HEADER BONUS (Max 40)
+    bonus = header_results.get("score_bonus", 0)
+    if bonus > 0:
+        score += bonus
+        reasons.append(f"Security Headers Bonus (+{bonus})")
+
+    # --- FINAL GRADING RULES ---
+
+    # Cap Score at 100
+    score = min(100, score)
+
+    if critical_failure:
+        return 0, "F", reasons
+
+    # Score Mapping
+    if score == 100: final_grade = "A+"
+    elif score >= 85: final_grade = "A"
+    elif score >= 70: final_grade = "B"
+    elif score >= 55: final_grade = "C"
+    elif score >= 40: final_grade = "D"
+    else: final_grade = "F"
+
+    return score, final_grade, reasons
+
+
+def apply_score(result: dict, details: dict, header_results: dict) -> dict:
+    result["details"] = details
+    result["valid"] = True
+    result["headers"] = header_results
+    result["score"], result["grade"], result["reasons"] = score_ssl(details, header_results)
+    return result
+
+
+def describe_ssl_error(hostname: str, result: dict, e: Exception) -> dict:
+    """Isi result["error"] untuk kegagalan koneksi / verifikasi sertifikat."""
+    if isinstance(e, ssl.SSLCertVerificationError):
         # Catch specific SSL verification errors
         result["valid"] = False
         err_msg = str(e)
         if "certificate has expired" in err_msg:
              result["error"] = "Certificate has EXPIRED"
-        elif "self signed" in err_msg:
+        elif "self signed" in err_msg or "self-signed" in err_msg:
              result["error"] = "Self-signed certificate (Untrusted)"
         else:
              result["error"] = f"SSL Verification Failed: {err_msg}"
         logger.warning(f"SSL Verify Error for {hostname}: {e}")
-
-    except Exception as e:
+    else:
         # General error handling
-        result["error"] = str(e)
+        result["error"] = str(e) or type(e).__name__
         logger.error(f"SSL Check Error: {e}")
+    return result
+
+
+def get_ssl_details(url_or_domain: str):
+    """
+    Connect to a domain, retrieve SSL certificate, calculate grade based on ADDITIVE POINTS.
+    """
+    # 1. Clean Input
+    hostname, port = parse_target(url_or_domain)
+
+    # Validate Hostname to prevent SSRF
+    if not is_valid_target(hostname):
+        result = new_result(hostname)
+        result["error"] = "Invalid target or Restricted IP (Private/Local)"
+        return result
+
+    result = new_result(hostname)
+
+    try:
+        # 2. Satu koneksi: handshake TLS (cert) + request header di socket yang sama
+        details, header_results, timing = probe_https(hostname, port, timeout=Config.SSL_CONNECT_TIMEOUT_SECONDS)
+        result["timing"] = timing
+
+        # 3. Header bonus + scoring
+        apply_score(result, details, header_results)
+
+    except Exception as e:
+        describe_ssl_error(hostname, result, e)
 
     return result
@@ -0,0 +1,226 @@
+# app/utils/task_log.py
+
+import os
+import gzip
+import time
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_LOG_DIR = os.path.join(_PROJECT_ROOT, 'data', 'logs')
+
+# Batas satu response /status/<id>/log
+MAX_READ_BYTES = 64 * 1024
+
+
+class TaskLog:
+    """
+    Log satu task: ring buffer byte-capped (bytearray) untuk tail yang sering
+    dibaca + spill file gzip berisi log lengkap.
+
+    Offset bersifat absolut (byte ke-N sejak awal log), jadi client cukup
+    menyimpan offset terakhir dan meminta ?from=<offset>.
+    """
+
+    def __init__(self, task_id: str, spill_path: str, max_bytes: int):
+        self.task_id = task_id
+        self.spill_path = spill_path
+        self.max_bytes = max(1024, max_bytes)
+        self._buf = bytearray()
+        self._start = 0   # offset absolut byte pertama di buffer
+        self._end = 0     # total byte yang pernah ditulis
+        self.closed = False
+        self._cond = threading.Condition()
+        self._spill = gzip.open(spill_path, "wb", compresslevel=6)
+
+    def append(self, line: str) -> None:
+        data = line.encode("utf-8", errors="replace")
+        if not data.endswith(b"\n"):
+            data += b"\n"
+        with self._cond:
+            if self.closed:
+                return
+            self._spill.write(data)
+            self._buf += data
+            self._end += len(data)
+            overflow = len(self._buf) - self.max_bytes
+            if overflow > 0:
+                # Potong di batas baris agar tail tidak diawali setengah baris
+                cut = self._buf.find(b"\n", overflow - 1) + 1 or overflow
+                del self._buf[:cut]
+                self._start += cut
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            try:
+                self._spill.close()
+            except OSError as e:
+                logger.warning("Failed to close task log %s: %s", self.spill_path, e)
+            self._cond.notify_all()
+
+    def wait_for_data(self, offset: int, timeout: float) -> None:
+        """Blok sampai ada data setelah offset, log ditutup, atau timeout."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            while self._end <= offset and not self.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._cond.wait(remaining)
+
+    def read(self, offset: int, limit: int = MAX_READ_BYTES) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_READ_BYTES))
+        offset = max(0, offset)
+        with self._cond:
+            start, end, closed = self._start, self._end, self.closed
+            if offset >= start:
+                rel = offset - start
+                data = bytes(self._buf[rel:rel + limit])
+                return _chunk(offset, data, end, closed)
+            if not closed:
+                # Data lama sudah keluar dari ring buffer: sync spill lalu baca dari file
+                self._spill.flush()
+        return read_spill(self.spill_path, offset, limit, end, closed)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"buffered_bytes": len(self._buf), "size": self._end}
+
+
+def _chunk(offset: int, data: bytes, size: Optional[int], complete: bool) -> Dict[str, Any]:
+    # Jangan potong di tengah karakter multibyte UTF-8
+    text = data.decode("utf-8", errors="ignore")
+    consumed = len(text.encode("utf-8"))
+    return {
+        "from": offset,
+        "next": offset + consumed,
+        "size": size,
+        "complete": complete and size is not None and offset + consumed >= size,
+        "data": text,
+    }
+
+
+def read_spill(path: str, offset: int, limit: int, size: Optional[int] = None,
+               complete: bool = True) -> Dict[str, Any]:
+    """Baca potongan log dari file gzip (stream, tanpa memuat seluruh log)."""
+    data = b""
+    read_total = 0
+    eof = False
+    try:
+        with gzip.open(path, "rb") as f:
+            while True:
+                try:
+                    block = f.read1(MAX_READ_BYTES)
+                except (EOFError, zlib.error):
+                    # Spill yang masih ditulis belum punya trailer gzip
+                    eof = True
+                    break
+                if not block:
+                    eof = True
+                    break
+                block_start = read_total
+                read_total += len(block)
+                if read_total <= offset:
+                    continue
+                data += block[max(0, offset - block_start):]
+                if len(data) >= limit:
+                    break
+    except FileNotFoundError:
+        eof = True
+    data = data[:limit]
+    if size is None:
+        # Ukuran total hanya diketahui jika file terbaca sampai habis
+        size = read_total if eof else None
+    return _chunk(offset, data, size, complete)
+
+
+class TaskLogRegistry:
+    """
+    Registry log per task. Memori dibatasi: log yang masih aktif selalu punya
+    ring buffer, log yang sudah selesai disimpan maksimal max_closed buffer
+    (LRU) dan sisanya dibaca dari spill file.
+    """
+
+    def __init__(self, log_dir: str, buffer_bytes: int, max_closed: int, ttl_seconds: int):
+        self.log_dir = log_dir
+        self.buffer_bytes = buffer_bytes
+        self.max_closed = max(0, max_closed)
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(log_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._active: Dict[str, TaskLog] = {}
+        self._closed: "OrderedDict[str, TaskLog]" = OrderedDict()
+        self._last_cleanup = 0.0
+
+    def _spill_path(self, task_id: str) -> str:
+        return os.path.join(self.log_dir, f"{os.path.basename(task_id)}.log.gz")
+
+    def open(self, task_id: str) -> TaskLog:
+        self._cleanup_spills()
+        log = TaskLog(task_id, self._spill_path(task_id), self.buffer_bytes)
+        with self._lock:
+            self._closed.pop(task_id, None)
+            self._active[task_id] = log
+        return log
+
+    def close(self, task_id: str) -> None:
+        with self._lock:
+            log = self._active.pop(task_id, None)
+            if log is None:
+                return
+            self._closed[task_id] = log
+            while len(self._closed) > self.max_closed:
+                self._closed.popitem(last=False)
+        log.close()
+
+    def get(self, task_id: str) -> Optional[TaskLog]:
+        with self._lock:
+            log = self._active.get(task_id)
+            if log is None:
+                log = self._closed.get(task_id)
+                if log is not None:
+                    self._closed.move_to_end(task_id)
+            return log
+
+    def read(self, task_id: str, offset: int, limit: int = MAX_READ_BYTES) -> Optional[Dict[str, Any]]:
+        """None jika task tidak punya log (belum mulai scan atau sudah expired)."""
+        log = self.get(task_id)
+        if log is not None:
+            return log.read(offset, limit)
+        path = self._spill_path(task_id)
+        if not os.path.isfile(path):
+            return None
+        return read_spill(path, offset, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            logs = list(self._active.values()) + list(self._closed.values())
+            active = len(self._active)
+        return {
+            "active": active,
+            "buffered": len(logs),
+            "buffered_bytes": sum(log.stats()["buffered_bytes"] for log in logs),
+            "buffer_bytes_per_task": self.buffer_bytes,
+        }
+
+    def _cleanup_spills(self) -> None:
+        now = time.time()
+        if self.ttl_seconds <= 0 or now - self._last_cleanup < 300:
+            return
+        self._last_cleanup = now
+        cutoff = now - self.ttl_seconds
+        try:
+            for entry in os.scandir(self.log_dir):
+                if entry.name.endswith(".log.gz") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError as e:
+            logger.warning("Failed to clean old task logs: %s", e)
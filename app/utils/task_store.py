@@ -0,0 +1,639 @@
+# app/utils/task_store.py
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_SQLITE_PATH = os.path.join(_PROJECT_ROOT, 'data', 'tasks.db')
+
+# Field yang disimpan sebagai kolom (sisanya masuk JSON di kolom data)
+_COLUMN_FIELDS = ("task_id", "project_key", "status", "log")
+
+# Status task yang belum selesai saat proses pemiliknya mati (crash/SIGKILL)
+INTERRUPTED_STATUS = "Failed: Server Restart"
+
+# Pemilik task (proses) mengirim heartbeat ke DB; tanpa heartbeat selama
+# OWNER_STALE_SECONDS pemiliknya dianggap mati.
+OWNER_HEARTBEAT_SECONDS = 10.0
+OWNER_STALE_SECONDS = 60.0
+
+# Satu id per proses: membedakan proses baru dari proses lama dengan pid yang sama
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def _created_ts(record: Dict[str, Any]) -> float:
+    raw = record.get("created_at")
+    if raw:
+        try:
+            return datetime.fromisoformat(raw).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _with_log_size(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Hitung log_size sekali saat log ditulis (bukan di setiap request status)."""
+    if "log" in fields:
+        log = fields["log"]
+        fields["log_size"] = len(log.encode("utf-8", errors="ignore")) if log else 0
+    return fields
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name != "posix":
+        # os.kill(pid, 0) di Windows justru menghentikan proses: andalkan heartbeat saja
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # PermissionError: proses ada, milik user lain
+        return True
+    return True
+
+
+class TaskStore(ABC):
+    """
+    Interface penyimpanan status task scan.
+    Record berupa dict datar (task_id, status, log, screenshot_info, ...).
+
+    Setiap create/update menaikkan versi task dan membangunkan pemanggil
+    wait_for_change(); dipakai endpoint status (ETag, long-poll, SSE) agar
+    task yang idle tidak perlu dibaca ulang. Versi hanya bisa dibandingkan
+    dengan versi dari version_epoch yang sama. Implementasi default memakai
+    counter in-process (epoch = boot proses ini).
+    """
+
+    def __init__(self):
+        self._changes = threading.Condition()
+        self._versions: Dict[str, int] = {}
+        self._seq = 0
+        self.version_epoch = _BOOT_ID
+
+    # --- change notification ---
+
+    def _notify(self, task_id: str) -> None:
+        with self._changes:
+            self._seq += 1
+            self._versions[task_id] = self._seq
+            self._changes.notify_all()
+
+    def _forget(self, task_ids: Iterable[str]) -> None:
+        with self._changes:
+            for task_id in task_ids:
+                self._versions.pop(task_id, None)
+
+    def versions(self, task_ids: Iterable[str]) -> Dict[str, int]:
+        """Versi terakhir tiap task (0 jika belum pernah berubah di proses ini)."""
+        with self._changes:
+            return {tid: self._versions.get(tid, 0) for tid in task_ids}
+
+    def wait_for_change(self, known: Dict[str, int], timeout: float) -> Dict[str, int]:
+        """
+        Blok sampai salah satu task di `known` punya versi berbeda atau timeout.
+        Return versi terkini untuk task yang sama.
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._changes:
+            while True:
+                current = {tid: self._versions.get(tid, 0) for tid in known}
+                remaining = deadline - time.monotonic()
+                if current != known or remaining <= 0:
+                    return current
+                self._changes.wait(remaining)
+
+    # --- storage ---
+
+    @abstractmethod
+    def create(self, record: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def update(self, task_id: str, **fields: Any) -> None:
+        ...
+
+    @abstractmethod
+    def find_by_project(self, project_key: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Task terbaru untuk project_key tertentu (urut created_at desc)."""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Hapus task yang lebih tua dari TTL. Return jumlah yang dihapus."""
+
+    def flush(self) -> None:
+        """Paksa tulis perubahan yang masih di-buffer (no-op jika tidak ada buffer)."""
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class MemoryTaskStore(TaskStore):
+    """
+    Store in-process (perilaku lama), hanya untuk satu proses: worker lain
+    tidak melihat task maupun versinya. Urutan insert = urutan created_at,
+    jadi eviction cukup membuang dari depan sampai ketemu yang belum expired.
+    """
+
+    def __init__(self, ttl_seconds: int = 24 * 3600, max_entries: int = 1000):
+        super().__init__()
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._tasks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, record: Dict[str, Any]) -> None:
+        rec = _with_log_size(dict(record))
+        rec["_created_ts"] = _created_ts(rec)
+        dropped = []
+        with self._lock:
+            self._tasks[rec["task_id"]] = rec
+            while len(self._tasks) > self._max_entries:
+                dropped.append(self._tasks.popitem(last=False)[0])
+        self._forget(dropped)
+        self._notify(rec["task_id"])
+        self.evict_expired()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rec = self._tasks.get(task_id)
+            if rec is None:
+                return None
+            return {k: v for k, v in rec.items() if not k.startswith("_")}
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        with self._lock:
+            rec = self._tasks.get(task_id)
+            if rec is None:
+                return
+            rec.update(_with_log_size(fields))
+        self._notify(task_id)
+
+    def find_by_project(self, project_key: str, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            matches = [
+                {k: v for k, v in rec.items() if not k.startswith("_")}
+                for rec in reversed(self._tasks.values())
+                if rec.get("project_key") == project_key
+            ]
+        return matches[:limit]
+
+    def evict_expired(self) -> int:
+        if self._ttl <= 0:
+            return 0
+        cutoff = time.time() - self._ttl
+        removed_ids = []
+        with self._lock:
+            while self._tasks:
+                oldest = next(iter(self._tasks.values()))
+                if oldest["_created_ts"] >= cutoff:
+                    break
+                removed_ids.append(self._tasks.popitem(last=False)[0])
+        removed = len(removed_ids)
+        self._forget(removed_ids)
+        if removed:
+            logger.debug("Evicted %d expired task(s) from memory.", removed)
+        return removed
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    Store persisten berbasis SQLite (WAL) agar status task tidak hilang saat
+    restart dan bisa dipakai bersama oleh beberapa worker/proses.
+
+    - Tulis di-batch: create/update masuk buffer lalu di-flush oleh thread
+      background (tiap flush_interval detik atau saat buffer >= batch_size).
+    - Baca menimpa data DB dengan buffer yang belum di-flush (read-your-writes).
+    - Eviction berdasarkan TTL memakai index created_ts (bukan slicing list).
+    - Versi task = kolom updated_seq (counter di DB, naik di setiap flush), jadi
+      ETag/long-poll/SSE melihat tulisan dari semua proses. wait_for_change()
+      dibangunkan oleh flush lokal dan mem-poll DB tiap change_poll_interval
+      untuk tulisan proses lain.
+    - Setiap task dicatat pemiliknya (host:pid:boot id proses yang membuatnya);
+      pemilik mengirim heartbeat ke tabel task_owners. Antrian & worker hanya
+      ada di memori pemilik, jadi task belum selesai yang pemiliknya sudah mati
+      (pid tidak ada, pid sama dengan boot berbeda, atau heartbeat lebih tua
+      dari owner_stale_seconds) ditandai INTERRUPTED_STATUS, saat store dibuka
+      dan berkala sesudahnya. Task milik proses lain yang masih hidup tidak disentuh.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id     TEXT PRIMARY KEY,
+            project_key TEXT,
+            status      TEXT,
+            created_ts  REAL NOT NULL,
+            updated_ts  REAL NOT NULL,
+            log         TEXT,
+            data        TEXT NOT NULL,
+            owner       TEXT,
+            updated_seq INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_project_created ON tasks (project_key, created_ts);
+        CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_ts);
+        CREATE TABLE IF NOT EXISTS task_owners (
+            owner_id     TEXT PRIMARY KEY,
+            host         TEXT NOT NULL,
+            pid          INTEGER NOT NULL,
+            heartbeat_ts REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS task_meta (
+            key   TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    # Kolom yang ditambahkan setelah versi awal schema (DB lama dimigrasi saat dibuka)
+    _ADDED_COLUMNS = (
+        ("owner", "TEXT"),
+        ("updated_seq", "INTEGER NOT NULL DEFAULT 0"),
+    )
+
+    _UNFINISHED = "(status IS NULL OR (status NOT LIKE 'Completed%' AND status NOT LIKE 'Failed%'))"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SQLITE_PATH,
+        ttl_seconds: int = 24 * 3600,
+        flush_interval: float = 0.25,
+        batch_size: int = 50,
+        evict_interval: float = 300.0,
+        change_poll_interval: float = 0.5,
+        heartbeat_interval: float = OWNER_HEARTBEAT_SECONDS,
+        owner_stale_seconds: float = OWNER_STALE_SECONDS,
+    ):
+        super().__init__()
+        self._path = path
+        self._ttl = ttl_seconds
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._evict_interval = evict_interval
+        self._change_poll_interval = change_poll_interval
+        self._heartbeat_interval = heartbeat_interval
+        self._owner_stale_seconds = owner_stale_seconds
+        self._host = socket.gethostname()
+        self.owner_id = f"{self._host}:{os.getpid()}:{_BOOT_ID}"
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        # task_id -> {"create": bool, "fields": dict}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Batch yang sedang ditulis; tetap terlihat oleh get() sampai commit
+        self._flushing: Dict[str, Dict[str, Any]] = {}
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(self._SCHEMA)
+        self._migrate()
+
+        self._heartbeat()
+        self.fail_orphaned()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="task-store-flusher", daemon=True)
+        self._flusher.start()
+        logger.info("SQLite task store ready at %s (ttl=%ss)", path, ttl_seconds)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, timeout=10.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # --- public API ---
+
+    def create(self, record: Dict[str, Any]) -> None:
+        with self._pending_lock:
+            self._pending[record["task_id"]] = {"create": True, "fields": _with_log_size(dict(record))}
+        self._wakeup.set()
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        # Versi baru (dan notify) menyusul saat flush: versi dibaca dari DB
+        with self._pending_lock:
+            entry = self._pending.setdefault(task_id, {"create": False, "fields": {}})
+            entry["fields"].update(_with_log_size(fields))
+            size = len(self._pending)
+        if size >= self._batch_size:
+            self._wakeup.set()
+
+    def versions(self, task_ids: Iterable[str]) -> Dict[str, int]:
+        """updated_seq tiap task di DB (0 jika belum di-flush atau tidak ada)."""
+        ids = list(task_ids)
+        found: Dict[str, int] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in self._reader().execute(
+                f"SELECT task_id, updated_seq FROM tasks WHERE task_id IN ({marks})", chunk
+            ):
+                found[row["task_id"]] = row["updated_seq"]
+        return {tid: found.get(tid, 0) for tid in ids}
+
+    def wait_for_change(self, known: Dict[str, int], timeout: float) -> Dict[str, int]:
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            with self._changes:
+                seen = self._seq
+            current = self.versions(known)
+            remaining = deadline - time.monotonic()
+            if current != known or remaining <= 0:
+                return current
+            with self._changes:
+                # Flush lokal membangunkan lebih awal; tulisan proses lain terlihat lewat poll
+                if self._seq == seen:
+                    self._changes.wait(min(remaining, self._change_poll_interval))
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        overlay: Dict[str, Any] = {}
+        buffered_create = False
+        with self._pending_lock:
+            for buffer in (self._flushing, self._pending):
+                entry = buffer.get(task_id)
+                if entry:
+                    overlay.update(entry["fields"])
+                    buffered_create = buffered_create or entry["create"]
+
+        if buffered_create:
+            return overlay
+
+        row = self._reader().execute(
+            "SELECT * FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = self._row_to_record(row)
+        record.update(overlay)
+        return record
+
+    def find_by_project(self, project_key: str, limit: int = 20) -> List[Dict[str, Any]]:
+        self.flush()
+        rows = self._reader().execute(
+            "SELECT * FROM tasks WHERE project_key = ? ORDER BY created_ts DESC LIMIT ?",
+            (project_key, limit),
+        ).fetchall()
+        return [self._row_to_record(r) for r in rows]
+
+    def evict_expired(self) -> int:
+        if self._ttl <= 0:
+            return 0
+        cutoff = time.time() - self._ttl
+        with self._write_lock:
+            cur = self._writer.execute("DELETE FROM tasks WHERE created_ts < ?", (cutoff,))
+            self._writer.commit()
+        if cur.rowcount:
+            logger.debug("Evicted %d expired task(s) from SQLite.", cur.rowcount)
+        return cur.rowcount
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                self._flushing = pending
+            if not pending:
+                return
+            try:
+                with self._transaction():
+                    self._write_batch(pending)
+            except Exception:
+                logger.exception("Failed to flush %d task update(s) to SQLite.", len(pending))
+                self._requeue(pending)
+                return
+            finally:
+                with self._pending_lock:
+                    self._flushing = {}
+        self._signal()
+
+    def fail_orphaned(self) -> int:
+        """
+        Tandai INTERRUPTED_STATUS task belum selesai yang pemiliknya sudah mati
+        (atau tanpa pemilik, dari DB versi lama). Return jumlah task yang ditandai.
+        """
+        now = time.time()
+        with self._write_lock, self._transaction() as db:
+            owners = db.execute("SELECT * FROM task_owners").fetchall()
+            gone = [o["owner_id"] for o in owners if o["owner_id"] != self.owner_id and self._owner_gone(o, now)]
+            if gone:
+                db.execute(f"DELETE FROM task_owners WHERE owner_id IN ({','.join('?' * len(gone))})", gone)
+            rows = db.execute(
+                f"SELECT * FROM tasks WHERE {self._UNFINISHED}"
+                " AND (owner IS NULL OR owner NOT IN (SELECT owner_id FROM task_owners))"
+            ).fetchall()
+            pending = {}
+            for row in rows:
+                record = self._row_to_record(row)
+                record["status"] = INTERRUPTED_STATUS
+                record["log"] = ((record.get("log") or "")
+                                 + "\n\nServer restarted before this task finished. Submit it again.").lstrip()
+                pending[record["task_id"]] = {"create": True, "fields": _with_log_size(record)}
+            if pending:
+                self._write_batch(pending)
+        if pending:
+            self._signal()
+            logger.warning("Marked %d unfinished task(s) of stopped process(es) %s as '%s'.",
+                           len(pending), sorted({row["owner"] or "?" for row in rows}), INTERRUPTED_STATUS)
+        return len(pending)
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        self._flusher.join(timeout=5.0)
+        self.flush()
+        with self._write_lock:
+            # Berhenti dengan rapi: task yang tersisa boleh langsung diambil alih proses lain
+            with self._transaction() as db:
+                db.execute("DELETE FROM task_owners WHERE owner_id = ?", (self.owner_id,))
+            self._writer.close()
+
+    # --- internal ---
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE: proses lain menunggu (busy timeout) sampai commit,
+        # jadi updated_seq dan baca-lalu-tulis di dalamnya tidak balapan antar proses.
+        # Pemanggil memegang _write_lock.
+        self._writer.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._writer
+            self._writer.commit()
+        except BaseException:
+            self._writer.rollback()
+            raise
+
+    def _migrate(self) -> None:
+        with self._transaction() as db:
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(tasks)")}
+            for name, decl in self._ADDED_COLUMNS:
+                if name not in columns:
+                    db.execute(f"ALTER TABLE tasks ADD COLUMN {name} {decl}")
+            db.execute("INSERT OR IGNORE INTO task_meta (key, value) VALUES ('seq', 0)")
+            # Epoch baru jika file DB dibuat ulang (updated_seq mulai lagi dari 0)
+            db.execute("INSERT OR IGNORE INTO task_meta (key, value) VALUES ('epoch', ?)", (int(time.time() * 1000),))
+            epoch = db.execute("SELECT value FROM task_meta WHERE key = 'epoch'").fetchone()["value"]
+        self.version_epoch = format(epoch, "x")
+
+    def _heartbeat(self) -> None:
+        with self._write_lock, self._transaction() as db:
+            # Upsert: baris pemilik dibuat ulang jika sempat dihapus proses lain
+            db.execute(
+                """
+                INSERT INTO task_owners (owner_id, host, pid, heartbeat_ts) VALUES (?, ?, ?, ?)
+                ON CONFLICT(owner_id) DO UPDATE SET heartbeat_ts = excluded.heartbeat_ts
+                """,
+                (self.owner_id, self._host, os.getpid(), time.time()),
+            )
+
+    def _owner_gone(self, owner: sqlite3.Row, now: float) -> bool:
+        if now - owner["heartbeat_ts"] > self._owner_stale_seconds:
+            return True
+        if owner["host"] != self._host:
+            # pid host lain tidak bisa dicek: andalkan heartbeat
+            return False
+        if owner["pid"] == os.getpid():
+            # pid sama, boot id berbeda: proses lama sudah mati (mis. PID 1 di container yang restart)
+            return True
+        return not _pid_alive(owner["pid"])
+
+    def _signal(self) -> None:
+        # Bangunkan wait_for_change(); versi dibaca ulang dari DB
+        with self._changes:
+            self._seq += 1
+            self._changes.notify_all()
+
+    def _row_to_record(self, row: sqlite3.Row) -> Dict[str, Any]:
+        record = json.loads(row["data"])
+        record.update({
+            "task_id": row["task_id"],
+            "project_key": row["project_key"],
+            "status": row["status"],
+            "log": row["log"],
+        })
+        return record
+
+    def _requeue(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        # Update yang lebih baru (masuk selama flush gagal) harus menang
+        with self._pending_lock:
+            for task_id, entry in pending.items():
+                newer = self._pending.get(task_id)
+                if newer:
+                    entry["fields"].update(newer["fields"])
+                    entry["create"] = entry["create"] or newer["create"]
+                self._pending[task_id] = entry
+
+    def _write_batch(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        # Dipanggil di dalam _transaction()
+        now = time.time()
+        updates = [tid for tid, e in pending.items() if not e["create"]]
+
+        existing: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(updates), 500):
+            chunk = updates[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in self._writer.execute(f"SELECT * FROM tasks WHERE task_id IN ({marks})", chunk):
+                existing[row["task_id"]] = self._row_to_record(row)
+
+        seq = self._writer.execute("SELECT value FROM task_meta WHERE key = 'seq'").fetchone()["value"]
+        rows = []
+        for task_id, entry in pending.items():
+            if entry["create"]:
+                record = dict(entry["fields"])
+            elif task_id in existing:
+                record = existing[task_id]
+                record.update(entry["fields"])
+            else:
+                # Task sudah di-evict; update terlambat diabaikan
+                continue
+            data = {k: v for k, v in record.items() if k not in _COLUMN_FIELDS}
+            seq += 1
+            rows.append((
+                task_id,
+                record.get("project_key"),
+                record.get("status"),
+                _created_ts(record),
+                now,
+                record.get("log"),
+                json.dumps(data, default=str),
+                self.owner_id,
+                seq,
+            ))
+
+        # Pemilik hanya diisi saat insert: proses yang membuat task yang menjalankannya
+        self._writer.executemany(
+            """
+            INSERT INTO tasks (task_id, project_key, status, created_ts, updated_ts, log, data, owner, updated_seq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(task_id) DO UPDATE SET
+                project_key = excluded.project_key,
+                status      = excluded.status,
+                updated_ts  = excluded.updated_ts,
+                log         = excluded.log,
+                data        = excluded.data,
+                updated_seq = excluded.updated_seq
+            """,
+            rows,
+        )
+        self._writer.execute("UPDATE task_meta SET value = ? WHERE key = 'seq'", (seq,))
+
+    def _flush_loop(self) -> None:
+        last_evict = 0.0
+        last_heartbeat = time.monotonic()
+        while not self._stopping.is_set():
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if time.monotonic() - last_heartbeat >= self._heartbeat_interval:
+                last_heartbeat = time.monotonic()
+                try:
+                    self._heartbeat()
+                    self.fail_orphaned()
+                except Exception:
+                    logger.exception("Task store heartbeat failed.")
+            if time.monotonic() - last_evict >= self._evict_interval:
+                last_evict = time.monotonic()
+                try:
+                    self.evict_expired()
+                except Exception:
+                    logger.exception("Task store eviction failed.")
+
+
+def create_task_store(backend: str, path: Optional[str] = None, ttl_hours: int = 24) -> TaskStore:
+    """Factory berdasarkan TASK_STORE_BACKEND ('sqlite' default, atau 'memory')."""
+    ttl_seconds = max(0, ttl_hours) * 3600
+    backend = (backend or "sqlite").strip().lower()
+    if backend == "memory":
+        return MemoryTaskStore(ttl_seconds=ttl_seconds)
+    if backend != "sqlite":
+        logger.warning("Unknown TASK_STORE_BACKEND=%r; falling back to sqlite", backend)
+    return SQLiteTaskStore(path=path or DEFAULT_SQLITE_PATH, ttl_seconds=ttl_seconds)
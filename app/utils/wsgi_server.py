@@ -0,0 +1,95 @@
+# app/utils/wsgi_server.py
+
+import time
+import signal
+import logging
+import threading
+from typing import Any, Dict
+
+from waitress import create_server, wasyncore
+from waitress.channel import HTTPChannel
+from waitress.server import BaseWSGIServer
+from waitress.trigger import trigger as Trigger
+
+from app.config import Config
+from app.tasks import shutdown_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Modul ini memakai internal waitress (socket map, task_dispatcher.queue/active_count,
+# HTTPChannel.total_outbufs_len, wasyncore.loop manual) yang bukan API publik:
+# versi waitress di-pin di requirements.txt. Cek ulang fungsi di bawah sebelum upgrade.
+
+
+def _socket_map(server) -> Dict[int, Any]:
+    # MultiSocketServer (beberapa alamat listen) menyimpan map di .map, TcpWSGIServer di ._map
+    return getattr(server, "map", None) or server._map
+
+
+def _busy(server, socket_map: Dict[int, Any]) -> bool:
+    """Masih ada request yang dikerjakan/antri, atau respons yang belum terkirim ke client."""
+    dispatcher = server.task_dispatcher
+    if dispatcher.active_count or dispatcher.queue:
+        return True
+    return any(isinstance(ch, HTTPChannel) and ch.total_outbufs_len for ch in list(socket_map.values()))
+
+
+def serve(app) -> None:
+    """
+    Jalankan app di waitress dengan setting SERVER_* dari Config.
+
+    SIGTERM/SIGINT: berhenti menerima koneksi baru, selesaikan request yang sedang berjalan
+    (maks SERVER_GRACEFUL_TIMEOUT detik), lalu beri antrian scan waktu SHUTDOWN_DRAIN_SECONDS.
+    Sinyal kedua memaksa keluar.
+    """
+    server = create_server(
+        app,
+        host=Config.SERVER_HOST,
+        port=Config.PORT,
+        threads=max(1, Config.SERVER_THREADS),
+        connection_limit=max(1, Config.SERVER_CONNECTION_LIMIT),
+        channel_timeout=max(1, Config.SERVER_CHANNEL_TIMEOUT),
+        backlog=max(1, Config.SERVER_BACKLOG),
+    )
+    socket_map = _socket_map(server)
+    adj = server.adj
+    stopping = threading.Event()
+
+    def _request_stop(signum, frame):
+        if stopping.is_set():
+            raise SystemExit(1)
+        logger.info("Received %s, shutting down gracefully.", signal.Signals(signum).name)
+        stopping.set()
+        # Bangunkan poll agar socket listen langsung ditutup, bukan setelah timeout loop
+        for dispatcher in list(socket_map.values()):
+            if isinstance(dispatcher, Trigger):
+                dispatcher.pull_trigger()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    logger.info(
+        "Serving on http://%s:%s (threads=%d, connection_limit=%d, channel_timeout=%ds, backlog=%d).",
+        Config.SERVER_HOST, Config.PORT, adj.threads, adj.connection_limit, adj.channel_timeout, adj.backlog,
+    )
+
+    # Loop event sendiri (bukan server.run()): server.run() berhenti memompa socket saat shutdown,
+    # sehingga respons yang sudah ditulis worker tidak pernah terkirim
+    while not stopping.is_set():
+        wasyncore.loop(timeout=adj.asyncore_loop_timeout, map=socket_map, use_poll=adj.asyncore_use_poll, count=1)
+
+    # Tutup hanya socket listen; trigger dan koneksi yang sudah terbuka tetap dilayani sampai selesai
+    for dispatcher in list(socket_map.values()):
+        if isinstance(dispatcher, BaseWSGIServer):
+            wasyncore.dispatcher.close(dispatcher)
+
+    deadline = time.monotonic() + max(0, Config.SERVER_GRACEFUL_TIMEOUT)
+    while _busy(server, socket_map) and time.monotonic() < deadline:
+        wasyncore.loop(timeout=0.2, map=socket_map, use_poll=adj.asyncore_use_poll, count=1)
+    if _busy(server, socket_map):
+        logger.warning("Graceful timeout reached with requests still in flight; closing connections.")
+
+    server.task_dispatcher.shutdown(timeout=1)
+    wasyncore.close_all(socket_map)
+    shutdown_pipeline(Config.SHUTDOWN_DRAIN_SECONDS)
+    logger.info("Shutdown complete.")
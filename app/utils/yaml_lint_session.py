@@ -0,0 +1,287 @@
+# app/utils/yaml_lint_session.py
+
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.utils.linter_service import normalize_newlines, lint_document, lint_documents
+
+logger = logging.getLogger(__name__)
+
+
+class SessionConflict(Exception):
+    """Versi atau delta tidak cocok dengan state server: client harus membuka sesi ulang."""
+
+
+def _is_doc_start(line: str) -> bool:
+    # Sama dengan linter_service._DOC_START_RE: '---' kolom 0 diikuti spasi/tab/akhir baris
+    return line.startswith("---") and (len(line) == 3 or line[3] in " \t")
+
+
+class _Doc:
+    """Satu dokumen YAML = rentang baris [start, end); hasil lint disimpan relatif terhadap start."""
+
+    __slots__ = ("start", "end", "diagnostics", "invalid", "linted_as_last")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.diagnostics: Optional[List[Tuple[int, int, str, str]]] = None   # None = perlu di-lint
+        self.invalid = False
+        self.linted_as_last = False
+
+
+class LintSession:
+    """
+    State lint satu buffer editor: baris teks + pembagian dokumen + hasil lint per dokumen.
+    Delta CodeMirror ({from, to, text}) diterapkan ke baris; hanya dokumen yang tersentuh
+    yang di-lint ulang, dokumen lain cukup digeser nomor barisnya.
+    """
+
+    def __init__(self, content: str):
+        self.lines = normalize_newlines(content).split("\n")
+        self.version = 0
+        self.size = len(content)
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self.docs = self._split(0, len(self.lines))
+        self._previous: set = set()
+
+    def _split(self, start: int, end: int) -> List[_Doc]:
+        """Dokumen baru untuk baris [start, end); batas di setiap '---' kolom 0."""
+        docs: List[_Doc] = []
+        doc_start = start
+        for i in range(start + 1, end):
+            if _is_doc_start(self.lines[i]):
+                docs.append(_Doc(doc_start, i))
+                doc_start = i
+        docs.append(_Doc(doc_start, end))
+        return docs
+
+    def _doc_index(self, line: int) -> int:
+        """Index dokumen yang memuat baris `line` (binary search atas start)."""
+        lo, hi = 0, len(self.docs) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.docs[mid].start <= line:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        try:
+            from_line, from_ch = int(change["from"]["line"]), int(change["from"]["ch"])
+            to_line, to_ch = int(change["to"]["line"]), int(change["to"]["ch"])
+            text = [str(t) for t in change["text"]]
+        except (KeyError, TypeError, ValueError):
+            raise SessionConflict("Invalid change object")
+        if not text or not (0 <= from_line <= to_line < len(self.lines)) or (
+            from_line == to_line and from_ch > to_ch
+        ):
+            raise SessionConflict("Change is out of range")
+        # ch di luar baris (atau negatif) berarti buffer client sudah berbeda: slicing
+        # Python akan diam-diam memotong dan buffer server menyimpang
+        if not (0 <= from_ch <= len(self.lines[from_line]) and 0 <= to_ch <= len(self.lines[to_line])):
+            raise SessionConflict("Change is out of range")
+
+        prefix = self.lines[from_line][:from_ch]
+        suffix = self.lines[to_line][to_ch:]
+        new_lines = [normalize_newlines(t) for t in text]
+        new_lines[0] = prefix + new_lines[0]
+        new_lines[-1] = new_lines[-1] + suffix
+        delta = len(new_lines) - (to_line - from_line + 1)
+        self.size += sum(len(t) + 1 for t in new_lines) - sum(len(t) + 1 for t in self.lines[from_line:to_line + 1])
+        self.lines[from_line:to_line + 1] = new_lines
+
+        first = self._doc_index(from_line)
+        last = self._doc_index(to_line)
+        # Baris pertama dokumen (penanda '---') berubah: bisa menyatu dengan dokumen sebelumnya
+        if first > 0 and from_line == self.docs[first].start:
+            first -= 1
+        region_start = self.docs[first].start
+        region_end = self.docs[last].end + delta
+        for doc in self.docs[last + 1:]:
+            doc.start += delta
+            doc.end += delta
+        self.docs[first:last + 1] = self._split(region_start, region_end)
+
+    def _set_result(self, doc: _Doc, result: Dict[str, Any], offset: int) -> None:
+        doc.invalid = result["status"] == "INVALID_SYNTAX"
+        if doc.invalid:
+            doc.diagnostics = [(result["error_line"] - offset, 1, "error", result["error_message"])]
+        else:
+            doc.diagnostics = [(p["line"] - offset, p["col"], p["level"], p["message"]) for p in result["problems"]]
+
+    def lint_all(self) -> None:
+        """Lint awal seluruh buffer lewat lint_documents (paralel untuk input besar)."""
+        results = {r["start_line"]: r for r in lint_documents("\n".join(self.lines))}
+        last_index = len(self.docs) - 1
+        for index, doc in enumerate(self.docs):
+            doc.linted_as_last = index == last_index
+            result = results.get(doc.start + 1)
+            if result is None:
+                doc.diagnostics = []   # bagian kosong sebelum '---' pertama
+            else:
+                self._set_result(doc, result, doc.start)
+
+    def lint(self) -> int:
+        """Lint dokumen yang berubah (dan dokumen terakhir jika posisinya berubah). Return jumlah dokumen di-lint."""
+        linted = 0
+        last_index = len(self.docs) - 1
+        for index, doc in enumerate(self.docs):
+            is_last = index == last_index
+            if doc.diagnostics is not None and doc.linted_as_last == is_last:
+                continue
+            text = "\n".join(self.lines[doc.start:doc.end])
+            if not is_last:
+                text += "\n"
+            doc.linted_as_last = is_last
+            linted += 1
+            if not text.strip():
+                doc.diagnostics = []
+                continue
+            self._set_result(doc, lint_document((index, 1, text, is_last, False)), 0)
+        return linted
+
+    def diagnostics(self) -> List[Dict[str, Any]]:
+        items = []
+        for doc in self.docs:
+            for line, col, level, message in doc.diagnostics or []:
+                items.append({"line": doc.start + line, "col": col, "level": level, "message": message})
+        return items
+
+    def status(self, diagnostics: List[Dict[str, Any]]) -> str:
+        if any(doc.invalid for doc in self.docs):
+            return "INVALID_SYNTAX"
+        return "VALID_WITH_ISSUES" if diagnostics else "PERFECT"
+
+    def diff(self) -> Dict[str, Any]:
+        """Diagnostik sejak response terakhir: yang baru muncul dan yang hilang."""
+        current = self.diagnostics()
+        keys = {(d["line"], d["col"], d["level"], d["message"]): d for d in current}
+        added = [d for k, d in keys.items() if k not in self._previous]
+        removed = [{"line": k[0], "col": k[1], "level": k[2], "message": k[3]}
+                   for k in self._previous if k not in keys]
+        self._previous = set(keys)
+        return {"added": added, "removed": removed, "total": len(current), "status": self.status(current)}
+
+
+class LintSessionStore:
+    """
+    Sesi lint per editor (key = session id acak), LRU dengan batas jumlah sesi,
+    total ukuran teks, dan idle timeout. Ukuran dihitung dalam karakter (perkiraan byte).
+    """
+
+    def __init__(self, max_sessions: int, max_bytes: int, idle_seconds: int, max_session_bytes: int):
+        self.max_sessions = max(1, max_sessions)
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.max_session_bytes = max_session_bytes
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, LintSession]" = OrderedDict()
+        self._stats = {"opened": 0, "evicted": 0, "expired": 0, "updates": 0, "conflicts": 0}
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for session_id in [k for k, s in self._sessions.items() if now - s.last_used > self.idle_seconds]:
+            del self._sessions[session_id]
+            self._stats["expired"] += 1
+        total = sum(s.size for s in self._sessions.values())
+        while self._sessions and (len(self._sessions) > self.max_sessions or total > self.max_bytes):
+            _, session = self._sessions.popitem(last=False)
+            total -= session.size
+            self._stats["evicted"] += 1
+
+    def open(self, content: str) -> Tuple[str, Dict[str, Any]]:
+        session = LintSession(content)
+        session.lint_all()
+        session_id = uuid.uuid4().hex
+        result = {"version": session.version, **session.diff()}
+        with self._lock:
+            self._sessions[session_id] = session
+            self._stats["opened"] += 1
+            self._evict()
+        return session_id, result
+
+    def _get(self, session_id: str) -> Optional[LintSession]:
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = time.monotonic()
+            return session
+
+    def update(self, session_id: str, version: int, changes: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Terapkan delta lalu lint ulang. None jika sesi tidak ada; SessionConflict jika versi/delta tidak cocok."""
+        session = self._get(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            if version != session.version:
+                with self._lock:
+                    self._stats["conflicts"] += 1
+                raise SessionConflict(f"Expected version {session.version}, got {version}")
+            started = time.perf_counter()
+            try:
+                for change in changes:
+                    session.apply_change(change)
+                if session.size > self.max_session_bytes:
+                    # Client membuka ulang dengan konten penuh dan mendapat 413 di sana
+                    raise SessionConflict("Content exceeds the maximum input size")
+            except SessionConflict:
+                # State setengah diterapkan tidak bisa dipercaya lagi
+                self.close(session_id)
+                with self._lock:
+                    self._stats["conflicts"] += 1
+                raise
+            linted = session.lint()
+            session.version += 1
+            result = {
+                "version": session.version,
+                "documents": len(session.docs),
+                "relinted": linted,
+                **session.diff(),
+                "lint_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        with self._lock:
+            self._stats["updates"] += 1
+            self._evict()
+        return result
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "sessions": len(self._sessions),
+                "bytes": sum(s.size for s in self._sessions.values()),
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "idle_seconds": self.idle_seconds,
+            }
+
+
+_store: Optional[LintSessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_lint_session_store() -> LintSessionStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LintSessionStore(
+                max_sessions=Config.YAML_SESSION_MAX,
+                max_bytes=Config.YAML_SESSION_MAX_MB * 1024 * 1024,
+                idle_seconds=Config.YAML_SESSION_IDLE_SECONDS,
+                max_session_bytes=Config.YAML_MAX_INPUT_MB * 1024 * 1024,
+            )
+        return _store
@@ -0,0 +1,156 @@
+"""
+Benchmark cek permission user di org besar: engine REST (1 request per repo) vs GraphQL
+(GITHUB_GRAPHQL_BATCH_SIZE repo per request, fallback REST per repo bila perlu).
+
+    python benchmarks/graphql_permissions_bench.py                  # 1000 repo
+    python benchmarks/graphql_permissions_bench.py --repos 5000 --rest-ms 60
+
+Org sintetis deterministik (--seed): sebagian repo memberi akses ke user, sebagian tidak bisa
+dibaca lewat GraphQL (null, mis. tanpa akses admin), sebagian pencarian collaborator-nya lebih
+dari satu halaman tanpa login yang persis sama. Keduanya memaksa fallback REST. Client stub
+menggantikan GitHubClient: menghitung request dan mensimulasikan latency jaringan
+(sleep), jadi hasilnya bergantung pada --rest-ms / --graphql-ms, bukan pada GitHub.
+
+Dicetak jumlah request REST/GraphQL, perkiraan biaya rate limit (REST 1 per request,
+GraphQL 1 point per query batch <= 100 repo), waktu total, dan apakah hasil kedua engine sama.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask  # noqa: E402
+
+from app.config import Config  # noqa: E402
+from app.utils import github_role_checker  # noqa: E402
+
+ORG = "acme"
+USERNAME = "octo-dev"
+PERMISSIONS = ["ADMIN", "MAINTAIN", "WRITE", "TRIAGE", "READ"]
+_REST_RE = re.compile(r"/repos/([^/]+)/([^/]+)/collaborators/([^/]+)/permission$")
+
+
+def build_org(repos: int, seed: int):
+    """Repo -> state deterministik: permission GraphQL user (None = tanpa akses) + flag khusus."""
+    rng = random.Random(seed)
+    org = {}
+    for i in range(repos):
+        roll = rng.random()
+        org[f"service-{i:05d}"] = {
+            "permission": rng.choice(PERMISSIONS) if roll < 0.3 else None,
+            "graphql_null": rng.random() < 0.02,
+            "fuzzy_overflow": rng.random() < 0.01,
+        }
+    return org
+
+
+class _Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class StubGitHubClient:
+    """Pengganti GitHubClient (get + graphql) di atas org sintetis."""
+
+    def __init__(self, org, known_users, rest_ms, graphql_ms, graphql_repo_ms):
+        self.org = org
+        self.known_users = known_users
+        self.rest_s = rest_ms / 1000
+        self.graphql_s = graphql_ms / 1000
+        self.graphql_repo_s = graphql_repo_ms / 1000
+        self.lock = threading.Lock()
+        self.rest_calls = 0
+        self.graphql_calls = 0
+
+    def get(self, url):
+        with self.lock:
+            self.rest_calls += 1
+        time.sleep(self.rest_s)
+        match = _REST_RE.search(url)
+        repo = self.org.get(match.group(2)) if match else None
+        if repo is None or match.group(3) not in self.known_users:
+            return _Response(404, {"message": "Not Found"})
+        permission = repo["permission"]
+        legacy = github_role_checker._GRAPHQL_PERMISSION_MAP[permission] if permission else "none"
+        return _Response(200, {"permission": legacy})
+
+    def graphql(self, query, variables):
+        repo_names = [v for k, v in variables.items() if re.fullmatch(r"n\d+", k)]
+        with self.lock:
+            self.graphql_calls += 1
+        time.sleep(self.graphql_s + self.graphql_repo_s * len(repo_names))
+        if "user(login:" in query:
+            login = variables["login"]
+            return {"data": {"user": {"login": login} if login in self.known_users else None}}
+
+        login = variables["login"]
+        data = {}
+        for i, name in enumerate(repo_names):
+            repo = self.org.get(name)
+            if repo is None or repo["graphql_null"]:
+                data[f"r{i}"] = None
+                continue
+            if repo["fuzzy_overflow"]:
+                # Halaman pertama penuh dengan login yang mirip, login persis ada di halaman berikutnya
+                edges = [{"permission": "READ", "node": {"login": f"{login}-{j}"}} for j in range(100)]
+                data[f"r{i}"] = {"collaborators": {"pageInfo": {"hasNextPage": True}, "edges": edges}}
+                continue
+            edges = []
+            if repo["permission"] and login in self.known_users:
+                edges.append({"permission": repo["permission"], "node": {"login": login}})
+            data[f"r{i}"] = {"collaborators": {"pageInfo": {"hasNextPage": False}, "edges": edges}}
+        return {"data": data}
+
+
+def run(engine, org, username, args):
+    client = StubGitHubClient(org, {USERNAME}, args.rest_ms, args.graphql_ms, args.graphql_repo_ms)
+    github_role_checker.get_github_client = lambda: client
+    repos = ({"name": name} for name in org)   # generator, seperti iter_repositories
+    started = time.perf_counter()
+    results = github_role_checker.check_user_permissions(ORG, username, repos, max_workers=args.workers, engine=engine)
+    elapsed = time.perf_counter() - started
+    cost = client.rest_calls + client.graphql_calls
+    return sorted((r["repo"], r["status"], r["role"]) for r in results), client, elapsed, cost
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=1000, help="jumlah repo di org (default 1000)")
+    parser.add_argument("--seed", type=int, default=7, help="seed org sintetis (default 7)")
+    parser.add_argument("--workers", type=int, default=10, help="max_workers check_user_permissions (default 10)")
+    parser.add_argument("--rest-ms", type=float, default=40.0, help="latency per request REST (default 40)")
+    parser.add_argument("--graphql-ms", type=float, default=150.0, help="latency dasar per query GraphQL (default 150)")
+    parser.add_argument("--graphql-repo-ms", type=float, default=2.0,
+                        help="latency tambahan per repo di query GraphQL (default 2)")
+    args = parser.parse_args()
+
+    org = build_org(args.repos, args.seed)
+    fallback = sum(1 for r in org.values() if r["graphql_null"] or r["fuzzy_overflow"])
+    print(f"{args.repos} repos, {fallback} need REST fallback; batch {Config.GITHUB_GRAPHQL_BATCH_SIZE}, "
+          f"graphql concurrency {Config.GITHUB_GRAPHQL_CONCURRENCY}, {args.workers} workers")
+    print(f"{'user':>8} {'engine':>8} {'REST':>6} {'GraphQL':>8} {'rate cost':>10} {'wall s':>8} {'repos/s':>9} {'same':>5}")
+
+    # check_user_permissions mencatat error lewat current_app.logger
+    with Flask(__name__).app_context():
+        for label, username in (("member", USERNAME), ("unknown", "ghost-user")):
+            baseline = None
+            for engine in (github_role_checker.ENGINE_REST, github_role_checker.ENGINE_GRAPHQL):
+                results, client, elapsed, cost = run(engine, org, username, args)
+                baseline = results if baseline is None else baseline
+                print(f"{label:>8} {engine:>8} {client.rest_calls:>6} {client.graphql_calls:>8} {cost:>10} "
+                      f"{elapsed:>8.2f} {args.repos / elapsed:>9.0f} {str(results == baseline):>5}")
+
+
+if __name__ == "__main__":
+    main()
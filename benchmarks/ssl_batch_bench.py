@@ -0,0 +1,141 @@
+"""
+Benchmark cek SSL banyak target: serial (get_ssl_details satu per satu, perilaku lama)
+vs check_ssl_batch (asyncio, maksimal `concurrency` koneksi sekaligus).
+
+    python benchmarks/ssl_batch_bench.py                          # 50 target, delay 100 ms
+    python benchmarks/ssl_batch_bench.py --targets 200 --concurrency 10,50,200
+
+Target adalah server HTTPS lokal (127.0.0.1, satu port per target) dengan sertifikat dari CA
+sementara yang dibuat lewat CLI openssl; verifikasi TLS tetap aktif (SSL_CERT_FILE = CA ini).
+--delay-ms mensimulasikan latency jaringan: separuh sebelum handshake, separuh sebelum
+response header. Dicetak waktu total, target/detik, dan apakah grade sama dengan serial.
+"""
+
+import argparse
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.ssl_batch import check_ssl_batch  # noqa: E402
+from app.utils.ssl_service import get_ssl_details  # noqa: E402
+
+
+def _openssl(*args) -> None:
+    subprocess.run(["openssl", *args], check=True, capture_output=True)
+
+
+def make_certificates(directory: str):
+    """CA sementara + sertifikat localhost. Return (ca_pem, (cert_pem, key_pem))."""
+    ca_pem, ca_key = os.path.join(directory, "ca.pem"), os.path.join(directory, "ca.key")
+    key, csr, pem = (os.path.join(directory, f"localhost.{s}") for s in ("key", "csr", "pem"))
+    ext = os.path.join(directory, "san.ext")
+    with open(ext, "w") as f:
+        f.write("subjectAltName=DNS:localhost\n")
+    _openssl("req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2", "-subj", "/CN=Bench CA",
+             "-keyout", ca_key, "-out", ca_pem)
+    _openssl("req", "-newkey", "rsa:2048", "-nodes", "-subj", "/CN=localhost", "-keyout", key, "-out", csr)
+    _openssl("x509", "-req", "-in", csr, "-CA", ca_pem, "-CAkey", ca_key, "-CAcreateserial",
+             "-days", "90", "-extfile", ext, "-out", pem)
+    return ca_pem, (pem, key)
+
+
+def start_servers(count: int, cert, delay_s: float):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(*cert)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def setup(self):
+            # Handshake di thread handler (bukan di accept) agar target tidak saling menunggu
+            time.sleep(delay_s / 2)
+            self.request.do_handshake()
+            super().setup()
+
+        def do_HEAD(self):
+            time.sleep(delay_s / 2)
+            self.send_response(200)
+            self.send_header("Strict-Transport-Security", "max-age=31536000")
+            self.send_header("X-Content-Type-Options", "nosniff")
+            self.send_header("Content-Length", "0")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.socket = context.wrap_socket(server.socket, server_side=True, do_handshake_on_connect=False)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def run_serial(targets):
+    started = time.perf_counter()
+    results = {f"{host}:{port}": get_ssl_details(f"{host}:{port}") for host, port in targets}
+    return results, time.perf_counter() - started
+
+
+def run_batch(targets, concurrency: int, timeout: float):
+    started = time.perf_counter()
+    results = {item["target"]: item["result"] for item in check_ssl_batch(targets, concurrency, timeout)}
+    return results, time.perf_counter() - started
+
+
+def summary(results):
+    return {target: (r.get("grade"), r.get("error")) for target, r in results.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", type=int, default=50, help="jumlah server/target (default 50)")
+    parser.add_argument("--delay-ms", type=float, default=100.0, help="latency simulasi per target (default 100)")
+    parser.add_argument("--concurrency", default="10,50", help="concurrency batch, dipisah koma (default 10,50)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="timeout per target batch (default 10)")
+    args = parser.parse_args()
+
+    if shutil.which("openssl") is None:
+        raise SystemExit("openssl CLI is required to create the benchmark certificates")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ca_pem, cert = make_certificates(tmp)
+        # Dibaca saat create_default_context(): serial dan batch sama-sama memverifikasi ke CA ini
+        os.environ["SSL_CERT_FILE"] = ca_pem
+        servers = start_servers(args.targets, cert, args.delay_ms / 1000)
+        targets = [("localhost", server.server_address[1]) for server in servers]
+        try:
+            print(f"{args.targets} local TLS targets, {args.delay_ms:g} ms simulated latency each")
+            print(f"{'mode':>12} {'wall s':>8} {'targets/s':>10} {'ok':>5} {'same grades':>12}")
+            serial, elapsed = run_serial(targets)
+            baseline = summary(serial)
+            ok = sum(1 for r in serial.values() if not r.get("error"))
+            print(f"{'serial':>12} {elapsed:>8.2f} {len(targets) / elapsed:>10.1f} {ok:>5} {'-':>12}")
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                results, elapsed = run_batch(targets, concurrency, args.timeout)
+                ok = sum(1 for r in results.values() if not r.get("error"))
+                print(f"{f'batch c={concurrency}':>12} {elapsed:>8.2f} {len(targets) / elapsed:>10.1f} {ok:>5} "
+                      f"{str(summary(results) == baseline):>12}")
+        finally:
+            # shutdown() menunggu poll serve_forever (0.5 s): hentikan semua server paralel
+            stoppers = [threading.Thread(target=server.shutdown) for server in servers]
+            for stopper in stoppers:
+                stopper.start()
+            for stopper in stoppers:
+                stopper.join()
+            for server in servers:
+                server.server_close()
+
+
+if __name__ == "__main__":
+    main()
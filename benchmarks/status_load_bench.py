@@ -0,0 +1,238 @@
+"""
+Load test status task: polling interval (perilaku lama) vs ETag/304 vs long-poll vs SSE.
+
+    python benchmarks/status_load_bench.py                       # 16 client, 60 detik per mode
+    python benchmarks/status_load_bench.py --clients 32 --duration 120 --update-every 5
+
+App dijalankan di waitress lokal (127.0.0.1, port acak) dengan task store memory. Tiap client
+memantau satu task; thread updater mengubah status tiap task setiap --update-every detik.
+Per mode dicetak jumlah request HTTP yang diterima server, req/s, byte body, req/s yang
+dihemat dibanding polling interval, dan latency notifikasi (waktu dari update status sampai
+client melihatnya). CPU adalah waktu proses (server + client di satu proses).
+ETag menghemat byte (304 tanpa body), bukan request; long-poll butuh ~1 request per perubahan
+status, SSE 1 request per stream (reconnect tiap STATUS_STREAM_MAX_SECONDS).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+POLLING_INTERVAL_S = 5.0   # POLLING_INTERVAL di static/js/scanner.js sebelum ETag/SSE
+LONG_POLL_WAIT_S = 25
+
+
+class RequestCounter:
+    """Middleware WSGI: hitung request per status code di sisi server."""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def __call__(self, environ, start_response):
+        def counting_start_response(status, headers, exc_info=None):
+            code = status.split(" ", 1)[0]
+            with self.lock:
+                self.counts[code] = self.counts.get(code, 0) + 1
+            return start_response(status, headers, exc_info)
+
+        return self.app(environ, counting_start_response)
+
+    def reset(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+
+class Updater(threading.Thread):
+    """Naikkan status tiap task ('Scanning: step N') bergiliran; catat waktu tiap update."""
+
+    def __init__(self, store, task_ids, every_s):
+        super().__init__(daemon=True)
+        self.store = store
+        self.task_ids = task_ids
+        self.every_s = every_s
+        self.updated = {}
+        self.stop = threading.Event()
+
+    def run(self):
+        step = 0
+        gap = self.every_s / len(self.task_ids)
+        while not self.stop.is_set():
+            step += 1
+            for tid in self.task_ids:
+                if self.stop.wait(gap):
+                    return
+                self.updated[(tid, step)] = time.monotonic()
+                self.store.update(tid, status=f"Scanning: step {step}")
+
+
+class Client(threading.Thread):
+    def __init__(self, mode, port, task_id, updated, deadline, interval_s):
+        super().__init__(daemon=True)
+        self.mode = mode
+        self.port = port
+        self.task_id = task_id
+        self.updated = updated
+        self.deadline = deadline
+        self.interval_s = interval_s
+        self.requests = 0
+        self.body_bytes = 0
+        self.latencies = []
+        self.seen = set()
+        self.errors = 0
+
+    def observe(self, status):
+        if status.startswith("Scanning: step "):
+            step = int(status.rsplit(" ", 1)[1])
+            if step not in self.seen:
+                self.seen.add(step)
+                ts = self.updated.get((self.task_id, step))
+                if ts is not None:
+                    self.latencies.append(time.monotonic() - ts)
+        return status.startswith(("Completed", "Failed"))
+
+    def run(self):
+        try:
+            (self.run_sse if self.mode == "sse" else self.run_poll)()
+        except (OSError, http.client.HTTPException):
+            self.errors += 1
+
+    def run_poll(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=LONG_POLL_WAIT_S + 10)
+        etag = None
+        path = f"/status/{self.task_id}"
+        if self.mode == "long-poll":
+            path += f"?wait={LONG_POLL_WAIT_S}"
+        while time.monotonic() < self.deadline:
+            started = time.monotonic()
+            headers = {"If-None-Match": etag} if etag and self.mode != "poll" else {}
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+            self.requests += 1
+            self.body_bytes += len(body)
+            if resp.status == 200:
+                etag = resp.getheader("ETag")
+                if self.observe(json.loads(body)["status"]):
+                    return
+            if self.mode != "long-poll":
+                time.sleep(max(0.0, self.interval_s - (time.monotonic() - started)))
+        conn.close()
+
+    def run_sse(self):
+        while time.monotonic() < self.deadline:
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=LONG_POLL_WAIT_S + 10)
+            conn.request("GET", f"/status/stream?ids={self.task_id}")
+            resp = conn.getresponse()
+            self.requests += 1
+            event = None
+            while True:
+                line = resp.readline()
+                if not line:
+                    break   # stream ditutup (STATUS_STREAM_MAX_SECONDS): reconnect seperti EventSource
+                self.body_bytes += len(line)
+                line = line.decode().rstrip("\n")
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: ") and event == "status":
+                    if self.observe(json.loads(line[6:])["status"]):
+                        conn.close()
+                        return
+                elif line.startswith("data: ") and event == "done":
+                    conn.close()
+                    return
+            conn.close()
+
+
+def run_mode(mode, args, port, counter, store):
+    task_ids = [str(uuid.uuid4()) for _ in range(args.clients)]
+    for tid in task_ids:
+        store.create({"task_id": tid, "created_at": datetime.now().isoformat(), "status": "Queued", "log": None})
+    updater = Updater(store, task_ids, args.update_every)
+    deadline = time.monotonic() + args.duration
+    clients = [Client(mode, port, tid, updater.updated, deadline, args.interval) for tid in task_ids]
+
+    counter.reset()
+    cpu_started, started = time.process_time(), time.monotonic()
+    updater.start()
+    for client in clients:
+        client.start()
+    time.sleep(max(0.0, deadline - time.monotonic()))
+    updater.stop.set()
+    # Status terminal melepas long-poll/stream yang masih menunggu
+    for tid in task_ids:
+        store.update(tid, status="Completed")
+    for client in clients:
+        client.join(timeout=LONG_POLL_WAIT_S + 15)
+    elapsed = time.monotonic() - started
+    cpu = time.process_time() - cpu_started
+
+    counts = counter.reset()
+    latencies = sorted(lat for c in clients for lat in c.latencies)
+    return {
+        "requests": sum(counts.values()),
+        "not_modified": counts.get("304", 0),
+        "rps": sum(counts.values()) / elapsed,
+        "kib": sum(c.body_bytes for c in clients) / 1024,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else float("nan"),
+        "cpu_s": cpu,
+        "errors": sum(c.errors for c in clients),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="client (= task) konkuren (default 16)")
+    parser.add_argument("--duration", type=float, default=60.0, help="detik per mode (default 60)")
+    parser.add_argument("--interval", type=float, default=POLLING_INTERVAL_S, help="interval polling (default 5)")
+    parser.add_argument("--update-every", type=float, default=15.0, help="detik antar update status per task (default 15)")
+    parser.add_argument("--modes", default="poll,etag,long-poll,sse", help="mode yang dijalankan, dipisah koma")
+    args = parser.parse_args()
+
+    # Harus di-set sebelum app diimpor: Config dibaca saat import
+    os.environ["TASK_STORE_BACKEND"] = "memory"
+    os.environ["SSL_MONITOR_ENABLED"] = "false"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["STATUS_STREAM_MAX_CLIENTS"] = str(args.clients)
+    os.environ.setdefault("FLASK_SECRET_KEY", "bench")
+
+    from waitress import create_server
+
+    from app import create_app
+    from app.tasks import task_store
+
+    counter = RequestCounter(create_app())
+    # Long-poll/SSE memegang satu thread per client
+    server = create_server(counter, host="127.0.0.1", port=0, threads=args.clients + 4,
+                           connection_limit=args.clients * 4)
+    threading.Thread(target=server.run, daemon=True).start()
+    port = server.effective_port
+
+    print(f"{args.clients} clients, {args.duration:g}s per mode, poll interval {args.interval:g}s, "
+          f"status update every {args.update_every:g}s per task")
+    print(f"{'mode':>10} {'requests':>9} {'304':>6} {'req/s':>7} {'saved/s':>8} {'body KiB':>9} "
+          f"{'notify p50 ms':>14} {'p95 ms':>8} {'cpu s':>6} {'errors':>6}")
+    baseline_rps = None
+    for mode in args.modes.split(","):
+        r = run_mode(mode, args, port, counter, task_store)
+        if mode == "poll":
+            baseline_rps = r["rps"]
+        saved = f"{round(baseline_rps - r['rps'], 2) + 0.0:.2f}" if baseline_rps is not None else "-"
+        print(f"{mode:>10} {r['requests']:>9} {r['not_modified']:>6} {r['rps']:>7.2f} {saved:>8} {r['kib']:>9.1f} "
+              f"{r['p50_ms']:>14.0f} {r['p95_ms']:>8.0f} {r['cpu_s']:>6.2f} {r['errors']:>6}")
+    server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Microbenchmark YAML lint: jalur lama (temp file + config + parser baru per request)
+vs run_yaml_linting sekarang (in-memory, config & parser dipakai ulang).
+
+    python benchmarks/yaml_lint_bench.py              # small, 64 KB, 1 MB
+    python benchmarks/yaml_lint_bench.py --mb 4 --repeat 3
+
+Per input dicetak latency per request (median dari --repeat putaran) dan memori satu
+request dari tracemalloc (puncak selama request, dan yang masih tertahan sesudahnya).
+Input multi-MB butuh beberapa menit: waktu yamllint naik linear dengan ukuran input.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ruamel.yaml import YAML  # noqa: E402
+from yamllint import linter  # noqa: E402
+from yamllint.config import YamlLintConfig  # noqa: E402
+
+from app.utils.linter_service import run_yaml_linting  # noqa: E402
+
+SMALL_DOC = """---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: web-{i}
+  labels:
+    app: web-{i}
+spec:
+  replicas: 3
+  selector:
+    matchLabels:
+      app: web-{i}
+  template:
+    metadata:
+      labels:
+        app: web-{i}
+    spec:
+      containers:
+        - name: web
+          image: nginx:1.27
+          ports:
+            - containerPort: 80
+          env:
+            - name: MODE
+              value: "production"
+"""
+
+
+def legacy_run_yaml_linting(content: str) -> dict:
+    """Jalur sebelum user-021, disalin apa adanya sebagai baseline."""
+    yaml_parser = YAML()
+    try:
+        yaml_parser.load(content)
+    except Exception as e:
+        return {"status": "INVALID_SYNTAX", "error_message": str(e)}
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".yaml", encoding="utf-8") as tmp:
+            tmp.write(content)
+            tmp_path = tmp.name
+        conf = YamlLintConfig("extends: default")
+        with open(tmp_path, "r", encoding="utf-8") as tmp_file:
+            problems = list(linter.run(tmp_file, conf, tmp_path))
+        results = [{"line": p.line, "col": p.column, "level": p.level, "message": p.desc} for p in problems]
+        return {"status": "VALID_WITH_ISSUES" if results else "PERFECT", "problems": results}
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_input(target_bytes: int) -> str:
+    """Satu dokumen mapping besar (run_yaml_linting memakai YAML.load, bukan multi-dokumen)."""
+    parts = ["---\nitems:\n"]
+    size, i = len(parts[0]), 0
+    while size < target_bytes:
+        lines = SMALL_DOC.format(i=i).splitlines()[1:]
+        block = "  - " + lines[0] + "\n" + "".join("    " + line + "\n" for line in lines[1:])
+        parts.append(block)
+        size += len(block)
+        i += 1
+    return "".join(parts)
+
+
+def measure(fn, content: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    fn(content)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=1.0, help="ukuran input besar dalam MB (default 1)")
+    parser.add_argument("--repeat", type=int, default=0, help="putaran per input (default: otomatis per ukuran)")
+    args = parser.parse_args()
+
+    inputs = [
+        ("small", SMALL_DOC.format(i=0), args.repeat or 200),
+        ("medium", build_input(64 * 1024), args.repeat or 3),
+        (f"{args.mb:g}MB", build_input(int(args.mb * 1024 * 1024)), args.repeat or 1),
+    ]
+    # Warm-up (import, bytecode, parser thread-local) dengan input kecil; input besar cukup dicek valid
+    for fn in (legacy_run_yaml_linting, run_yaml_linting):
+        fn(inputs[0][1])
+    for name, content, _ in inputs:
+        if YAML().load(content) is None:
+            raise SystemExit(f"benchmark input {name} is empty")
+    print(f"{'input':>8} {'bytes':>10} {'engine':>8} {'median ms':>11} {'peak KiB':>10} {'retained KiB':>13}")
+    for name, content, repeat in inputs:
+        for engine, fn in (("before", legacy_run_yaml_linting), ("after", run_yaml_linting)):
+            median_ms, peak, retained = measure(fn, content, repeat)
+            print(f"{name:>8} {len(content):>10} {engine:>8} {median_ms:>11.2f} {peak / 1024:>10.0f} {retained / 1024:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark latency per ketikan di editor YAML: lint ulang seluruh buffer (lint_documents)
+vs sesi inkremental (LintSessionStore.update, hanya dokumen yang tersentuh).
+
+    python benchmarks/yaml_session_bench.py                 # manifest 300 dokumen
+    python benchmarks/yaml_session_bench.py --docs 1000 --keys 50
+
+Ketikan disimulasikan sebagai delta CodeMirror satu karakter di tiga posisi: tengah buffer,
+dokumen terakhir, dan mengetik '---' (memecah dokumen). Dicetak median/p95 ms per ketikan
+dan rata-rata jumlah dokumen yang di-lint ulang. Lint penuh per ketikan lambat untuk buffer
+besar, jadi putarannya dibatasi --full-repeat.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.linter_service import lint_documents  # noqa: E402
+from app.utils.yaml_lint_session import LintSessionStore  # noqa: E402
+from yaml_lint_bench import SMALL_DOC  # noqa: E402
+
+
+def build_manifest(docs: int) -> str:
+    """Output mirip `helm template`: banyak dokumen Deployment kecil."""
+    return "".join(SMALL_DOC.format(i=i) for i in range(docs))
+
+
+def keystrokes(lines, scenario: str, count: int):
+    """Delta satu karakter berurutan, seperti CodeMirror mengirimnya setelah debounce per ketikan."""
+    line = len(lines) - 2 if scenario == "last-doc" else len(lines) // 2
+    base = len(lines[line])
+    changes = []
+    for i in range(count):
+        if scenario == "split":
+            # Ketik '---' di awal baris (dokumen terbelah), lalu hapus lagi dengan backspace
+            step = i % 6
+            ch = step if step < 3 else 5 - step
+            end = ch if step < 3 else ch + 1
+            text = ["-"] if step < 3 else [""]
+        else:
+            ch = end = base + i
+            text = ["x"]
+        changes.append({"from": {"line": line, "ch": ch}, "to": {"line": line, "ch": end}, "text": text})
+    return changes
+
+
+def apply(lines, change) -> None:
+    prefix = lines[change["from"]["line"]][:change["from"]["ch"]]
+    suffix = lines[change["to"]["line"]][change["to"]["ch"]:]
+    lines[change["from"]["line"]:change["to"]["line"] + 1] = (prefix + "\n".join(change["text"]) + suffix).split("\n")
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_full(content: str, changes) -> list:
+    lines = content.split("\n")
+    timings = []
+    for change in changes:
+        apply(lines, change)
+        started = time.perf_counter()
+        list(lint_documents("\n".join(lines)))
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_session(content: str, changes):
+    store = LintSessionStore(max_sessions=1, max_bytes=1 << 30, idle_seconds=3600, max_session_bytes=1 << 30)
+    started = time.perf_counter()
+    session_id, result = store.open(content)
+    open_ms = (time.perf_counter() - started) * 1000
+    version = result["version"]
+    timings, relinted = [], []
+    for change in changes:
+        started = time.perf_counter()
+        result = store.update(session_id, version, [change])
+        timings.append((time.perf_counter() - started) * 1000)
+        version = result["version"]
+        relinted.append(result["relinted"])
+    return timings, relinted, open_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=300, help="jumlah dokumen di buffer (default 300)")
+    parser.add_argument("--keys", type=int, default=30, help="ketikan per skenario untuk sesi (default 30)")
+    parser.add_argument("--full-repeat", type=int, default=3, help="ketikan per skenario untuk lint penuh (default 3)")
+    args = parser.parse_args()
+
+    content = build_manifest(args.docs)
+    # Warm-up: import yamllint/ruamel dan process pool lint_documents untuk input besar
+    list(lint_documents(content))
+    print(f"buffer: {args.docs} documents, {len(content)} bytes, {content.count(chr(10))} lines")
+    print(f"{'scenario':>9} {'engine':>8} {'keys':>5} {'median ms':>10} {'p95 ms':>8} {'docs/key':>9}")
+    open_ms = None
+    for scenario in ("middle", "last-doc", "split"):
+        changes = keystrokes(content.split("\n"), scenario, args.keys)
+        full = run_full(content, changes[:args.full_repeat])
+        session, relinted, open_ms = run_session(content, changes)
+        print(f"{scenario:>9} {'full':>8} {len(full):>5} {statistics.median(full):>10.2f} "
+              f"{percentile(full, 95):>8.2f} {args.docs:>9}")
+        print(f"{scenario:>9} {'session':>8} {len(session):>5} {statistics.median(session):>10.2f} "
+              f"{percentile(session, 95):>8.2f} {statistics.mean(relinted):>9.1f}")
+    print(f"session open (full lint once): {open_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
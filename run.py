@@ -1,7 +1,15 @@
 from app import create_app
+from app.config import Config
 
-app = create_app()
+# Process pool (spawn) mengimpor ulang modul ini sebagai __mp_main__: app + background service hanya di proses utama
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
-    # Run Flask directly with debug enabled
-    app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
+    if Config.USE_DEV_SERVER:
+        # Flask development server, hanya untuk develop lokal
+        app.run(host=Config.SERVER_HOST, port=Config.PORT)
+    else:
+        from app.utils.wsgi_server import serve
+
+        serve(app)
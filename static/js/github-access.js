@@ -0,0 +1,87 @@
+// static/js/github-access.js
+// Grant akses GitHub: baca hasil per repo dari stream NDJSON begitu tiap grant selesai.
+
+const GitHubAccess = {
+    /**
+     * POST form ke endpoint grant dan panggil onResult(r) untuk tiap repo.
+     * Return ringkasan {"type": "done", total, ok, failed}.
+     * Error validasi (400/401/500 JSON) dilempar sebagai Error(message).
+     */
+    async streamGrant(form, onResult) {
+        const response = await fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: { 'Accept': 'application/x-ndjson' },
+        });
+
+        const type = response.headers.get('Content-Type') || '';
+        if (!type.includes('application/x-ndjson')) {
+            const json = await response.json().catch(() => ({}));
+            if (json.success && json.github_response) {
+                json.github_response.forEach(onResult);
+                return null;
+            }
+            throw new Error(json.error || 'Terjadi kesalahan.');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let summary = null;
+
+        const handleLine = (line) => {
+            if (!line.trim()) return;
+            const msg = JSON.parse(line);
+            if (msg.type === 'done') summary = msg;
+            else onResult(msg);
+        };
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
+        }
+        handleLine(buffer + decoder.decode());
+        return summary;
+    },
+
+    /** Satu baris <li> hasil grant (ikon + pesan sesuai status). */
+    renderResult(r) {
+        const li = document.createElement('li');
+        li.className = 'p-2 border-bottom';
+        let icon = 'bi-info-circle-fill text-secondary';
+        let msg = r.message;
+
+        if (r.status === 'invited' || r.status === 'updated') {
+            icon = 'bi-check-circle-fill text-success';
+            msg = `${r.message} (Role: ${r.role?.toUpperCase() || '-'})`;
+        } else if (r.status === 'skipped') {
+            icon = 'bi-skip-forward-circle-fill text-info';
+            msg = 'Sudah memiliki akses atau undangan tertunda.';
+        } else if (r.status === 'not_found') {
+            icon = 'bi-x-circle-fill text-danger';
+            msg = 'Repository tidak ditemukan.';
+        } else if (r.status === 'failed') {
+            icon = 'bi-x-circle-fill text-danger';
+        }
+
+        const row = document.createElement('div');
+        row.className = 'd-flex align-items-center';
+        row.innerHTML = `<i class="bi ${icon} me-3"></i><div><strong></strong>: <span></span></div>`;
+        row.querySelector('strong').textContent = r.repo;
+        row.querySelector('span').textContent = msg;
+        li.appendChild(row);
+        return li;
+    },
+
+    /** Baris ringkasan setelah semua repo selesai. */
+    renderSummary(summary) {
+        const li = document.createElement('li');
+        li.className = 'p-2 text-muted small';
+        li.textContent = `Selesai: ${summary.ok} berhasil, ${summary.failed} gagal dari ${summary.total} repository.`;
+        return li;
+    },
+};
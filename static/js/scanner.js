@@ -1,6 +1,6 @@
 /**
  * scanner.js
- * Handles repository scanning tasks, status polling, and UI updates.
+ * Handles repository scanning tasks, status streaming (SSE with polling fallback), and UI updates.
  * Refactored to reduce cognitive complexity.
  */
 
@@ -183,6 +183,7 @@
       const status = task?.status || 'Unknown';
       const isFailed = status.startsWith('Failed');
       const isCompleted = status.startsWith('Completed');
+      const isRunning = !isFailed && !isCompleted && !['Queued', 'Not Found', 'Unknown'].includes(status);
       
       let badgeClass = 'bg-secondary';
       let iconHtml = `<div class="spinner-border spinner-border-sm text-primary" role="status" id="spinner-${task?.task_id}"></div>`;
@@ -200,11 +201,14 @@
         iconHtml = '<i class="bi bi-question-circle-fill text-warning fs-5"></i>';
       }
 
+      // Commit sudah pernah dianalisis -> hasil lama dipakai ulang
+      const label = task?.reused ? `${status} (reused)` : status;
+
       return {
-        status,
+        status: label,
         badgeClass,
         iconHtml,
-        logBtn: isFailed && task?.has_log ? this.renderLogBtn(task.task_id) : '',
+        logBtn: (isFailed && task?.has_log) || isRunning ? this.renderLogBtn(task.task_id) : '',
         sonarBtn: task?.sonar_url ? `<a href="${task.sonar_url}" target="_blank" class="btn btn-sm btn-outline-primary ms-2">View Report</a>` : '',
         screenshotBtns: this.renderScreenshotBtns(task?.screenshot_info)
       };
@@ -354,6 +358,7 @@
 
     pauseAll() {
       this.isPaused = true;
+      StatusStream.reset();
       Object.keys(this.intervals).forEach(id => {
         clearInterval(this.intervals[id]);
         delete this.intervals[id];
@@ -367,12 +372,156 @@
       state.items.forEach(t => {
         const s = String(t.status || '');
         if (!s.startsWith('Completed') && !s.startsWith('Failed') && s !== 'Not Found' && t.task_id) {
-          this.start(t.task_id);
+          StatusStream.watch(t.task_id);
         }
       });
     }
   };
 
+  /**********************
+   * STATUS STREAM (SSE)*
+   **********************/
+  // One EventSource for all active tasks; the server only pushes changes.
+  // Falls back to Poller (ETag/304) when SSE is unavailable or refused.
+  const StatusStream = {
+    source: null,
+    ids: new Set(),
+    failed: false,
+    connectTimer: null,
+
+    supported() {
+      return typeof window.EventSource === 'function' && !this.failed;
+    },
+
+    watch(taskId) {
+      if (!this.supported()) {
+        Poller.start(taskId);
+        return;
+      }
+      if (this.ids.has(taskId)) return;
+      this.ids.add(taskId);
+      // Batch several watch() calls (page load) into one connection
+      clearTimeout(this.connectTimer);
+      this.connectTimer = setTimeout(() => this.connect(), 50);
+    },
+
+    connect() {
+      this.close();
+      if (!this.ids.size) return;
+
+      const query = [...this.ids].map(encodeURIComponent).join(',');
+      const es = new EventSource(`/status/stream?ids=${query}`);
+
+      es.addEventListener('status', (e) => {
+        const data = Utils.safeParse(e.data);
+        if (!data?.task_id) return;
+        Poller.handleSuccess(data.task_id, data);
+        const s = String(data.status || '');
+        if (s.startsWith('Completed') || s.startsWith('Failed') || s === 'Not Found') {
+          this.ids.delete(data.task_id);
+        }
+      });
+
+      es.addEventListener('done', () => {
+        this.ids.clear();
+        this.close();
+      });
+
+      es.onerror = () => {
+        // CONNECTING = normal reconnect after the server ends the stream.
+        // CLOSED = refused (e.g. 503 stream limit) -> polling fallback.
+        if (es.readyState === EventSource.CLOSED) this.fallback();
+      };
+
+      this.source = es;
+    },
+
+    fallback() {
+      const ids = [...this.ids];
+      this.failed = true;
+      this.reset();
+      ids.forEach(id => Poller.start(id));
+    },
+
+    close() {
+      if (this.source) {
+        this.source.close();
+        this.source = null;
+      }
+    },
+
+    reset() {
+      clearTimeout(this.connectTimer);
+      this.close();
+      this.ids.clear();
+    }
+  };
+
+  /**********************
+   * LIVE LOG VIEWER    *
+   **********************/
+  // Follows /status/<id>/log by byte offset; only new output is transferred.
+  const LogViewer = {
+    session: 0,
+
+    follow(taskId, el) {
+      const session = ++this.session;
+      const id = encodeURIComponent(taskId);
+      let offset = 0;
+      let first = true;
+
+      const step = () => {
+        if (session !== this.session) return;
+        axios.get(`/status/${id}/log`, { params: { from: offset, wait: first ? 0 : 20 }, timeout: 40000 })
+          .then(res => {
+            if (session !== this.session) return;
+            const chunk = res.data || {};
+            if (first) el.textContent = '';
+            el.textContent += chunk.data || '';
+            offset = chunk.next ?? offset;
+            if (chunk.complete) {
+              this.loadStoredLog(id, el);
+              return;
+            }
+            // More data already available: fetch immediately, otherwise long-poll
+            first = false;
+            step();
+          })
+          .catch(() => {
+            if (session !== this.session) return;
+            if (first) {
+              this.loadStoredLog(id, el);
+            } else {
+              setTimeout(step, 5000);
+            }
+          });
+      };
+      step();
+    },
+
+    // Task error/traceback is stored on the task itself; shown after the scanner output
+    loadStoredLog(id, el) {
+      const target = el;
+      const hasOutput = target.textContent.length > 0 && target.textContent !== 'Loading log...';
+      axios.get(`/status/${id}?include_log=1`, { timeout: 12000 })
+        .then(res => {
+          const stored = res.data?.log;
+          if (!hasOutput) {
+            target.textContent = stored || 'Log not available.';
+          } else if (stored) {
+            target.textContent += `\n----- Task log -----\n${stored}`;
+          }
+        })
+        .catch(err => {
+          if (!hasOutput) target.textContent = err?.response?.data?.error || 'Failed to fetch log.';
+        });
+    },
+
+    stop() {
+      this.session++;
+    }
+  };
+
   /**********************
    * EVENT HANDLERS     *
    **********************/
@@ -404,10 +553,9 @@
           return;
         }
 
-        axios.get(`/status/${encodeURIComponent(taskId)}?include_log=1`, { timeout: 12000 })
-          .then(res => { content.textContent = res.data?.log || 'Log not available.'; })
-          .catch(err => { content.textContent = err?.response?.data?.error || 'Failed to fetch log.'; });
+        LogViewer.follow(taskId, content);
       });
+      modal.addEventListener('hidden.bs.modal', () => LogViewer.stop());
     },
 
     setupInclusionExclusion() {
@@ -443,7 +591,7 @@
               state.items.unshift(newTask);
               Storage.save(state.items);
               UI.renderAllTasks(state.items);
-              Poller.start(newTask.task_id);
+              StatusStream.watch(newTask.task_id);
             }
           })
           .catch(err => {
@@ -472,6 +620,7 @@
         } else {
           await Api.refreshCsrfToken();
           await Api.ping();
+          StatusStream.failed = false;
           Poller.resumeAll();
         }
       });
@@ -527,7 +676,7 @@
     state.items.forEach(t => {
       const s = String(t.status || '');
       if (!s.startsWith('Completed') && !s.startsWith('Failed') && s !== 'Not Found' && t.task_id) {
-        Poller.start(t.task_id);
+        StatusStream.watch(t.task_id);
       }
     });
   });
@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Jangan menulis ke data/ milik instance lokal saat test
+os.environ.setdefault("TASK_STORE_BACKEND", "memory")
+
+from app.config import Config  # noqa: E402
+
+
+@pytest.fixture
+def local_http_server():
+    """
+    Factory HTTP server lokal di thread: local_http_server(handler_class) -> base URL.
+    Semua server dimatikan di akhir test.
+    """
+    servers = []
+
+    def start(handler_class):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    """Base handler stub: subclass mendefinisikan do_GET/do_POST dan membalas lewat send_json(status, body)."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class SonarStub:
+    """State stub SonarQube: urutan status CE task per id, QG per analysis, revisi analysis terakhir."""
+
+    def __init__(self):
+        self.ce_statuses = {}
+        self.quality_gates = {}
+        self.revision = None
+        self.requests = []
+        self.auth_headers = []
+
+    def handler(self):
+        stub = self
+
+        class Handler(JsonHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stub.requests.append(url.path)
+                stub.auth_headers.append(self.headers.get("Authorization"))
+                if url.path == "/api/ce/task":
+                    statuses = stub.ce_statuses.get(params.get("id"))
+                    if statuses is None:
+                        return self.send_json(404, {"errors": [{"msg": "not found"}]})
+                    # Status maju satu langkah per poll, berhenti di status terakhir
+                    status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+                    task = {"id": params["id"], "status": status}
+                    if status == "SUCCESS":
+                        task["analysisId"] = f"A-{params['id']}"
+                    return self.send_json(200, {"task": task})
+                if url.path == "/api/qualitygates/project_status":
+                    status = stub.quality_gates.get(params.get("analysisId"), "OK")
+                    return self.send_json(200, {"projectStatus": {"status": status}})
+                if url.path == "/api/project_analyses/search":
+                    analyses = [{"key": "A1", "revision": stub.revision}] if stub.revision else []
+                    return self.send_json(200, {"analyses": analyses})
+                self.send_json(404, {})
+
+        return Handler
+
+
+@pytest.fixture
+def sonar(local_http_server, monkeypatch):
+    """SonarStub di server lokal; Config SonarQube diarahkan ke stub selama test."""
+    stub = SonarStub()
+    monkeypatch.setattr(Config, "SONAR_HOST_URL", local_http_server(stub.handler()))
+    monkeypatch.setattr(Config, "SONAR_LOGIN_TOKEN", "squ_test")
+    return stub
+
+
+class GitHubOrgStub:
+    """Org GitHub palsu untuk permission index: dua repo, satu collaborator; repo di `broken` gagal dibaca."""
+
+    name = "acme"
+    repos = [
+        {"name": "api", "pushed_at": "2026-01-01", "updated_at": "2026-01-01"},
+        {"name": "web", "pushed_at": "2026-01-02", "updated_at": "2026-01-02"},
+    ]
+    collaborators = {
+        "api": [{"login": "octo", "permissions": {"push": True, "pull": True}}],
+        "web": [{"login": "octo", "permissions": {"pull": True}}],
+    }
+
+    def __init__(self):
+        self.broken = set()
+
+    def iter_pages(self, url):
+        if url.endswith(f"/orgs/{self.name}/repos"):
+            return iter(self.repos)
+        repo = url.split(f"/repos/{self.name}/", 1)[1].split("/", 1)[0]
+        if repo in self.broken:
+            raise RuntimeError("502 Bad Gateway")
+        return iter(self.collaborators[repo])
+
+
+@pytest.fixture
+def github_org(monkeypatch):
+    from app.utils import permission_index
+
+    org = GitHubOrgStub()
+    monkeypatch.setattr(permission_index, "iter_pages", org.iter_pages)
+    return org
+
+
+@pytest.fixture
+def permission_indexer(github_org, tmp_path):
+    from app.utils.permission_index import PermissionIndexer
+
+    return PermissionIndexer([github_org.name], str(tmp_path), interval_seconds=3600,
+                             full_refresh_seconds=0, workers=2)
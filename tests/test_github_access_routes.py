@@ -0,0 +1,32 @@
+import pytest
+
+# app.routes ikut mengimpor route scan (Playwright)
+pytest.importorskip("playwright")
+
+from app.routes import github_access_routes  # noqa: E402
+
+
+@pytest.fixture
+def indexed(github_org, permission_indexer, monkeypatch):
+    permission_indexer.refresh(github_org.name)
+    monkeypatch.setattr(github_access_routes, "get_permission_indexer", lambda: permission_indexer)
+    return permission_indexer
+
+
+@pytest.mark.parametrize("exists, expected", [
+    (True, {("api", "found", "none"), ("web", "found", "none")}),
+    (False, {("api", "not_found", "-"), ("web", "not_found", "-")}),
+])
+def test_user_missing_from_index_matches_live_engine(github_org, indexed, monkeypatch, exists, expected):
+    monkeypatch.setattr(github_access_routes, "github_user_exists", lambda username: exists)
+
+    results, built_ts = github_access_routes._check_from_index(github_org.name, "ghost", "all", [], None)
+
+    assert {(r["repo"], r["status"], r["role"]) for r in results} == expected
+    assert built_ts == indexed.matrix(github_org.name).built_ts
+
+
+def test_user_missing_from_index_is_checked_live_when_unsure(github_org, indexed, monkeypatch):
+    monkeypatch.setattr(github_access_routes, "github_user_exists", lambda username: None)
+
+    assert github_access_routes._check_from_index(github_org.name, "ghost", "all", [], None) == (None, None)
@@ -0,0 +1,26 @@
+def test_refresh_builds_matrix(github_org, permission_indexer):
+    status = permission_indexer.refresh(github_org.name)
+
+    matrix = permission_indexer.matrix(github_org.name, max_age_seconds=60)
+    assert (status["refreshed"], status["failed"]) == (2, 0)
+    assert matrix.built_ts == status["finished_ts"]
+    assert sorted(matrix.user_permissions("octo"), key=lambda r: r["repo"]) == [
+        {"repo": "api", "status": "found", "role": "write"},
+        {"repo": "web", "status": "found", "role": "read"},
+    ]
+    assert matrix.user_permissions("ghost") is None
+
+
+def test_failed_refresh_keeps_index_stale(github_org, permission_indexer):
+    github_org.broken.add("web")
+    status = permission_indexer.refresh(github_org.name)
+
+    assert status["failed"] == 1
+    assert permission_indexer.matrix(github_org.name) is None   # belum pernah lengkap: cek live
+
+    github_org.broken.clear()
+    built = permission_indexer.refresh(github_org.name)["finished_ts"]
+    github_org.broken.add("api")
+    permission_indexer.refresh(github_org.name, full=True)
+
+    assert permission_indexer.matrix(github_org.name).built_ts == built
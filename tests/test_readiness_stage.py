@@ -0,0 +1,139 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+# app.tasks mengimpor pipeline screenshot (Playwright)
+pytest.importorskip("playwright")
+
+from app import tasks  # noqa: E402
+from app.config import Config  # noqa: E402
+
+
+@pytest.fixture
+def handed(sonar, monkeypatch):
+    """Stage readiness terisolasi (heap kosong, poll cepat); shot yang diserahkan ke screenshot dicatat."""
+    shots = []
+    monkeypatch.setattr(tasks, "_readiness_heap", [])
+    monkeypatch.setattr(tasks, "_readiness_waiting", 0)
+    monkeypatch.setattr(tasks, "_stopping", threading.Event())
+    monkeypatch.setattr(tasks, "READINESS_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(tasks, "READINESS_MAX_POLL_SECONDS", 0.04)
+    monkeypatch.setattr(Config, "SONAR_READINESS_TIMEOUT_SECONDS", 5.0)
+    monkeypatch.setattr(tasks, "_handoff_to_screenshot", shots.append)
+    return shots
+
+
+def submit(ce_task_id):
+    task_id = f"task-{ce_task_id}-{time.monotonic_ns()}"
+    tasks.task_store.create({"task_id": task_id, "created_at": datetime.now().isoformat(), "status": "Scanning"})
+    shot = {"task_id": task_id, "ce_task_id": ce_task_id, "dedupe_key": ("readiness-test", task_id)}
+    tasks._after_scan(shot)
+    return shot
+
+
+def drive(until, timeout=5.0):
+    """Jalankan loop readiness di thread test sampai until() benar."""
+    deadline = time.monotonic() + timeout
+    while not until():
+        shot = tasks._next_due_shot(timeout=deadline - time.monotonic())
+        assert shot is not None, "readiness stage stalled"
+        tasks._check_readiness(shot)
+
+
+def test_shots_come_out_in_due_order(handed):
+    for name, delay in (("c", 0.06), ("a", 0.02), ("b", 0.04)):
+        tasks._schedule_readiness({"name": name}, delay)
+
+    assert tasks._next_due_shot(timeout=0) is None
+    order = [tasks._next_due_shot(timeout=1)["name"] for _ in range(3)]
+
+    assert order == ["a", "b", "c"]
+    assert tasks._next_due_shot(timeout=0.01) is None
+
+
+def test_ready_analysis_is_handed_to_screenshot_with_quality_gate(sonar, handed):
+    sonar.ce_statuses["T1"] = ["PENDING", "IN_PROGRESS", "SUCCESS"]
+    sonar.quality_gates["A-T1"] = "ERROR"
+    shot = submit("T1")
+
+    drive(lambda: handed)
+
+    assert handed == [shot]
+    readiness = shot["readiness"]
+    assert (readiness["ready"], readiness["ce_status"], readiness["quality_gate_status"]) == (True, "SUCCESS", "ERROR")
+    assert readiness["waited_ms"] >= 0
+    assert sonar.requests.count("/api/ce/task") == 3
+    assert tasks._readiness_waiting == 0
+
+
+def test_slow_ce_task_does_not_hold_back_fast_one(sonar, handed, monkeypatch):
+    monkeypatch.setattr(Config, "SONAR_READINESS_TIMEOUT_SECONDS", 0.3)
+    sonar.ce_statuses["SLOW"] = ["PENDING"]
+    sonar.ce_statuses["FAST"] = ["IN_PROGRESS", "SUCCESS"]
+    slow = submit("SLOW")
+    fast = submit("FAST")
+
+    drive(lambda: len(handed) == 2)
+
+    assert handed == [fast, slow]
+    assert fast["readiness"]["ready"] is True
+    # Timeout: tetap ke screenshot (fallback badge polling), bukan menggantung
+    assert (slow["readiness"]["finished"], slow["readiness"]["ready"]) == (False, False)
+    assert slow["readiness"]["ce_status"] == "PENDING"
+    assert slow["readiness"]["waited_ms"] >= 300
+
+
+def test_poll_delay_backs_off_and_caps(sonar, handed, monkeypatch):
+    sonar.ce_statuses["T2"] = ["PENDING"] * 6 + ["SUCCESS"]
+    delays = []
+    schedule = tasks._schedule_readiness
+    monkeypatch.setattr(tasks, "_schedule_readiness", lambda shot, delay: (delays.append(delay), schedule(shot, delay)))
+    submit("T2")
+
+    drive(lambda: handed)
+
+    assert delays == pytest.approx([0, 0.01, 0.015, 0.0225, 0.03375, 0.04, 0.04])
+
+
+def test_failed_ce_task_goes_to_screenshot_without_waiting(sonar, handed):
+    sonar.ce_statuses["T3"] = ["FAILED"]
+    shot = submit("T3")
+
+    drive(lambda: handed)
+
+    assert (shot["readiness"]["finished"], shot["readiness"]["ready"]) == (True, False)
+    assert sonar.requests.count("/api/ce/task") == 1
+
+
+def test_check_error_is_retried(sonar, handed, monkeypatch):
+    sonar.ce_statuses["T4"] = ["SUCCESS"]
+    calls = []
+    check = tasks.check_analysis
+
+    def flaky(ce_task_id):
+        calls.append(ce_task_id)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return check(ce_task_id)
+
+    monkeypatch.setattr(tasks, "check_analysis", flaky)
+    shot = submit("T4")
+
+    drive(lambda: handed)
+
+    assert calls == ["T4", "T4"]
+    assert shot["readiness"]["ready"] is True
+
+
+def test_stopping_fails_waiting_task_instead_of_screenshot(sonar, handed):
+    sonar.ce_statuses["T5"] = ["SUCCESS"]
+    shot = submit("T5")
+    tasks._stopping.set()
+
+    drive(lambda: not tasks._readiness_heap and tasks._readiness_waiting == 0)
+
+    assert handed == []
+    assert "/api/ce/task" not in sonar.requests
+    assert tasks.task_store.get(shot["task_id"])["status"] == tasks.SHUTDOWN_STATUS
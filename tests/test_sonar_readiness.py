@@ -0,0 +1,69 @@
+import base64
+
+from app.config import Config
+from app.utils import sonar_readiness
+
+
+def test_success_reads_quality_gate(sonar):
+    sonar.ce_statuses["T1"] = ["SUCCESS"]
+    sonar.quality_gates["A-T1"] = "ERROR"
+
+    result = sonar_readiness.check_analysis("T1")
+
+    assert result == {
+        "ready": True,
+        "finished": True,
+        "ce_status": "SUCCESS",
+        "analysis_id": "A-T1",
+        "quality_gate_status": "ERROR",
+    }
+
+
+def test_polls_once_per_call(sonar):
+    sonar.ce_statuses["T4"] = ["PENDING", "IN_PROGRESS", "SUCCESS"]
+
+    results = [sonar_readiness.check_analysis("T4") for _ in range(3)]
+
+    assert [r["ce_status"] for r in results] == ["PENDING", "IN_PROGRESS", "SUCCESS"]
+    assert [(r["finished"], r["ready"]) for r in results] == [(False, False), (False, False), (True, True)]
+    assert sonar.requests.count("/api/ce/task") == 3
+    assert sonar.requests.count("/api/qualitygates/project_status") == 1
+
+
+def test_token_is_sent_as_basic_auth_username(sonar):
+    sonar.ce_statuses["T1"] = ["SUCCESS"]
+    sonar_readiness.check_analysis("T1")
+
+    expected = "Basic " + base64.b64encode(b"squ_test:").decode()
+    assert set(sonar.auth_headers) == {expected}
+
+
+def test_failed_ce_task_is_finished_but_not_ready(sonar):
+    sonar.ce_statuses["T2"] = ["FAILED"]
+
+    result = sonar_readiness.check_analysis("T2")
+
+    assert (result["finished"], result["ready"]) == (True, False)
+    assert result["ce_status"] == "FAILED"
+    assert result["quality_gate_status"] is None
+    assert "/api/qualitygates/project_status" not in sonar.requests
+
+
+def test_unknown_ce_task_is_not_finished(sonar):
+    result = sonar_readiness.check_analysis("missing")
+
+    assert (result["finished"], result["ready"], result["ce_status"]) == (False, False, None)
+
+
+def test_unreachable_server_is_not_finished(monkeypatch):
+    monkeypatch.setattr(Config, "SONAR_HOST_URL", "http://127.0.0.1:9")
+
+    result = sonar_readiness.check_analysis("T1")
+
+    assert (result["finished"], result["ready"]) == (False, False)
+
+
+def test_latest_analysis_revision(sonar):
+    assert sonar_readiness.latest_analysis_revision("proj") is None
+    sonar.revision = "abc123"
+    assert sonar_readiness.latest_analysis_revision("proj") == "abc123"
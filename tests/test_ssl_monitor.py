@@ -0,0 +1,234 @@
+import os
+import shutil
+import ssl
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import Config
+from app.utils.ssl_monitor import SSLMonitor
+
+pytestmark = pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl CLI not available")
+
+
+def _openssl(*args):
+    subprocess.run(["openssl", *args], check=True, capture_output=True)
+
+
+class LocalCA:
+    """CA sementara + sertifikat server localhost dengan masa berlaku yang bisa diatur."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.dir = str(directory)
+        self.ca_pem = os.path.join(self.dir, "ca.pem")
+        self.ca_key = os.path.join(self.dir, "ca.key")
+        _openssl("req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+                 "-subj", "/CN=Test CA", "-keyout", self.ca_key, "-out", self.ca_pem)
+        ext = os.path.join(self.dir, "san.ext")
+        with open(ext, "w") as f:
+            f.write("subjectAltName=DNS:localhost\n")
+        self.ext = ext
+
+    def issue(self, name, days):
+        key, csr, pem = (os.path.join(self.dir, f"{name}.{s}") for s in ("key", "csr", "pem"))
+        _openssl("req", "-newkey", "rsa:2048", "-nodes", "-subj", "/CN=localhost",
+                 "-keyout", key, "-out", csr)
+        _openssl("x509", "-req", "-in", csr, "-CA", self.ca_pem, "-CAkey", self.ca_key,
+                 "-CAcreateserial", "-days", str(days), "-extfile", self.ext, "-out", pem)
+        return pem, key
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Strict-Transport-Security", "max-age=31536000")
+        self.send_header("Content-Length", "0")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+
+class TLSServer:
+    """HTTPS stub di 127.0.0.1; sertifikat bisa diganti (renew) tanpa restart."""
+
+    def __init__(self, cert):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(*cert)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.socket = self.context.wrap_socket(self.httpd.socket, server_side=True)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def serve_cert(self, cert):
+        # Koneksi baru memakai sertifikat terakhir yang dimuat ke context
+        self.context.load_cert_chain(*cert)
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture(scope="module")
+def ca(tmp_path_factory):
+    return LocalCA(tmp_path_factory.mktemp("ca"))
+
+
+@pytest.fixture
+def tls_server(ca, monkeypatch):
+    # Verifikasi handshake tetap aktif, dengan CA test sebagai satu-satunya trust store
+    monkeypatch.setenv("SSL_CERT_FILE", ca.ca_pem)
+    monkeypatch.setattr(Config, "SSL_CONNECT_TIMEOUT_SECONDS", 2.0)
+    servers = []
+
+    def start(days):
+        server = TLSServer(ca.issue(f"srv{len(servers)}-{days}", days))
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return SSLMonitor(watchlist_file=str(tmp_path / "watchlist.json"), interval_seconds=3600,
+                      retry_seconds=60, workers=2, history_size=3, warn_days=30,
+                      critical_days=7, max_hosts=3)
+
+
+def _item(monitor, target):
+    return next(v for v in monitor.feed()["items"] if v["target"] == target)
+
+
+def test_added_host_is_pending_until_checked(monitor, tls_server):
+    server = tls_server(90)
+    target = f"localhost:{server.port}"
+
+    assert monitor.add([("LocalHost", server.port)]) == {"added": [target], "existing": [], "rejected": []}
+    assert monitor.add([("localhost", server.port)])["existing"] == [target]
+    assert _item(monitor, target)["status"] == "pending"
+
+
+def test_check_records_certificate_and_status(monitor, tls_server):
+    server = tls_server(90)
+    monitor.add([("localhost", server.port)])
+
+    cycle = monitor.run_due()
+
+    assert cycle["checked"] == 1 and cycle["failed"] == 0
+    view = _item(monitor, f"localhost:{server.port}")
+    assert view["status"] == "ok"
+    assert view["valid"] is True
+    assert view["error"] is None
+    assert view["details"]["common_name"] == "localhost"
+    assert view["details"]["issuer"] == "Test CA"
+    assert 88 <= view["days_left"] <= 90
+    assert view["trend"] == "steady"
+
+
+@pytest.mark.parametrize("days, status", [(20, "warning"), (5, "critical")])
+def test_status_follows_days_left(monitor, tls_server, days, status):
+    server = tls_server(days)
+    monitor.add([("localhost", server.port)])
+    monitor.run_due()
+
+    assert _item(monitor, f"localhost:{server.port}")["status"] == status
+
+
+def test_untrusted_certificate_is_an_error(monitor, tls_server, monkeypatch, tmp_path):
+    server = tls_server(90)
+    monitor.add([("localhost", server.port)])
+    other = LocalCA(tmp_path / "other")
+    monkeypatch.setenv("SSL_CERT_FILE", other.ca_pem)
+
+    monitor.run_due()
+
+    view = _item(monitor, f"localhost:{server.port}")
+    assert view["status"] == "error"
+    assert view["failures"] == 1
+    assert view["error"].startswith("SSL Verification Failed")
+
+
+def test_feed_is_served_from_cache_between_checks(monitor, tls_server):
+    server = tls_server(90)
+    monitor.add([("localhost", server.port)])
+    monitor.run_due()
+    server.stop()
+
+    # Belum jatuh tempo: tidak ada koneksi, hasil terakhir tetap ditampilkan
+    assert monitor.run_due()["checked"] == 0
+    view = _item(monitor, f"localhost:{server.port}")
+    assert view["status"] == "ok"
+    assert monitor.stats()["next_check_in_s"] > 3500
+
+
+def test_recheck_failure_keeps_last_certificate(monitor, tls_server):
+    server = tls_server(90)
+    monitor.add([("localhost", server.port)])
+    monitor.run_due()
+    server.stop()
+
+    assert monitor.recheck(f"LOCALHOST:{server.port}") == 1
+    cycle = monitor.run_due()
+
+    assert cycle["checked"] == 1 and cycle["failed"] == 1
+    view = _item(monitor, f"localhost:{server.port}")
+    assert view["status"] == "error"
+    assert view["details"]["common_name"] == "localhost"
+    assert view["last_ok_ts"] < view["last_checked_ts"]
+    assert view["next_check_ts"] - view["last_checked_ts"] == monitor.retry_seconds
+
+
+def test_renewal_updates_trend_and_history(monitor, tls_server, ca):
+    server = tls_server(5)
+    monitor.add([("localhost", server.port)])
+    monitor.run_due()
+
+    server.serve_cert(ca.issue("renewed", 365))
+    monitor.recheck()
+    monitor.run_due()
+
+    view = _item(monitor, f"localhost:{server.port}")
+    assert view["status"] == "ok"
+    assert view["trend"] == "renewed"
+    assert view["renewed_ts"] == view["last_checked_ts"]
+    assert [h["days_left"] for h in view["history"]] == [4, 364]
+
+
+def test_feed_orders_by_expiry_and_filters(monitor, tls_server):
+    ports = {days: tls_server(days).port for days in (90, 5, 20)}
+    monitor.add([("localhost", port) for port in ports.values()])
+    monitor.run_due()
+
+    feed = monitor.feed()
+    assert [v["port"] for v in feed["items"]] == [ports[5], ports[20], ports[90]]
+    assert feed["counts"]["critical"] == feed["counts"]["warning"] == feed["counts"]["ok"] == 1
+
+    assert [v["port"] for v in monitor.feed(status="warning")["items"]] == [ports[20]]
+    paged = monitor.feed(page=2, per_page=2)
+    assert paged["pages"] == 2 and [v["port"] for v in paged["items"]] == [ports[90]]
+
+
+def test_watchlist_limit_and_persistence(monitor, tls_server):
+    server = tls_server(90)
+    monitor.add([("localhost", server.port)])
+    monitor.run_due()
+
+    result = monitor.add([("a.example", 443), ("b.example", 443), ("c.example", 443)])
+    assert result["added"] == ["a.example:443", "b.example:443"]
+    assert result["rejected"] == ["c.example:443"]
+
+    reloaded = SSLMonitor(watchlist_file=monitor.watchlist_file, interval_seconds=3600,
+                          retry_seconds=60, workers=1, history_size=3, warn_days=30,
+                          critical_days=7, max_hosts=3)
+    assert _item(reloaded, f"localhost:{server.port}")["status"] == "ok"
+    assert reloaded.remove(f"localhost:{server.port}") is True
+    assert reloaded.stats()["hosts"] == 2
@@ -0,0 +1,158 @@
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from app.utils.task_store import INTERRUPTED_STATUS, SQLiteTaskStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "tasks.db")
+
+
+@pytest.fixture
+def open_store(db_path):
+    """Buka SQLiteTaskStore pada DB yang sama; semua ditutup di akhir test."""
+    stores = []
+
+    def opener(**kwargs):
+        kwargs.setdefault("flush_interval", 0.01)
+        kwargs.setdefault("change_poll_interval", 0.02)
+        store = SQLiteTaskStore(path=db_path, **kwargs)
+        stores.append(store)
+        return store
+
+    yield opener
+    for store in stores:
+        store.close()
+
+
+def foreign_task(path, task_id, status, pid, heartbeat_ts=None, host=None, boot="other"):
+    """Task milik proses lain: baris task_owners + tasks ditulis langsung ke DB."""
+    owner_id = f"{host or socket.gethostname()}:{pid}:{boot}"
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO task_owners (owner_id, host, pid, heartbeat_ts) VALUES (?, ?, ?, ?)",
+            (owner_id, host or socket.gethostname(), pid, time.time() if heartbeat_ts is None else heartbeat_ts),
+        )
+        conn.execute(
+            "INSERT INTO tasks (task_id, status, created_ts, updated_ts, data, owner) VALUES (?, ?, ?, ?, '{}', ?)",
+            (task_id, status, time.time(), time.time(), owner_id),
+        )
+    conn.close()
+
+
+@pytest.fixture
+def live_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_open_keeps_tasks_of_live_process(open_store, db_path, live_pid):
+    SQLiteTaskStore(path=db_path).close()   # schema
+    foreign_task(db_path, "busy", "Scanning", live_pid.pid)
+
+    store = open_store()
+
+    assert store.get("busy")["status"] == "Scanning"
+    live_pid.kill()
+    live_pid.wait()
+    assert store.fail_orphaned() == 1
+    assert store.get("busy")["status"] == INTERRUPTED_STATUS
+
+
+def test_open_fails_tasks_whose_owner_is_gone(open_store, db_path, live_pid):
+    SQLiteTaskStore(path=db_path).close()
+    foreign_task(db_path, "crashed", "Scanning", dead_pid())
+    foreign_task(db_path, "silent", "Running", live_pid.pid, heartbeat_ts=time.time() - 3600, boot="silent")
+    foreign_task(db_path, "remote", "Running", 1, host="other-host")
+    # Proses ini dengan boot id lain = proses lama dengan pid yang dipakai ulang (PID 1 di container)
+    foreign_task(db_path, "reused-pid", "Queued", os.getpid(), boot="previous")
+    foreign_task(db_path, "done", "Completed", dead_pid(), boot="done")
+
+    store = open_store()
+
+    statuses = {tid: store.get(tid)["status"] for tid in ("crashed", "silent", "remote", "reused-pid", "done")}
+    assert statuses == {
+        "crashed": INTERRUPTED_STATUS,
+        "silent": INTERRUPTED_STATUS,
+        "remote": "Running",   # host lain, heartbeat masih baru
+        "reused-pid": INTERRUPTED_STATUS,
+        "done": "Completed",
+    }
+    assert "Submit it again" in store.get("crashed")["log"]
+
+
+def test_reopen_in_same_process_keeps_own_tasks(open_store):
+    first = open_store()
+    first.create({"task_id": "mine", "status": "Scanning"})
+    first.flush()
+
+    second = open_store()
+
+    assert second.get("mine")["status"] == "Scanning"
+
+
+def test_old_schema_is_migrated_and_unowned_tasks_failed(db_path, open_store):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE tasks (
+                task_id TEXT PRIMARY KEY, project_key TEXT, status TEXT,
+                created_ts REAL NOT NULL, updated_ts REAL NOT NULL, log TEXT, data TEXT NOT NULL
+            )
+        """)
+        conn.execute("INSERT INTO tasks VALUES ('legacy', NULL, 'Scanning', 1, 1, NULL, '{}')")
+    conn.close()
+
+    store = open_store()
+
+    assert store.get("legacy")["status"] == INTERRUPTED_STATUS
+    assert store.versions(["legacy"])["legacy"] > 0
+
+
+def test_versions_and_waiters_see_writes_from_another_store(open_store):
+    writer, reader = open_store(), open_store()
+    writer.create({"task_id": "t1", "status": "Queued"})
+    writer.flush()
+    known = reader.versions(["t1"])
+    assert known["t1"] > 0
+    assert reader.version_epoch == writer.version_epoch
+
+    assert reader.wait_for_change(known, 0.05) == known
+    threading.Timer(0.05, writer.update, args=("t1",), kwargs={"status": "Scanning"}).start()
+    started = time.monotonic()
+    changed = reader.wait_for_change(known, 5.0)
+
+    assert changed["t1"] > known["t1"]
+    assert time.monotonic() - started < 2.0
+    assert reader.get("t1")["status"] == "Scanning"
+
+
+def test_version_changes_only_after_flush(open_store):
+    store = open_store(flush_interval=60)
+    store.create({"task_id": "t1", "status": "Queued"})
+    store.flush()
+    before = store.versions(["t1"])
+
+    store.update("t1", status="Scanning")
+    assert store.versions(["t1"]) == before
+    assert store.get("t1")["status"] == "Scanning"   # read-your-writes dari buffer
+    store.flush()
+
+    assert store.versions(["t1"])["t1"] > before["t1"]
@@ -0,0 +1,153 @@
+import random
+
+import pytest
+
+from app.utils.linter_service import lint_documents
+from app.utils.yaml_lint_session import LintSessionStore, SessionConflict
+
+SEED_CONTENT = """\
+---
+name: web
+replicas: 2
+labels:
+  app: web
+---
+name: db
+ports:
+  - 5432
+  -  5433
+---
+# komentar
+items: [a,b]
+key: value
+key: duplicate
+---
+nested:
+    too: deep
+list:
+- x
+"""
+
+# Potongan teks yang memindahkan batas dokumen atau memicu masalah lint (spasi, indentasi, baris kosong)
+FRAGMENTS = [
+    "", "a", "x: 1", "\n", "\n\n", "---\n", "\n---\n", "--- ", "- item\n", "  ", " ", "#", " # c",
+    "key: value\n", "a:\n  b: c\n", "\nz:  1", "\n    deep: 1",
+]
+# Potongan yang merusak sintaks; lebih jarang agar sebagian besar dokumen tetap valid
+BREAKING = ["[", "{", "'", ": ", "\t", "...\n", "---"]
+
+
+def full_relint(content):
+    """Hasil acuan: lint ulang seluruh buffer dari nol."""
+    diagnostics, invalid = [], False
+    for result in lint_documents(content):
+        if result["status"] == "INVALID_SYNTAX":
+            invalid = True
+            diagnostics.append((result["error_line"], 1, "error", result["error_message"]))
+        else:
+            diagnostics.extend((p["line"], p["col"], p["level"], p["message"]) for p in result["problems"])
+    status = "INVALID_SYNTAX" if invalid else ("VALID_WITH_ISSUES" if diagnostics else "PERFECT")
+    return sorted(diagnostics), status
+
+
+def _key(d):
+    return d["line"], d["col"], d["level"], d["message"]
+
+
+def random_change(rng, lines):
+    """Delta CodeMirror acak yang valid untuk buffer `lines`."""
+    # Sebagian edit di ekor buffer: dokumen terakhir sering berganti (aturan akhir file)
+    from_line = rng.randrange(len(lines)) if rng.random() < 0.7 else max(0, len(lines) - 1 - rng.randint(0, 3))
+    from_ch = rng.randint(0, len(lines[from_line]))
+    if rng.random() < 0.6:
+        to_line, to_ch = from_line, rng.randint(from_ch, len(lines[from_line]))
+    else:
+        to_line = min(len(lines) - 1, from_line + rng.randint(0, 4))
+        to_ch = rng.randint(0, len(lines[to_line])) if to_line > from_line else len(lines[to_line])
+    text = "".join(rng.choice(BREAKING if rng.random() < 0.1 else FRAGMENTS) for _ in range(rng.randint(0, 2)))
+    return {"from": {"line": from_line, "ch": from_ch}, "to": {"line": to_line, "ch": to_ch},
+            "text": text.split("\n")}
+
+
+def apply_to_text(content, change):
+    lines = content.split("\n")
+    prefix = lines[change["from"]["line"]][:change["from"]["ch"]]
+    suffix = lines[change["to"]["line"]][change["to"]["ch"]:]
+    replaced = prefix + "\n".join(change["text"]) + suffix
+    lines[change["from"]["line"]:change["to"]["line"] + 1] = replaced.split("\n")
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def store():
+    return LintSessionStore(max_sessions=4, max_bytes=1024 * 1024, idle_seconds=3600,
+                            max_session_bytes=1024 * 1024)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_incremental_lint_matches_full_relint(store, seed):
+    rng = random.Random(seed)
+    content = SEED_CONTENT
+    session_id, result = store.open(content)
+    client = {_key(d) for d in result["added"]}
+    version = result["version"]
+
+    for step in range(30):
+        changes = []
+        for _ in range(rng.randint(1, 3)):
+            change = random_change(rng, content.split("\n"))
+            content = apply_to_text(content, change)
+            changes.append(change)
+
+        result = store.update(session_id, version, changes)
+        version = result["version"]
+        # Client hanya menerima delta: state yang direkonstruksi harus sama dengan lint penuh
+        client -= {_key(d) for d in result["removed"]}
+        client |= {_key(d) for d in result["added"]}
+
+        expected, expected_status = full_relint(content)
+        context = f"seed={seed} step={step} changes={changes!r}\n{content}"
+        assert sorted(client) == sorted(set(expected)), context
+        assert result["status"] == expected_status, context
+        assert result["total"] == len(expected), context
+
+
+def test_edit_inside_one_document_relints_only_that_document(store):
+    session_id, _ = store.open(SEED_CONTENT)
+    # Baris "replicas: 2" ada di dokumen pertama
+    change = {"from": {"line": 2, "ch": 10}, "to": {"line": 2, "ch": 11}, "text": ["3"]}
+
+    result = store.update(session_id, 0, [change])
+
+    assert result["documents"] == 4
+    assert result["relinted"] == 1
+    assert result["added"] == [] and result["removed"] == []
+
+
+def test_stale_version_closes_session(store):
+    session_id, _ = store.open(SEED_CONTENT)
+    change = {"from": {"line": 0, "ch": 0}, "to": {"line": 0, "ch": 0}, "text": ["#"]}
+    store.update(session_id, 0, [change])
+
+    with pytest.raises(SessionConflict):
+        store.update(session_id, 0, [change])
+    with pytest.raises(SessionConflict):
+        store.update(session_id, 1, [{"from": {"line": 99, "ch": 0}, "to": {"line": 99, "ch": 0}, "text": [""]}])
+    assert store.update(session_id, 1, [change]) is None
+    assert store.stats()["conflicts"] == 2
+
+
+@pytest.mark.parametrize("from_pos, to_pos", [
+    ((2, -1), (2, 0)),     # ch negatif
+    ((2, 11), (2, 12)),    # to melewati akhir "replicas: 2"
+    ((0, 4), (2, 0)),      # from melewati akhir "---"
+    ((1, 0), (2, 99)),
+])
+def test_change_outside_line_closes_session(store, from_pos, to_pos):
+    session_id, _ = store.open(SEED_CONTENT)
+    change = {"from": {"line": from_pos[0], "ch": from_pos[1]},
+              "to": {"line": to_pos[0], "ch": to_pos[1]}, "text": ["x"]}
+
+    with pytest.raises(SessionConflict):
+        store.update(session_id, 0, [change])
+    assert store.update(session_id, 0, []) is None